@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Endpoint benchmark suite with baseline regression checks.
+
+Boots the application from src/main.py against a copy of a generated
+database (see generate_dataset.py) and drives every products, orders,
+suppliers/purchase-orders and reports endpoint:
+
+- client mode sends each scenario sequentially through the Flask test
+  client and records p50/p95/p99 latency, throughput and the number of
+  SQL statements each request executes
+- http mode serves the app with a threaded WSGI server and runs a
+  weighted mix of all scenarios from --threads concurrent connections,
+  recording the same latencies plus total throughput
+
+Results are written as JSON. With a baseline (benchmarks/baseline.json by
+default) every scenario is compared against it and the run exits with
+status 1 when p50 latency grows past --latency-threshold, p95 past
+--tail-threshold, SQL statements per request past --sql-threshold or
+HTTP throughput drops past --throughput-threshold. Write scenarios create the rows they change,
+so runs are repeatable; the report cache is off unless --report-cache.
+
+    python benchmarks/generate_dataset.py --end-date 2026-10-17 --force
+    python benchmarks/endpoints.py --mode both
+    python benchmarks/endpoints.py --mode both --save-baseline
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import accumulate, count
+from bisect import bisect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE = os.path.join(os.path.dirname(BENCHMARK_DIR), 'src', 'database', 'benchmark.db')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DATASET_TABLES = ('products', 'suppliers', 'orders', 'order_items', 'purchase_orders', 'inventory_transactions')
+
+class Context:
+    """Ids the scenarios pick from, plus a counter for unique names"""
+
+    def __init__(self, path):
+        conn = sqlite3.connect(path)
+        self.rows = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in DATASET_TABLES}
+        self.max_product = conn.execute('SELECT MAX(product_id) FROM products').fetchone()[0]
+        self.max_supplier = conn.execute('SELECT MAX(supplier_id) FROM suppliers').fetchone()[0]
+        self.max_order = conn.execute('SELECT MAX(order_id) FROM orders').fetchone()[0]
+        self.max_purchase_order = conn.execute('SELECT MAX(purchase_order_id) FROM purchase_orders').fetchone()[0]
+        self.max_category = conn.execute('SELECT MAX(category_id) FROM categories').fetchone()[0]
+        # Products with enough stock that benchmark orders never fail on it
+        self.stocked = [row[0] for row in conn.execute(
+            'SELECT product_id FROM products WHERE stock_level >= 1000 ORDER BY product_id LIMIT 500'
+        )] or [row[0] for row in conn.execute(
+            'SELECT product_id FROM products ORDER BY stock_level DESC LIMIT 50'
+        )]
+        self.last_day = datetime.fromisoformat(
+            conn.execute('SELECT MAX(order_date) FROM orders').fetchone()[0] or datetime.utcnow().isoformat()
+        ).date()
+        conn.close()
+        self.sequence = count(1)
+        self.run_id = f'{int(time.time()):x}'
+
+    def unique(self, prefix):
+        return f'{prefix}-{self.run_id}-{next(self.sequence)}'
+
+# Scenario builders take (client, rng, ctx) and return (method, url, json body).
+# Builders for write scenarios may first create the row they act on through
+# client; only the returned request is timed.
+
+def _order_body(rng, ctx, lines=3):
+    return {
+        'customer_name': 'Benchmark Customer',
+        'customer_email': 'benchmark@example.com',
+        'items': [{'product_id': product_id, 'quantity': 1} for product_id in rng.sample(ctx.stocked, min(lines, len(ctx.stocked)))]
+    }
+
+def _purchase_order_body(rng, ctx):
+    return {
+        'supplier_id': rng.randint(1, ctx.max_supplier),
+        'expected_delivery_date': (ctx.last_day + timedelta(days=7)).isoformat(),
+        'items': [
+            {'product_id': rng.randint(1, ctx.max_product), 'quantity': rng.randint(10, 50), 'unit_cost': 5.0}
+            for _ in range(3)
+        ]
+    }
+
+def _created_id(client, method, url, body, key):
+    status, payload = client.request(method, url, body)
+    if status >= 400:
+        raise RuntimeError(f'setup {method} {url} failed with {status}: {payload[:200]!r}')
+    return json.loads(payload)[key]
+
+def _new_order(client, rng, ctx):
+    return _created_id(client, 'POST', '/api/orders', _order_body(rng, ctx), 'order_id')
+
+def _new_product(client, rng, ctx):
+    body = {'product_name': 'Benchmark Product', 'unit_price': 9.99, 'sku': ctx.unique('BENCH'), 'stock_level': 10}
+    return _created_id(client, 'POST', '/api/products', body, 'product_id')
+
+def _new_purchase_order(client, rng, ctx):
+    return _created_id(client, 'POST', '/api/purchase-orders', _purchase_order_body(rng, ctx), 'purchase_order_id')
+
+# name -> (weight in the http mix, builder)
+SCENARIOS = {
+    'products.list': (8, lambda c, rng, ctx: ('GET', f'/api/products?per_page=50&page={rng.randint(1, 20)}', None)),
+    'products.list_category': (4, lambda c, rng, ctx: ('GET', f'/api/products?per_page=50&category_id={rng.randint(1, ctx.max_category)}', None)),
+    'products.search': (6, lambda c, rng, ctx: ('GET', f'/api/products?per_page=20&search=SKU-{rng.randint(1, ctx.max_product):08d}', None)),
+    'products.get': (10, lambda c, rng, ctx: ('GET', f'/api/products/{rng.randint(1, ctx.max_product)}', None)),
+    'products.low_stock': (2, lambda c, rng, ctx: ('GET', '/api/products/low-stock', None)),
+    'products.export': (1, lambda c, rng, ctx: ('GET', '/api/products/export?format=ndjson', None)),
+    'products.create': (2, lambda c, rng, ctx: ('POST', '/api/products', {
+        'product_name': 'Benchmark Product', 'unit_price': 9.99, 'sku': ctx.unique('BENCH'),
+        'stock_level': 10, 'category_id': rng.randint(1, ctx.max_category)
+    })),
+    'products.update': (2, lambda c, rng, ctx: ('PUT', f'/api/products/{rng.randint(1, ctx.max_product)}', {
+        'description': f'Benchmark update {rng.random():.6f}'
+    })),
+    'products.adjust_stock': (2, lambda c, rng, ctx: ('POST', f'/api/products/{rng.choice(ctx.stocked)}/adjust-stock', {
+        'adjustment': rng.choice([-1, 1]), 'notes': 'Benchmark adjustment'
+    })),
+    'products.delete': (1, lambda c, rng, ctx: ('DELETE', f'/api/products/{_new_product(c, rng, ctx)}', None)),
+    'categories.list': (2, lambda c, rng, ctx: ('GET', '/api/categories', None)),
+
+    'orders.list': (6, lambda c, rng, ctx: ('GET', '/api/orders?per_page=50&include_items=summary', None)),
+    'orders.list_full': (4, lambda c, rng, ctx: ('GET', '/api/orders?per_page=20', None)),
+    'orders.list_status': (3, lambda c, rng, ctx: ('GET', '/api/orders?per_page=50&include_items=false&status=Pending', None)),
+    'orders.get': (10, lambda c, rng, ctx: ('GET', f'/api/orders/{rng.randint(1, ctx.max_order)}', None)),
+    'orders.create': (4, lambda c, rng, ctx: ('POST', '/api/orders', _order_body(rng, ctx))),
+    'orders.bulk': (1, lambda c, rng, ctx: ('POST', '/api/orders/bulk', [_order_body(rng, ctx, lines=2) for _ in range(10)])),
+    'orders.update': (2, lambda c, rng, ctx: ('PUT', f'/api/orders/{_new_order(c, rng, ctx)}', {'status': 'Processing'})),
+    'orders.cancel': (2, lambda c, rng, ctx: ('PUT', f'/api/orders/{_new_order(c, rng, ctx)}/status', {'status': 'Cancelled'})),
+    'orders.delete': (1, lambda c, rng, ctx: ('DELETE', f'/api/orders/{_new_order(c, rng, ctx)}', None)),
+    'orders.stats': (2, lambda c, rng, ctx: ('GET', '/api/orders/stats', None)),
+
+    'suppliers.list': (3, lambda c, rng, ctx: ('GET', '/api/suppliers?per_page=50', None)),
+    'suppliers.search': (2, lambda c, rng, ctx: ('GET', f'/api/suppliers?search=Supplier%20{rng.randint(1, ctx.max_supplier):05d}', None)),
+    'suppliers.get': (4, lambda c, rng, ctx: ('GET', f'/api/suppliers/{rng.randint(1, ctx.max_supplier)}', None)),
+    'suppliers.update': (1, lambda c, rng, ctx: ('PUT', f'/api/suppliers/{rng.randint(1, ctx.max_supplier)}', {
+        'phone': f'+1-555-{rng.randint(0, 9999):04d}'
+    })),
+    'purchase_orders.list': (3, lambda c, rng, ctx: ('GET', '/api/purchase-orders?per_page=50&include_items=summary', None)),
+    'purchase_orders.get': (3, lambda c, rng, ctx: ('GET', f'/api/purchase-orders/{rng.randint(1, ctx.max_purchase_order)}', None)),
+    'purchase_orders.create': (1, lambda c, rng, ctx: ('POST', '/api/purchase-orders', _purchase_order_body(rng, ctx))),
+    'purchase_orders.receive': (1, lambda c, rng, ctx: ('POST', f'/api/purchase-orders/{_new_purchase_order(c, rng, ctx)}/receive', None)),
+
+    'reports.low_inventory': (2, lambda c, rng, ctx: ('GET', '/api/reports/low-inventory', None)),
+    'reports.sales_by_category': (2, lambda c, rng, ctx: ('GET', '/api/reports/sales-by-category', None)),
+    'reports.product_performance': (2, lambda c, rng, ctx: ('GET', '/api/reports/product-performance?limit=50', None)),
+    'reports.monthly_sales': (2, lambda c, rng, ctx: ('GET', '/api/reports/monthly-sales', None)),
+    'reports.weekly_sales': (1, lambda c, rng, ctx: ('GET', '/api/reports/monthly-sales?grain=week', None)),
+    'reports.inventory_valuation': (2, lambda c, rng, ctx: ('GET', '/api/reports/inventory-valuation', None)),
+    'reports.top_selling': (2, lambda c, rng, ctx: ('GET', '/api/reports/top-selling-products', None)),
+    'reports.recent_transactions': (2, lambda c, rng, ctx: ('GET', '/api/reports/recent-transactions', None)),
+    'reports.dashboard': (4, lambda c, rng, ctx: ('GET', '/api/reports/dashboard-stats', None)),
+    'reports.stock_at': (1, lambda c, rng, ctx: ('GET', f'/api/reports/stock-at?date={ctx.last_day - timedelta(days=rng.randint(1, 60))}&per_page=100', None)),
+    'reports.stock_movement': (2, lambda c, rng, ctx: ('GET', '/api/reports/stock-movement', None)),
+}
+
+class TestClient:
+    """Flask test client speaking the (status, body) interface the scenarios use"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, url, body=None):
+        response = self.client.open(url, method=method, json=body)
+        return response.status_code, response.get_data()
+
+class HTTPClient:
+    """Keep-alive HTTP connection to the benchmark server"""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+
+    def request(self, method, url, body=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        self.connection.request(method, url, body=payload, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values) + 0.5) - 1))]
+
+def summarize(latencies, errors, elapsed=None, statements=None):
+    """Latency percentiles (ms), throughput and SQL statements per request"""
+    latencies = sorted(latencies)
+    result = {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'throughput_rps': round(len(latencies) / (elapsed or sum(latencies) or 1), 2),
+    }
+    if statements is not None:
+        result['sql_per_request'] = round(sum(statements) / len(statements), 2) if statements else 0.0
+    return result
+
+def boot(path, report_cache):
+    """Import src.main against path with benchmark settings and return the app"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    if not report_cache:
+        os.environ['REPORT_CACHE_SIZE'] = '0'
+    from src.main import app
+    return app
+
+def run_client(app, ctx, scenarios, args):
+    """Sequential test-client run of every scenario"""
+    from sqlalchemy import event
+    from src.models.inventory import db
+
+    statements = [0]
+    def count_statement(*_):
+        statements[0] += 1
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+
+    client = TestClient(app)
+    results = {}
+    try:
+        for name in scenarios:
+            build = SCENARIOS[name][1]
+            rng = random.Random(f'{args.seed}:{name}')
+            latencies, sql, errors = [], [], 0
+            for iteration in range(args.warmup + args.requests):
+                method, url, body = build(client, rng, ctx)
+                before = statements[0]
+                started = time.perf_counter()
+                status, payload = client.request(method, url, body)
+                elapsed = time.perf_counter() - started
+                if iteration < args.warmup:
+                    continue
+                if status >= 400:
+                    errors += 1
+                    if args.verbose:
+                        print(f'  {name}: {method} {url} -> {status} {payload[:200]!r}')
+                latencies.append(elapsed)
+                sql.append(statements[0] - before)
+            results[name] = summarize(latencies, errors, statements=sql)
+            print_row(name, results[name])
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+    return results
+
+def run_http(app, ctx, scenarios, args):
+    """Weighted mix of scenarios from concurrent keep-alive connections"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class Handler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_request(self, *_):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    names = list(scenarios)
+    cum_weights = list(accumulate(SCENARIOS[name][0] for name in names))
+    samples = {name: deque() for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(index):
+        rng = random.Random(f'{args.seed}:http:{index}')
+        client = HTTPClient(server.server_port)
+        while not stop.is_set():
+            name = names[bisect(cum_weights, rng.random() * cum_weights[-1])]
+            try:
+                method, url, body = SCENARIOS[name][1](client, rng, ctx)
+                started = time.perf_counter()
+                status, _ = client.request(method, url, body)
+            except Exception as e:
+                # Failed setup or a dropped connection: count it and reconnect
+                with lock:
+                    errors[name] += 1
+                if args.verbose:
+                    print(f'  {name}: {e}')
+                client = HTTPClient(server.server_port)
+                continue
+            samples[name].append(time.perf_counter() - started)
+            if status >= 400:
+                with lock:
+                    errors[name] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    results = {}
+    for name in names:
+        if samples[name]:
+            results[name] = summarize(list(samples[name]), errors[name], elapsed=elapsed)
+            print_row(name, results[name])
+    total = summarize([value for name in names for value in samples[name]], sum(errors.values()), elapsed=elapsed)
+    print_row('total', total)
+    return {'threads': args.threads, 'duration_s': args.duration, 'total': total, 'scenarios': results}
+
+def print_header(title):
+    print(f'\n{title}')
+    print(f"{'scenario':<30}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'sql':>7}{'errors':>8}")
+
+def print_row(name, result):
+    sql = result.get('sql_per_request')
+    print(f"{name:<30}{result['requests']:>6}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+          f"{result['throughput_rps']:>10.1f}{'' if sql is None else f'{sql:.1f}':>7}{result['errors']:>8}")
+
+def compare(results, baseline, args):
+    """Regressions of results against baseline, as printable lines"""
+    regressions = []
+
+    def latency(mode, name, current, previous):
+        for metric, threshold in (('p50_ms', args.latency_threshold), ('p95_ms', args.tail_threshold)):
+            limit = previous[metric] * (1 + threshold)
+            if current[metric] > limit and current[metric] - previous[metric] > args.min_regression_ms:
+                regressions.append(f'{mode} {name}: {metric} {current[metric]:.2f} > {previous[metric]:.2f} (+{threshold:.0%})')
+
+    for name, previous in baseline.get('client', {}).items():
+        current = results.get('client', {}).get(name)
+        if current is None:
+            continue
+        latency('client', name, current, previous)
+        if current.get('sql_per_request', 0) > previous.get('sql_per_request', 0) + args.sql_threshold:
+            regressions.append(f"client {name}: {current['sql_per_request']} SQL statements per request, "
+                               f"baseline {previous['sql_per_request']}")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"client {name}: {current['errors']} errors, baseline {previous['errors']}")
+
+    previous_http, current_http = baseline.get('http'), results.get('http')
+    if previous_http and current_http:
+        for name, previous in previous_http['scenarios'].items():
+            current = current_http['scenarios'].get(name)
+            if current is not None:
+                latency('http', name, current, previous)
+        floor = previous_http['total']['throughput_rps'] * (1 - args.throughput_threshold)
+        if current_http['total']['throughput_rps'] < floor:
+            regressions.append(f"http total: {current_http['total']['throughput_rps']} req/s < "
+                               f"{previous_http['total']['throughput_rps']} (-{args.throughput_threshold:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--database', default=DEFAULT_DATABASE, help='Generated database to copy (default: src/database/benchmark.db)')
+    parser.add_argument('--in-place', action='store_true', help='Run against --database itself instead of a copy')
+    parser.add_argument('--mode', choices=('client', 'http', 'both'), default='client')
+    parser.add_argument('--scenarios', help='Comma-separated scenario names or prefixes (default: all)')
+    parser.add_argument('--requests', type=int, default=30, help='Timed requests per scenario in client mode')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario in client mode')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent connections in http mode')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of load in http mode')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--report-cache', action='store_true', help='Keep the report cache enabled')
+    parser.add_argument('--output', default='endpoint-benchmark.json', help='Where to write the results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline instead of comparing')
+    parser.add_argument('--latency-threshold', type=float, default=0.25, help='Allowed p50 growth as a fraction')
+    parser.add_argument('--tail-threshold', type=float, default=0.5, help='Allowed p95 growth as a fraction')
+    parser.add_argument('--min-regression-ms', type=float, default=5.0, help='Ignore latency growth smaller than this')
+    parser.add_argument('--sql-threshold', type=float, default=0, help='Allowed growth in SQL statements per request')
+    parser.add_argument('--throughput-threshold', type=float, default=0.2, help='Allowed drop in http throughput as a fraction')
+    parser.add_argument('--verbose', action='store_true', help='Print failing requests')
+    args = parser.parse_args()
+
+    scenarios = list(SCENARIOS)
+    if args.scenarios:
+        wanted = [value.strip() for value in args.scenarios.split(',') if value.strip()]
+        scenarios = [name for name in scenarios if any(name == value or name.startswith(value) for value in wanted)]
+        if not scenarios:
+            parser.error('no scenario matches --scenarios')
+    if not os.path.exists(args.database):
+        parser.error(f'{args.database} does not exist; create it with benchmarks/generate_dataset.py')
+
+    workdir = None
+    path = os.path.abspath(args.database)
+    if not args.in_place:
+        workdir = tempfile.mkdtemp(prefix='endpoint-benchmark-', dir=os.path.dirname(path))
+        copy = os.path.join(workdir, 'benchmark.db')
+        source = sqlite3.connect(path)
+        target = sqlite3.connect(copy)
+        source.backup(target)
+        source.close()
+        target.close()
+        path = copy
+
+    try:
+        ctx = Context(path)
+        app = boot(path, args.report_cache)
+        results = {
+            'meta': {
+                'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'database': os.path.basename(args.database),
+                'dataset_rows': ctx.rows,
+                'report_cache': args.report_cache,
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+            }
+        }
+        if args.mode in ('client', 'both'):
+            print_header(f'client mode: {args.requests} requests per scenario')
+            results['client'] = run_client(app, ctx, scenarios, args)
+        if args.mode in ('http', 'both'):
+            print_header(f'http mode: {args.threads} connections for {args.duration:g}s')
+            results['http'] = run_http(app, ctx, scenarios, args)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return
+    if not os.path.exists(args.baseline):
+        print('No baseline to compare with; run with --save-baseline to create one')
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('meta', {}).get('dataset_rows') != ctx.rows:
+        print('Warning: the baseline was recorded against a different dataset')
+    regressions = compare(results, baseline, args)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) against {args.baseline}:')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
+    print(f'No regressions against {args.baseline}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic dataset generator for benchmarking.
+
+Builds a SQLite database with the application's schema, filled with
+categories, suppliers, products, orders, order items, purchase orders and
+the inventory ledger that explains every stock level:
+
+- SKU popularity follows a Zipf distribution (--zipf), so a few products
+  sell most of the units
+- order volume follows the calendar: yearly seasonality peaking in
+  December, quieter weekends, an afternoon peak and steady growth
+- every order line is an OUT ledger row, cancelled orders are restored
+  with an ORDER_CANCELLATION IN row, and each product opens with an
+  ADJUSTMENT for its starting stock
+- products that fall to their reorder level are replenished through
+  purchase orders to their supplier, received after its lead time as
+  PURCHASE_ORDER IN rows
+
+The same --seed and --end-date always produce the same rows. Tables are
+created from the models, their indexes are dropped while rows are loaded
+with executemany under bulk-load pragmas, and the application's startup
+then recreates the indexes, fills the search indexes and builds the
+derived tables (dashboard counters, stock movements, sales facts).
+
+    python benchmarks/generate_dataset.py --orders 5000000 --products 50000 --force
+    DATABASE_URL=sqlite:///src/database/benchmark.db python src/main.py
+"""
+import argparse
+import heapq
+import math
+import os
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from src.models.inventory import db
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'database', 'benchmark.db')
+BATCH_SIZE = 50000
+
+# Applied to the loading connection only: nothing is journaled or synced,
+# so an interrupted load leaves a database that must be regenerated
+BULK_PRAGMAS = {
+    'journal_mode': 'OFF',
+    'synchronous': 'OFF',
+    'locking_mode': 'EXCLUSIVE',
+    'temp_store': 'MEMORY',
+    'cache_size': -262144,
+    'foreign_keys': 'OFF',
+}
+
+COLUMNS = {
+    'categories': ('category_id', 'category_name', 'description', 'created_at'),
+    'suppliers': ('supplier_id', 'supplier_name', 'contact_person', 'email', 'phone', 'address', 'city', 'country', 'created_at'),
+    'products': ('product_id', 'product_name', 'description', 'category_id', 'unit_price', 'stock_level',
+                 'reorder_level', 'supplier_id', 'sku', 'created_at', 'updated_at'),
+    'orders': ('order_id', 'customer_name', 'customer_email', 'order_date', 'delivery_date', 'status', 'total_amount', 'notes'),
+    'order_items': ('order_item_id', 'order_id', 'product_id', 'quantity', 'unit_price', 'total_price'),
+    'purchase_orders': ('purchase_order_id', 'supplier_id', 'order_date', 'expected_delivery_date', 'status', 'total_amount', 'notes'),
+    'purchase_order_items': ('purchase_item_id', 'purchase_order_id', 'product_id', 'quantity', 'unit_cost', 'total_cost'),
+    'inventory_transactions': ('transaction_id', 'product_id', 'transaction_type', 'quantity', 'reference_type',
+                               'reference_id', 'notes', 'transaction_date'),
+}
+
+CITIES = [
+    ('San Francisco', 'USA'), ('New York', 'USA'), ('Chicago', 'USA'), ('Toronto', 'Canada'),
+    ('London', 'UK'), ('Berlin', 'Germany'), ('Rotterdam', 'Netherlands'), ('Shenzhen', 'China'),
+    ('Osaka', 'Japan'), ('Sydney', 'Australia'), ('Mumbai', 'India'), ('Monterrey', 'Mexico'),
+]
+# Relative order volume per hour of the day (UTC)
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 3, 5, 7, 9, 10, 10, 11, 12, 13, 14, 14, 13, 11, 9, 7, 5, 3, 2]
+QUANTITIES, QUANTITY_WEIGHTS = [1, 2, 3, 4, 5, 10], [50, 20, 12, 8, 6, 4]
+MEAN_QUANTITY = sum(q * w for q, w in zip(QUANTITIES, QUANTITY_WEIGHTS)) / sum(QUANTITY_WEIGHTS)
+
+class BulkWriter:
+    """Per-table row buffers inserted with executemany once they are large enough"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = {name: [] for name in COLUMNS}
+        self.counts = dict.fromkeys(COLUMNS, 0)
+        self.sql = {
+            name: f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+            for name, columns in COLUMNS.items()
+        }
+
+    def flush(self, min_rows=0):
+        """Insert every buffer holding at least min_rows rows"""
+        for name, rows in self.rows.items():
+            if rows and len(rows) >= min_rows:
+                self.conn.executemany(self.sql[name], rows)
+                self.counts[name] += len(rows)
+                rows.clear()
+
+def timestamp(day, seconds):
+    """Stored DateTime text for seconds after midnight of day, as SQLAlchemy writes it"""
+    hours, rest = divmod(seconds, 3600)
+    return f'{day.isoformat()} {hours:02d}:{rest // 60:02d}:{rest % 60:02d}.000000'
+
+def day_weights(start, days, growth):
+    """Relative order volume per day: yearly season, weekday pattern and growth"""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        season = 1 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365.25)
+        weekday = 0.75 if day.weekday() >= 5 else 1.0
+        weights.append(season * weekday * (1 + growth * offset / days))
+    return weights
+
+def spread(total, weights):
+    """Split total into integer parts proportional to weights (largest remainder)"""
+    scale = total / sum(weights)
+    parts = [int(weight * scale) for weight in weights]
+    remainders = sorted(range(len(weights)), key=lambda i: parts[i] - weights[i] * scale)
+    for i in remainders[:total - sum(parts)]:
+        parts[i] += 1
+    return parts
+
+def order_status(rng, age_days):
+    """Status of an order placed age_days before the end of the dataset"""
+    roll = rng.random()
+    if age_days >= 10:
+        return 'Delivered' if roll < 0.95 else 'Cancelled'
+    if age_days >= 3:
+        return 'Delivered' if roll < 0.45 else 'Shipped' if roll < 0.90 else 'Processing' if roll < 0.96 else 'Cancelled'
+    return 'Pending' if roll < 0.50 else 'Processing' if roll < 0.80 else 'Shipped' if roll < 0.95 else 'Cancelled'
+
+def prepare_schema(path):
+    """Create the application's tables in a new file and drop their indexes until the load is done"""
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS {index.name}')
+    engine.dispose()
+
+def generate(conn, args):
+    """Write every base table through conn and return the row counts"""
+    rng = random.Random(args.seed)
+    random_value, randrange = rng.random, rng.randrange
+    writer = BulkWriter(conn)
+    rows = writer.rows
+    items, ledger, orders = rows['order_items'], rows['inventory_transactions'], rows['orders']
+    end = args.end_date
+    start = end - timedelta(days=args.days)
+    created = timestamp(start - timedelta(days=1), 9 * 3600)
+
+    for category_id in range(1, args.categories + 1):
+        rows['categories'].append((category_id, f'Category {category_id:04d}', f'Synthetic category {category_id}', created))
+
+    lead_times = {}
+    for supplier_id in range(1, args.suppliers + 1):
+        city, country = CITIES[supplier_id % len(CITIES)]
+        lead_times[supplier_id] = rng.randint(3, 14)
+        rows['suppliers'].append((
+            supplier_id, f'Supplier {supplier_id:05d}', f'Contact {supplier_id}', f'orders@supplier{supplier_id}.example.com',
+            f'+1-555-{supplier_id % 10000:04d}', f'{supplier_id} Warehouse Road', city, country, created
+        ))
+
+    # Popularity rank r sells in proportion to 1 / r^s; ranks are shuffled
+    # over product ids so the best sellers are spread across the catalog
+    product_ids = list(range(1, args.products + 1))
+    ranked = product_ids[:]
+    rng.shuffle(ranked)
+    popularity = [1 / (rank ** args.zipf) for rank in range(1, args.products + 1)]
+    cum_popularity = list(accumulate(popularity))
+    popularity_total = cum_popularity[-1]
+    cum_quantity = list(accumulate(QUANTITY_WEIGHTS))
+    quantity_total = cum_quantity[-1]
+
+    mean_lines = args.items_per_order
+    daily_units = args.orders / args.days * mean_lines * MEAN_QUANTITY
+    price, supplier_of, stock, reorder_level, reorder_quantity = {}, {}, {}, {}, {}
+    for rank, product_id in enumerate(ranked):
+        supplier_id = rng.randint(1, args.suppliers)
+        demand = daily_units * popularity[rank] / popularity_total
+        supplier_of[product_id] = supplier_id
+        price[product_id] = round(min(5000.0, max(1.0, rng.lognormvariate(3.2, 0.9))), 2)
+        reorder_level[product_id] = max(5, math.ceil(demand * (lead_times[supplier_id] + 3)))
+        reorder_quantity[product_id] = max(10, math.ceil(demand * 30))
+        stock[product_id] = reorder_level[product_id] + reorder_quantity[product_id] + rng.randint(0, 20)
+
+    transaction_id = 0
+    opening = timestamp(start, 0)
+    for product_id in product_ids:
+        rows['products'].append((
+            product_id, f'Product {product_id:07d}', f'Synthetic product {product_id}', rng.randint(1, args.categories),
+            price[product_id], 0, reorder_level[product_id], supplier_of[product_id],
+            f'SKU-{product_id:08d}', created, created
+        ))
+        transaction_id += 1
+        ledger.append((transaction_id, product_id, 'ADJUSTMENT', stock[product_id], 'ADJUSTMENT', None, 'Opening balance', opening))
+
+    customers = max(100, args.orders // 8)
+    cum_hours = list(accumulate(HOUR_WEIGHTS))
+    continue_lines = 1 - 1 / mean_lines
+
+    order_id = order_item_id = purchase_order_id = purchase_item_id = 0
+    open_purchase_orders = {}  # purchase_order_id -> (supplier_id, order_date, expected, total, lines)
+    arrivals = []  # heap of (arrival day offset, purchase_order_id)
+    on_order = set()
+    needs_reorder = set()
+
+    for offset, count in enumerate(spread(args.orders, day_weights(start, args.days, args.growth))):
+        day = start + timedelta(days=offset)
+        age = args.days - offset
+
+        # Purchase orders due today are received in the morning
+        while arrivals and arrivals[0][0] <= offset:
+            _, po_id = heapq.heappop(arrivals)
+            supplier_id, ordered_at, expected, total, lines = open_purchase_orders.pop(po_id)
+            received = timestamp(day, 8 * 3600 + randrange(3600))
+            for product_id, quantity in lines:
+                stock[product_id] += quantity
+                on_order.discard(product_id)
+                transaction_id += 1
+                ledger.append((
+                    transaction_id, product_id, 'IN', quantity, 'PURCHASE_ORDER', po_id,
+                    f'Stock increased due to purchase order #{po_id}', received
+                ))
+            rows['purchase_orders'].append((po_id, supplier_id, ordered_at, expected, 'Delivered', total, None))
+
+        seconds = sorted(3600 * bisect(cum_hours, random_value() * cum_hours[-1]) + randrange(3600) for _ in range(count))
+        for second in seconds:
+            lines = 1
+            while lines < 20 and random_value() < continue_lines:
+                lines += 1
+            chosen = {}
+            for _ in range(lines):
+                product_id = ranked[bisect(cum_popularity, random_value() * popularity_total)]
+                wanted = QUANTITIES[bisect(cum_quantity, random_value() * quantity_total)]
+                quantity = min(wanted, stock[product_id] - chosen.get(product_id, 0))
+                if quantity > 0:
+                    chosen[product_id] = chosen.get(product_id, 0) + quantity
+            if not chosen:
+                continue  # every line was out of stock: a lost sale
+
+            order_id += 1
+            ordered_at = timestamp(day, second)
+            status = order_status(rng, age)
+            customer = int(customers * random_value() ** 2) + 1
+            delivery = (day + timedelta(days=rng.randint(2, 7))).isoformat() if status in ('Shipped', 'Delivered') else None
+            total = 0.0
+            note = f'Stock reduced due to order #{order_id}'
+            for product_id, quantity in chosen.items():
+                order_item_id += 1
+                transaction_id += 1
+                unit_price = price[product_id]
+                line_total = round(quantity * unit_price, 2)
+                total += line_total
+                stock[product_id] -= quantity
+                items.append((order_item_id, order_id, product_id, quantity, unit_price, line_total))
+                ledger.append((transaction_id, product_id, 'OUT', quantity, 'ORDER', order_id, note, ordered_at))
+            if status == 'Cancelled':
+                restored = timestamp(day, min(86399, second + rng.randint(600, 6 * 3600)))
+                note = f'Stock restored due to order #{order_id} cancellation'
+                for product_id, quantity in chosen.items():
+                    stock[product_id] += quantity
+                    transaction_id += 1
+                    ledger.append((transaction_id, product_id, 'IN', quantity, 'ORDER_CANCELLATION', order_id, note, restored))
+            else:
+                needs_reorder.update(
+                    product_id for product_id in chosen
+                    if stock[product_id] <= reorder_level[product_id] and product_id not in on_order
+                )
+            orders.append((
+                order_id, f'Customer {customer}', f'customer{customer}@example.com',
+                ordered_at, delivery, status, round(total, 2), None
+            ))
+
+        # One purchase order per supplier for everything that reached its reorder level today
+        by_supplier = {}
+        for product_id in sorted(needs_reorder):
+            by_supplier.setdefault(supplier_of[product_id], []).append((product_id, reorder_quantity[product_id]))
+        needs_reorder.clear()
+        for supplier_id, lines in sorted(by_supplier.items()):
+            purchase_order_id += 1
+            ordered_at = timestamp(day, 17 * 3600 + randrange(3600))
+            arrival = offset + lead_times[supplier_id] + rng.randint(-1, 2)
+            total = 0.0
+            for product_id, quantity in lines:
+                unit_cost = round(price[product_id] * 0.6, 2)
+                line_total = round(quantity * unit_cost, 2)
+                total += line_total
+                purchase_item_id += 1
+                rows['purchase_order_items'].append((purchase_item_id, purchase_order_id, product_id, quantity, unit_cost, line_total))
+                on_order.add(product_id)
+            expected = (day + timedelta(days=lead_times[supplier_id])).isoformat()
+            open_purchase_orders[purchase_order_id] = (supplier_id, ordered_at, expected, round(total, 2), lines)
+            heapq.heappush(arrivals, (arrival, purchase_order_id))
+
+        writer.flush(BATCH_SIZE)
+
+    # Purchase orders still on their way at the end of the dataset
+    in_transit_before = timestamp(end - timedelta(days=2), 0)
+    for po_id, (supplier_id, ordered_at, expected, total, _) in sorted(open_purchase_orders.items()):
+        status = 'In Transit' if ordered_at < in_transit_before else 'Pending'
+        rows['purchase_orders'].append((po_id, supplier_id, ordered_at, expected, status, total, None))
+
+    writer.flush()
+    conn.executemany('UPDATE products SET stock_level = ? WHERE product_id = ?',
+                     [(stock[product_id], product_id) for product_id in product_ids])
+    return writer.counts
+
+def build_derived(path):
+    """Run the application's startup against the loaded file.
+
+    It recreates the dropped indexes, creates and fills the search indexes
+    and builds the dashboard counters, stock movement totals and sales facts.
+    """
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from src.main import app
+    with app.app_context():
+        db.engine.dispose()
+
+def check_ledger(conn):
+    """Products whose stock level differs from the sum of their ledger rows"""
+    return conn.execute("""
+        SELECT COUNT(*) FROM products p
+        LEFT JOIN (
+            SELECT product_id, SUM(CASE WHEN transaction_type = 'OUT' THEN -quantity ELSE quantity END) AS net
+            FROM inventory_transactions GROUP BY product_id
+        ) t ON t.product_id = p.product_id
+        WHERE p.stock_level != COALESCE(t.net, 0)
+    """).fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--database', default=DEFAULT_PATH, help='SQLite file to create (default: src/database/benchmark.db)')
+    parser.add_argument('--force', action='store_true', help='Replace the file if it exists')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--suppliers', type=int, default=500)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--orders', type=int, default=500000)
+    parser.add_argument('--items-per-order', type=float, default=2.5, help='Mean order lines per order')
+    parser.add_argument('--days', type=int, default=730, help='Days of history ending at --end-date')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=datetime.utcnow().date(),
+                        help='Last day of history, YYYY-MM-DD (default: today, UTC)')
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent of SKU popularity')
+    parser.add_argument('--growth', type=float, default=0.4, help='Order volume growth over the whole period')
+    args = parser.parse_args()
+
+    if min(args.categories, args.suppliers, args.products, args.days) < 1 or args.orders < 0 or args.items_per_order < 1:
+        parser.error('counts must be positive and --items-per-order at least 1')
+    path = os.path.abspath(args.database)
+    if os.path.exists(path):
+        if not args.force:
+            parser.error(f'{path} exists; pass --force to replace it')
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    started = time.perf_counter()
+    prepare_schema(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    for name, value in BULK_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    conn.execute('BEGIN')
+    counts = generate(conn, args)
+    conn.execute('COMMIT')
+    conn.close()
+    loaded = time.perf_counter()
+    print(f'Loaded {sum(counts.values()):,} rows in {loaded - started:.1f}s')
+    for name, count in counts.items():
+        print(f'  {name:<24}{count:>14,}')
+
+    build_derived(path)
+    conn = sqlite3.connect(path)
+    conn.execute('ANALYZE')
+    drifted = check_ledger(conn)
+    conn.close()
+    print(f'Indexes, search indexes and derived tables built in {time.perf_counter() - loaded:.1f}s')
+    print(f"Ledger {'matches every' if not drifted else f'disagrees with {drifted}'} product stock level")
+    print(f'Database written to {path}')
+    if drifted:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Mixed read/write concurrency benchmark for the SQLite storage profile.
+
+Runs the same workload against two fresh database files:
+
+- default: the engine the app used to build (rollback journal,
+  synchronous=FULL, no pragmas)
+- tuned: the profile from src/utils/storage.py (WAL, synchronous=NORMAL,
+  busy_timeout, mmap, cache, foreign keys)
+
+Reader threads repeatedly run a sales-by-category style aggregate over
+order_items while writer threads place orders (order + items + stock
+update + ledger rows per transaction). Reports committed writes, completed
+reads, lock errors and latency percentiles for each profile.
+
+    python benchmarks/sqlite_concurrency.py --seconds 10 --readers 4 --writers 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from src.models.inventory import db
+from src.utils.storage import apply_sqlite_pragmas, engine_options, sqlite_pragmas
+
+READ_QUERY = text("""
+    SELECT c.category_name, COUNT(DISTINCT oi.order_id), SUM(oi.quantity), SUM(oi.total_price)
+    FROM categories c
+    JOIN products p ON p.category_id = c.category_id
+    JOIN order_items oi ON oi.product_id = p.product_id
+    GROUP BY c.category_id
+""")
+
+def build_engine(path, profile):
+    url = f'sqlite:///{path}'
+    if profile == 'default':
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+    return engine
+
+def seed(engine, products, items):
+    db.metadata.create_all(engine)
+    rng = random.Random(42)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(text('INSERT INTO categories (category_name) VALUES (:name)'),
+                     [{'name': f'Category {i}'} for i in range(10)])
+        conn.execute(text(
+            'INSERT INTO products (product_name, sku, category_id, unit_price, stock_level, reorder_level) '
+            'VALUES (:name, :sku, :category, :price, 1000000, 10)'
+        ), [
+            {'name': f'Product {i}', 'sku': f'BENCH-{i}', 'category': 1 + i % 10, 'price': rng.randint(1, 500)}
+            for i in range(products)
+        ])
+        orders = max(1, items // 4)
+        conn.execute(text(
+            "INSERT INTO orders (customer_name, order_date, status, total_amount) VALUES ('seed', :date, 'Delivered', 0)"
+        ), [{'date': now} for _ in range(orders)])
+        conn.execute(text(
+            'INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price) '
+            'VALUES (:order_id, :product_id, :quantity, 10, :total)'
+        ), [
+            {'order_id': 1 + i % orders, 'product_id': rng.randint(1, products), 'quantity': q, 'total': q * 10}
+            for i, q in ((i, rng.randint(1, 5)) for i in range(items))
+        ])
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run_profile(profile, args):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        engine = build_engine(path, profile)
+        seed(engine, args.products, args.items)
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        stats = {'reads': [], 'writes': [], 'read_errors': 0, 'write_errors': 0}
+
+        def reader():
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(READ_QUERY).all()
+                except OperationalError:
+                    with lock:
+                        stats['read_errors'] += 1
+                    continue
+                with lock:
+                    stats['reads'].append(time.perf_counter() - started)
+
+        def writer(seed_value):
+            rng = random.Random(seed_value)
+            while not stop.is_set():
+                lines = [(rng.randint(1, args.products), rng.randint(1, 3)) for _ in range(3)]
+                started = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        order_id = conn.execute(text(
+                            "INSERT INTO orders (customer_name, order_date, status, total_amount) "
+                            "VALUES ('bench', :date, 'Pending', 0) RETURNING order_id"
+                        ), {'date': datetime.now()}).scalar()
+                        conn.execute(text(
+                            'INSERT INTO order_items (order_id, product_id, quantity, unit_price, total_price) '
+                            'VALUES (:order_id, :product_id, :quantity, 10, :total)'
+                        ), [{'order_id': order_id, 'product_id': p, 'quantity': q, 'total': q * 10} for p, q in lines])
+                        conn.execute(text(
+                            'UPDATE products SET stock_level = stock_level - :quantity WHERE product_id = :product_id'
+                        ), [{'product_id': p, 'quantity': q} for p, q in lines])
+                        conn.execute(text(
+                            "INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, reference_id) "
+                            "VALUES (:product_id, 'OUT', :quantity, 'ORDER', :order_id)"
+                        ), [{'order_id': order_id, 'product_id': p, 'quantity': q} for p, q in lines])
+                except OperationalError:
+                    with lock:
+                        stats['write_errors'] += 1
+                    continue
+                with lock:
+                    stats['writes'].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+        threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+        return stats
+    finally:
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f'{args.readers} readers, {args.writers} writers, {args.seconds:g}s, '
+          f'{args.products} products, {args.items} order items')
+    print(f"{'profile':<9}{'writes/s':>10}{'write p50':>11}{'write p95':>11}{'reads/s':>9}"
+          f"{'read p50':>10}{'read p95':>10}{'locked':>8}")
+    for profile in ('default', 'tuned'):
+        stats = run_profile(profile, args)
+        writes, reads = stats['writes'], stats['reads']
+        print(f"{profile:<9}{len(writes) / args.seconds:>10.1f}"
+              f"{percentile(writes, 0.5) * 1000:>9.1f}ms{percentile(writes, 0.95) * 1000:>9.1f}ms"
+              f"{len(reads) / args.seconds:>9.1f}"
+              f"{percentile(reads, 0.5) * 1000:>8.1f}ms{percentile(reads, 0.95) * 1000:>8.1f}ms"
+              f"{stats['read_errors'] + stats['write_errors']:>8}")
+
+if __name__ == '__main__':
+    main()
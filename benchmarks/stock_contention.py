@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Stock contention check for every stock write path.
+
+Boots the application from src/main.py on a fresh SQLite file, gives a
+handful of hot SKUs a small opening stock and then has --threads workers,
+each with its own test client, hammer them with a random mix of
+
+- order placement (POST /api/orders, 1-3 hot SKUs per order)
+- cancellation (PUT /api/orders/<id>/status) and deletion of orders other
+  workers placed, so the same order is often cancelled or deleted twice
+- manual adjustments in both directions (POST .../adjust-stock)
+- purchase order receipts (POST .../receive), each attempted by two workers
+
+Afterwards it checks that no stock level went negative, that every stock
+level equals the net of its ledger rows, that the units the ledger took
+for orders are exactly the units of the orders still live, that every
+purchase order was received at most once, and that the movement totals,
+dashboard counters and sales facts match their base tables. Exits with
+status 1 on any violation or on a request that failed with a server error.
+
+    python benchmarks/stock_contention.py --threads 16 --operations 4000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+OPERATIONS = {'order': 60, 'cancel': 12, 'delete': 8, 'adjust': 12, 'receive': 8}
+
+def boot(path):
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ.setdefault('REPORT_CACHE_SIZE', '0')
+    os.environ.setdefault('SLOW_QUERY_MS', '0')
+    from src.main import app
+    return app
+
+def seed(client, products, stock, purchase_orders, rng):
+    """Create the hot SKUs with an opening ADJUSTMENT and pending purchase orders"""
+    category = client.post('/api/categories', json={'category_name': 'Contention'}).get_json()
+    supplier = client.post('/api/suppliers', json={'supplier_name': 'Contention Supplier'}).get_json()
+    product_ids = []
+    for i in range(products):
+        product = client.post('/api/products', json={
+            'product_name': f'Hot SKU {i}', 'sku': f'HOT-{i}', 'unit_price': 10 + i,
+            'category_id': category['category_id'], 'supplier_id': supplier['supplier_id'], 'reorder_level': stock // 4
+        }).get_json()
+        client.post(f'/api/products/{product["product_id"]}/adjust-stock', json={'adjustment': stock, 'notes': 'Opening stock'})
+        product_ids.append(product['product_id'])
+
+    purchase_order_ids = []
+    for _ in range(purchase_orders):
+        items = [
+            {'product_id': product_id, 'quantity': rng.randint(1, 10), 'unit_cost': 5}
+            for product_id in rng.sample(product_ids, rng.randint(1, len(product_ids)))
+        ]
+        response = client.post('/api/purchase-orders', json={'supplier_id': supplier['supplier_id'], 'items': items})
+        purchase_order_ids.append(response.get_json()['purchase_order_id'])
+    return product_ids, purchase_order_ids
+
+class Workload:
+    """Shared operation budget, placed order ids and per-operation outcomes"""
+
+    def __init__(self, operations, purchase_order_ids):
+        self.lock = threading.Lock()
+        self.remaining = operations
+        self.orders = []
+        self.receipts = purchase_order_ids * 2
+        self.outcomes = Counter()
+        self.errors = []
+
+    def take(self):
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def record(self, operation, response):
+        body = response.get_json(silent=True) or {}
+        status = response.status_code
+        if status == 500 and '404 Not Found' in str(body.get('error')):
+            status = 404  # get_or_404 inside the routes' catch-all handler
+        with self.lock:
+            self.outcomes[(operation, status)] += 1
+            if status >= 500:
+                self.errors.append((operation, body.get('error')))
+
+def worker(app, workload, product_ids, seed):
+    rng = random.Random(seed)
+    client = app.test_client()
+    names, weights = zip(*OPERATIONS.items())
+    while workload.take():
+        operation = rng.choices(names, weights)[0]
+        if operation == 'order':
+            items = [
+                {'product_id': product_id, 'quantity': rng.randint(1, 4)}
+                for product_id in rng.sample(product_ids, rng.randint(1, min(3, len(product_ids))))
+            ]
+            response = client.post('/api/orders', json={'customer_name': 'Contention', 'items': items})
+            if response.status_code == 201:
+                with workload.lock:
+                    workload.orders.append(response.get_json()['order_id'])
+        elif operation in ('cancel', 'delete'):
+            with workload.lock:
+                order_id = rng.choice(workload.orders) if workload.orders else None
+            if order_id is None:
+                continue
+            if operation == 'cancel':
+                response = client.put(f'/api/orders/{order_id}/status', json={'status': 'Cancelled'})
+            else:
+                response = client.delete(f'/api/orders/{order_id}')
+        elif operation == 'adjust':
+            adjustment = rng.choice((-1, 1)) * rng.randint(1, 5)
+            response = client.post(f'/api/products/{rng.choice(product_ids)}/adjust-stock', json={'adjustment': adjustment})
+        else:
+            with workload.lock:
+                if not workload.receipts:
+                    continue
+                purchase_order_id = workload.receipts.pop(rng.randrange(len(workload.receipts)))
+            response = client.post(f'/api/purchase-orders/{purchase_order_id}/receive')
+        workload.record(operation, response)
+
+def check_database(path):
+    """Violations of the stock invariants, read straight from the file"""
+    conn = sqlite3.connect(path)
+    problems = []
+    negative = conn.execute('SELECT product_id, stock_level FROM products WHERE stock_level < 0').fetchall()
+    if negative:
+        problems.append(f'negative stock: {negative}')
+    drifted = conn.execute("""
+        SELECT p.product_id, p.stock_level, COALESCE(t.net, 0) FROM products p
+        LEFT JOIN (
+            SELECT product_id, SUM(CASE WHEN transaction_type = 'OUT' THEN -quantity ELSE quantity END) AS net
+            FROM inventory_transactions GROUP BY product_id
+        ) t ON t.product_id = p.product_id
+        WHERE p.stock_level != COALESCE(t.net, 0)
+    """).fetchall()
+    if drifted:
+        problems.append(f'stock differs from ledger (product, stock, ledger): {drifted}')
+    oversold = conn.execute("""
+        SELECT t.product_id, t.taken, COALESCE(live.units, 0) FROM (
+            SELECT product_id, SUM(CASE WHEN reference_type = 'ORDER' THEN quantity ELSE -quantity END) AS taken
+            FROM inventory_transactions WHERE reference_type IN ('ORDER', 'ORDER_CANCELLATION') GROUP BY product_id
+        ) t LEFT JOIN (
+            SELECT oi.product_id, SUM(oi.quantity) AS units FROM order_items oi
+            JOIN orders o ON o.order_id = oi.order_id WHERE o.status != 'Cancelled' GROUP BY oi.product_id
+        ) live ON live.product_id = t.product_id
+        WHERE t.taken != COALESCE(live.units, 0)
+    """).fetchall()
+    if oversold:
+        problems.append(f'ledger units differ from live orders (product, ledger, orders): {oversold}')
+    receipts = conn.execute("""
+        SELECT po.purchase_order_id, po.status, COUNT(t.transaction_id), (
+            SELECT COUNT(*) FROM purchase_order_items i WHERE i.purchase_order_id = po.purchase_order_id
+        ) FROM purchase_orders po
+        LEFT JOIN inventory_transactions t ON t.reference_type = 'PURCHASE_ORDER' AND t.reference_id = po.purchase_order_id
+        GROUP BY po.purchase_order_id
+    """).fetchall()
+    for purchase_order_id, status, rows, items in receipts:
+        if rows != (items if status == 'Delivered' else 0):
+            problems.append(f'purchase order {purchase_order_id} ({status}) has {rows} receipt rows for {items} items')
+    conn.close()
+    return problems
+
+def check_derived(app):
+    """Derived tables that drifted from their base tables"""
+    from src.models.inventory import db
+    from src.services import counters, ledger, sales_facts
+    problems = []
+    with app.app_context():
+        if ledger.mismatches():
+            problems.append(f'movement totals drifted for products {ledger.mismatches()}')
+        drifted = counters.mismatches(counters.stored_totals(), counters.live_totals())
+        if drifted:
+            problems.append(f'dashboard counters drifted: {drifted}')
+        if sales_facts.mismatches():
+            problems.append('sales facts drifted')
+        db.session.remove()
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--operations', type=int, default=4000, help='Requests across all workers')
+    parser.add_argument('--products', type=int, default=5, help='Hot SKUs every worker competes for')
+    parser.add_argument('--stock', type=int, default=200, help='Opening stock per hot SKU')
+    parser.add_argument('--purchase-orders', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    args = parser.parse_args()
+
+    directory = None
+    path = args.database
+    if path is None:
+        directory = tempfile.mkdtemp(prefix='stock-contention-')
+        path = os.path.join(directory, 'contention.db')
+    elif os.path.exists(path):
+        parser.error(f'{path} already exists')
+
+    app = boot(path)
+    rng = random.Random(args.seed)
+    product_ids, purchase_order_ids = seed(app.test_client(), args.products, args.stock, args.purchase_orders, rng)
+
+    workload = Workload(args.operations, purchase_order_ids)
+    threads = [
+        threading.Thread(target=worker, args=(app, workload, product_ids, args.seed * 1000 + i))
+        for i in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f'{args.operations} operations from {args.threads} threads on {args.products} SKUs in {elapsed:.1f}s')
+    for operation in OPERATIONS:
+        statuses = {status: count for (name, status), count in workload.outcomes.items() if name == operation}
+        print(f'  {operation:8} ' + ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items())))
+
+    problems = check_database(path) + check_derived(app)
+    problems += [f'{operation} failed: {error}' for operation, error in workload.errors[:10]]
+    if len(workload.errors) > 10:
+        problems.append(f'... and {len(workload.errors) - 10} more server errors')
+    for problem in problems:
+        print(f'FAIL {problem}')
+    if not problems:
+        print('OK no oversells, stock matches the ledger, derived tables match')
+    if directory:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    sys.exit(1 if problems else 0)
+
+if __name__ == '__main__':
+    main()
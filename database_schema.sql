@@ -104,37 +104,21 @@ CREATE TABLE IF NOT EXISTS inventory_transactions (
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id);
 CREATE INDEX IF NOT EXISTS idx_products_supplier ON products(supplier_id);
 CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock_level);
+CREATE INDEX IF NOT EXISTS idx_products_shortage ON products((reorder_level - stock_level) DESC) WHERE stock_level <= reorder_level;
 CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
 CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id);
+CREATE INDEX IF NOT EXISTS idx_purchase_order_items_order ON purchase_order_items(purchase_order_id);
 CREATE INDEX IF NOT EXISTS idx_inventory_transactions_product ON inventory_transactions(product_id);
 CREATE INDEX IF NOT EXISTS idx_inventory_transactions_date ON inventory_transactions(transaction_date);
+CREATE INDEX IF NOT EXISTS idx_inventory_transactions_date_id ON inventory_transactions(transaction_date, transaction_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_transactions_product_date ON inventory_transactions(product_id, transaction_date);
+CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date, order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status_date_total ON orders(status, order_date, total_amount);
+CREATE INDEX IF NOT EXISTS idx_purchase_orders_date ON purchase_orders(order_date, purchase_order_id);
 
--- Create triggers to update product stock levels automatically
-CREATE TRIGGER IF NOT EXISTS update_stock_after_sale
-    AFTER INSERT ON order_items
-    WHEN NEW.quantity > 0
-BEGIN
-    UPDATE products 
-    SET stock_level = stock_level - NEW.quantity,
-        updated_at = CURRENT_TIMESTAMP
-    WHERE product_id = NEW.product_id;
-    
-    INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, reference_id, notes)
-    VALUES (NEW.product_id, 'OUT', NEW.quantity, 'ORDER', NEW.order_id, 'Stock reduced due to sale');
-END;
-
-CREATE TRIGGER IF NOT EXISTS update_stock_after_purchase
-    AFTER INSERT ON purchase_order_items
-    WHEN NEW.quantity > 0
-BEGIN
-    UPDATE products 
-    SET stock_level = stock_level + NEW.quantity,
-        updated_at = CURRENT_TIMESTAMP
-    WHERE product_id = NEW.product_id;
-    
-    INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, reference_id, notes)
-    VALUES (NEW.product_id, 'IN', NEW.quantity, 'PURCHASE_ORDER', NEW.purchase_order_id, 'Stock increased due to purchase');
-END;
+-- Stock levels and their inventory_transactions rows are written by the
+-- application (src/services/stock.py) in the same transaction as the order
+-- or purchase order, never by triggers, so each movement is counted once.
 
 -- Create trigger to update order total
 CREATE TRIGGER IF NOT EXISTS update_order_total
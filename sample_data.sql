@@ -103,3 +103,27 @@ INSERT INTO purchase_order_items (purchase_order_id, product_id, quantity, unit_
 (3, 12, 15, 30.00, 450.00),   -- 15 Desk Lamp
 (3, 14, 8, 85.00, 680.00);    -- 8 Bookshelf
 
+
+-- Record stock movements the way the application does (there are no stock
+-- triggers): the listed levels are opening stock, then the sample orders
+-- take their units and the delivered purchase order adds its own
+INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, notes)
+SELECT product_id, 'ADJUSTMENT', stock_level, 'ADJUSTMENT', 'Opening stock' FROM products;
+
+INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, reference_id, notes)
+SELECT order_items.product_id, 'OUT', order_items.quantity, 'ORDER', order_items.order_id,
+       'Stock reduced due to order #' || order_items.order_id
+FROM order_items JOIN orders ON orders.order_id = order_items.order_id
+WHERE orders.status != 'Cancelled';
+
+INSERT INTO inventory_transactions (product_id, transaction_type, quantity, reference_type, reference_id, notes)
+SELECT purchase_order_items.product_id, 'IN', purchase_order_items.quantity, 'PURCHASE_ORDER', purchase_order_items.purchase_order_id,
+       'Stock increased due to purchase order #' || purchase_order_items.purchase_order_id
+FROM purchase_order_items JOIN purchase_orders ON purchase_orders.purchase_order_id = purchase_order_items.purchase_order_id
+WHERE purchase_orders.status = 'Delivered';
+
+UPDATE products SET stock_level = (
+    SELECT SUM(CASE WHEN transaction_type = 'OUT' THEN -quantity ELSE quantity END)
+    FROM inventory_transactions
+    WHERE inventory_transactions.product_id = products.product_id
+);
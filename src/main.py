@@ -5,11 +5,21 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from src.models.inventory import db
+from src.models.inventory import db, create_missing_indexes, drop_legacy_stock_triggers
+from src.models.search import create_search_indexes
+from src.services.counters import ensure_counters
+from src.services.jobs import init_report_jobs
+from src.services.ledger import ensure_movements
+from src.services.metrics import init_metrics
+from src.services.sales_facts import ensure_facts
+from src.services.slow_queries import init_slow_query_log
+from src.utils.storage import init_storage
 from src.routes.products import products_bp
 from src.routes.orders import orders_bp
 from src.routes.suppliers import suppliers_bp
 from src.routes.reports import reports_bp
+from src.routes.metrics import metrics_bp
+from src.routes.admin import admin_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -22,13 +32,47 @@ app.register_blueprint(products_bp, url_prefix='/api')
 app.register_blueprint(orders_bp, url_prefix='/api')
 app.register_blueprint(suppliers_bp, url_prefix='/api')
 app.register_blueprint(reports_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api')
 
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# Database URL, SQLite pragmas and pool sizing come from the environment (see src/utils/storage.py)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
+# Seconds to cache /api/orders/stats responses; 0 disables the cache
+app.config['ORDER_STATS_CACHE_TTL'] = int(os.environ.get('ORDER_STATS_CACHE_TTL', 0))
+# Entries kept by the report cache; 0 disables it
+app.config['REPORT_CACHE_SIZE'] = int(os.environ.get('REPORT_CACHE_SIZE', 256))
+# Per-endpoint request/SQL metrics at /api/metrics; SERVER_TIMING adds a Server-Timing header
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0').lower() in ('1', 'true', 'yes')
+# Statements slower than SLOW_QUERY_MS (0 disables) are kept with their plan at /api/admin/slow-queries
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 250))
+app.config['SLOW_QUERY_BUFFER'] = int(os.environ.get('SLOW_QUERY_BUFFER', 200))
+app.config['SLOW_QUERY_LOG'] = os.environ.get('SLOW_QUERY_LOG')
+# Bearer token for /api/admin; the admin endpoints are disabled without one
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+# Background report jobs: concurrent workers, jobs allowed to wait, seconds results are kept
+# and the nice value of the worker threads (0 keeps them at normal CPU priority)
+app.config['REPORT_JOB_WORKERS'] = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+app.config['REPORT_JOB_QUEUE'] = int(os.environ.get('REPORT_JOB_QUEUE', 16))
+app.config['REPORT_JOB_TTL'] = int(os.environ.get('REPORT_JOB_TTL', 600))
+app.config['REPORT_JOB_NICE'] = int(os.environ.get('REPORT_JOB_NICE', 10))
+# Product attributes cached for order and purchase order lookups: entries, seconds kept; 0 entries disables
+app.config['PRODUCT_CACHE_SIZE'] = int(os.environ.get('PRODUCT_CACHE_SIZE', 4096))
+app.config['PRODUCT_CACHE_TTL'] = int(os.environ.get('PRODUCT_CACHE_TTL', 300))
+# Threads fitting demand forecasts in parallel (default: one per CPU)
+app.config['FORECAST_WORKERS'] = int(os.environ.get('FORECAST_WORKERS', 0)) or os.cpu_count()
+init_storage(app, db)
+init_metrics(app)
+init_slow_query_log(app)
+init_report_jobs(app)
 with app.app_context():
     db.create_all()
+    create_missing_indexes()
+    drop_legacy_stock_triggers()
+    create_search_indexes()
+    ensure_counters()
+    ensure_movements()
+    ensure_facts()
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
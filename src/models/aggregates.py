@@ -0,0 +1,83 @@
+from src.models.inventory import db
+
+class DashboardCounters(db.Model):
+    """Single-row table of running totals behind /reports/dashboard-stats.
+    
+    Every write path adjusts these in the same transaction as its own
+    changes (see src/services/counters.py), so the dashboard never has to
+    aggregate the base tables.
+    """
+    __tablename__ = 'dashboard_counters'
+    
+    counter_id = db.Column(db.Integer, primary_key=True)
+    total_products = db.Column(db.Integer, nullable=False, default=0)
+    low_stock_count = db.Column(db.Integer, nullable=False, default=0)
+    total_inventory_value = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    total_orders = db.Column(db.Integer, nullable=False, default=0)
+    pending_orders = db.Column(db.Integer, nullable=False, default=0)
+    total_revenue = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    total_categories = db.Column(db.Integer, nullable=False, default=0)
+    total_suppliers = db.Column(db.Integer, nullable=False, default=0)
+    rebuilt_at = db.Column(db.DateTime)
+
+class TableVersion(db.Model):
+    """Write version of one table, bumped by every transaction that changes it.
+    
+    Maintained by src/services/versions.py; caches of data read from a table
+    compare the version they were built at with the current one.
+    """
+    __tablename__ = 'table_versions'
+    
+    table_name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime)
+
+class StockSnapshot(db.Model):
+    """Stock level of every product at the end of one (UTC) day.
+    
+    Written by the compaction job in src/services/snapshots.py. Daily rows
+    are kept for a retention window, month-end rows indefinitely. No
+    foreign key: snapshots outlive deleted products.
+    """
+    __tablename__ = 'stock_snapshots'
+    
+    snapshot_date = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, primary_key=True)
+    stock_level = db.Column(db.Integer, nullable=False)
+
+class ProductStockMovement(db.Model):
+    """Per-product running totals of the inventory ledger.
+    
+    Updated with every ledger insert by src/services/ledger.py, so
+    /reports/stock-movement reads one row per product instead of grouping
+    inventory_transactions.
+    """
+    __tablename__ = 'product_stock_movements'
+    
+    product_id = db.Column(db.Integer, primary_key=True)
+    total_received = db.Column(db.Integer, nullable=False, default=0)
+    total_sold = db.Column(db.Integer, nullable=False, default=0)
+    total_adjustments = db.Column(db.Integer, nullable=False, default=0)
+    total_transactions = db.Column(db.Integer, nullable=False, default=0)
+    last_transaction_at = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('idx_stock_movements_transactions', 'total_transactions'),
+        db.Index('idx_stock_movements_sold', 'total_sold'),
+    )
+
+class SalesFact(db.Model):
+    """Orders, revenue and units sold per period and order status.
+    
+    One row per (grain, period_start, status) for the day, week (starting
+    Monday) and month grains, adjusted by every order write through
+    src/services/sales_facts.py.
+    """
+    __tablename__ = 'sales_facts'
+    
+    grain = db.Column(db.String(10), primary_key=True)
+    period_start = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    items_sold = db.Column(db.Integer, nullable=False, default=0)
@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from decimal import Decimal
+from sqlalchemy import inspect
 
 db = SQLAlchemy()
 
+# Accepted values for the include_items option of Order/PurchaseOrder.to_dict()
+ITEM_MODES = ('false', 'summary', 'full')
+
 class Category(db.Model):
     __tablename__ = 'categories'
     
@@ -68,6 +72,19 @@ class Product(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_products_category', 'category_id'),
+        db.Index('idx_products_supplier', 'supplier_id'),
+        db.Index('idx_products_stock', 'stock_level'),
+        # Partial index holding only products at or below their reorder level,
+        # in shortage order, so the low-inventory report is read without a sort
+        db.Index(
+            'idx_products_shortage',
+            db.text('(reorder_level - stock_level) DESC'),
+            sqlite_where=db.text('stock_level <= reorder_level')
+        ),
+    )
+    
     # Relationships
     order_items = db.relationship('OrderItem', backref='product', lazy=True)
     purchase_order_items = db.relationship('PurchaseOrderItem', backref='product', lazy=True)
@@ -103,11 +120,18 @@ class Order(db.Model):
     total_amount = db.Column(db.Numeric(10, 2), default=0)
     notes = db.Column(db.Text)
     
+    __table_args__ = (
+        db.Index('idx_orders_date', 'order_date', 'order_id'),
+        # Covers the grouped order statistics, with or without a date window
+        db.Index('idx_orders_status_date_total', 'status', 'order_date', 'total_amount'),
+    )
+    
     # Relationships
     order_items = db.relationship('OrderItem', backref='order', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_items='full', product_names=None):
+        """product_names ({product_id: name}) spares the lazy load of each line's product"""
+        data = {
             'order_id': self.order_id,
             'customer_name': self.customer_name,
             'customer_email': self.customer_email,
@@ -115,9 +139,14 @@ class Order(db.Model):
             'delivery_date': self.delivery_date.isoformat() if self.delivery_date else None,
             'status': self.status,
             'total_amount': float(self.total_amount) if self.total_amount else 0,
-            'notes': self.notes,
-            'items': [item.to_dict() for item in self.order_items]
+            'notes': self.notes
         }
+        if include_items == 'full':
+            data['items'] = [item.to_dict(product_names) for item in self.order_items]
+        elif include_items == 'summary':
+            data['item_count'] = len(self.order_items)
+            data['total_quantity'] = sum(item.quantity for item in self.order_items)
+        return data
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
@@ -129,12 +158,20 @@ class OrderItem(db.Model):
     unit_price = db.Column(db.Numeric(10, 2), nullable=False)
     total_price = db.Column(db.Numeric(10, 2), nullable=False)
     
-    def to_dict(self):
+    __table_args__ = (
+        # Batched item loading selects lines by order_id IN (...)
+        db.Index('idx_order_items_order', 'order_id'),
+        db.Index('idx_order_items_product', 'product_id'),
+    )
+    
+    def to_dict(self, product_names=None):
         return {
             'order_item_id': self.order_item_id,
             'order_id': self.order_id,
             'product_id': self.product_id,
-            'product_name': self.product.product_name if self.product else None,
+            'product_name': product_names.get(self.product_id) if product_names is not None else (
+                self.product.product_name if self.product else None
+            ),
             'quantity': self.quantity,
             'unit_price': float(self.unit_price) if self.unit_price else 0,
             'total_price': float(self.total_price) if self.total_price else 0
@@ -151,11 +188,16 @@ class PurchaseOrder(db.Model):
     total_amount = db.Column(db.Numeric(10, 2), default=0)
     notes = db.Column(db.Text)
     
+    __table_args__ = (
+        db.Index('idx_purchase_orders_date', 'order_date', 'purchase_order_id'),
+    )
+    
     # Relationships
     purchase_order_items = db.relationship('PurchaseOrderItem', backref='purchase_order', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_items='full', product_names=None):
+        """product_names ({product_id: name}) spares the lazy load of each line's product"""
+        data = {
             'purchase_order_id': self.purchase_order_id,
             'supplier_id': self.supplier_id,
             'supplier_name': self.supplier.supplier_name if self.supplier else None,
@@ -163,9 +205,14 @@ class PurchaseOrder(db.Model):
             'expected_delivery_date': self.expected_delivery_date.isoformat() if self.expected_delivery_date else None,
             'status': self.status,
             'total_amount': float(self.total_amount) if self.total_amount else 0,
-            'notes': self.notes,
-            'items': [item.to_dict() for item in self.purchase_order_items]
+            'notes': self.notes
         }
+        if include_items == 'full':
+            data['items'] = [item.to_dict(product_names) for item in self.purchase_order_items]
+        elif include_items == 'summary':
+            data['item_count'] = len(self.purchase_order_items)
+            data['total_quantity'] = sum(item.quantity for item in self.purchase_order_items)
+        return data
 
 class PurchaseOrderItem(db.Model):
     __tablename__ = 'purchase_order_items'
@@ -177,12 +224,18 @@ class PurchaseOrderItem(db.Model):
     unit_cost = db.Column(db.Numeric(10, 2), nullable=False)
     total_cost = db.Column(db.Numeric(10, 2), nullable=False)
     
-    def to_dict(self):
+    __table_args__ = (
+        db.Index('idx_purchase_order_items_order', 'purchase_order_id'),
+    )
+    
+    def to_dict(self, product_names=None):
         return {
             'purchase_item_id': self.purchase_item_id,
             'purchase_order_id': self.purchase_order_id,
             'product_id': self.product_id,
-            'product_name': self.product.product_name if self.product else None,
+            'product_name': product_names.get(self.product_id) if product_names is not None else (
+                self.product.product_name if self.product else None
+            ),
             'quantity': self.quantity,
             'unit_cost': float(self.unit_cost) if self.unit_cost else 0,
             'total_cost': float(self.total_cost) if self.total_cost else 0
@@ -194,12 +247,17 @@ class InventoryTransaction(db.Model):
     transaction_id = db.Column(db.Integer, primary_key=True)
     product_id = db.Column(db.Integer, db.ForeignKey('products.product_id'), nullable=False)
     transaction_type = db.Column(db.String(20), nullable=False)  # 'IN', 'OUT', 'ADJUSTMENT'
-    quantity = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)  # IN/OUT: units moved; ADJUSTMENT: signed change
     reference_type = db.Column(db.String(50))  # 'ORDER', 'PURCHASE_ORDER', 'ADJUSTMENT'
     reference_id = db.Column(db.Integer)
     notes = db.Column(db.Text)
     transaction_date = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('idx_inventory_transactions_date_id', 'transaction_date', 'transaction_id'),
+        db.Index('idx_inventory_transactions_product_date', 'product_id', 'transaction_date'),
+    )
+    
     def to_dict(self):
         return {
             'transaction_id': self.transaction_id,
@@ -213,3 +271,37 @@ class InventoryTransaction(db.Model):
             'transaction_date': self.transaction_date.isoformat() if self.transaction_date else None
         }
 
+def create_missing_indexes():
+    """Create indexes declared on the models that an existing database lacks.
+    
+    db.create_all() only emits CREATE INDEX together with CREATE TABLE, so
+    databases built before an index was added would never receive it.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        # Reflection skips expression indexes, so read the names directly
+        with db.engine.connect() as conn:
+            existing = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    else:
+        inspector = inspect(db.engine)
+        existing = {
+            index['name']
+            for table in db.metadata.sorted_tables
+            for index in inspector.get_indexes(table.name)
+        }
+    
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+
+# Triggers that older schemas used to move stock; the application now does it
+# (src/services/stock.py), so a database that still has them counts twice
+LEGACY_STOCK_TRIGGERS = ('update_stock_after_sale', 'update_stock_after_purchase')
+
+def drop_legacy_stock_triggers():
+    """Drop the stock triggers a database built from an older schema still has"""
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as conn:
+        for name in LEGACY_STOCK_TRIGGERS:
+            conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
@@ -0,0 +1,96 @@
+"""SQLite FTS5 full-text search indexes for products and suppliers.
+
+Each index is an external-content FTS5 table over its source table, kept in
+sync by INSERT/UPDATE/DELETE triggers, so every write path (ORM, bulk SQL,
+catalog import) updates it in the same transaction. On databases without
+FTS5 the list endpoints fall back to LIKE matching.
+"""
+import re
+from flask import current_app
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from src.models.inventory import db
+
+# fts table -> (source table, primary key, indexed columns, bm25 column weights)
+SEARCH_INDEXES = {
+    'products_fts': ('products', 'product_id', ('product_name', 'sku', 'description'), (10.0, 5.0, 1.0)),
+    'suppliers_fts': ('suppliers', 'supplier_id', ('supplier_name', 'contact_person', 'email'), (10.0, 5.0, 2.0)),
+}
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+def _index_ddl(fts_table, source, key, columns):
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {cols}, content='{source}', content_rowid='{key}',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{key}, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{key}, {old_values});
+        END""",
+        # Only fire when an indexed column changes, not on every stock update
+        f"""CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {source} BEGIN
+            INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.{key}, {old_values});
+            INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.{key}, {new_values});
+        END""",
+    ]
+
+def create_search_indexes():
+    """Create the FTS5 tables and sync triggers if missing, and fill new ones.
+
+    Must run inside an application context after db.create_all(). Records
+    the indexes that are usable in app.extensions['search_indexes'].
+    """
+    available = set()
+    current_app.extensions['search_indexes'] = available
+    if db.engine.dialect.name != 'sqlite':
+        return available
+
+    with db.engine.begin() as conn:
+        for fts_table, (source, key, columns, _) in SEARCH_INDEXES.items():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': fts_table}
+            ).first()
+            try:
+                for statement in _index_ddl(fts_table, source, key, columns):
+                    conn.execute(text(statement))
+            except OperationalError:
+                # SQLite built without FTS5
+                continue
+            if not exists:
+                conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+            available.add(fts_table)
+    return available
+
+def match_expression(term):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    tokens = _TOKEN.findall(term)
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+def apply_search(query, model, fts_table, term, like_columns):
+    """Filter query to rows matching term, ranked by BM25 when FTS5 is available.
+
+    Falls back to the substring LIKE filter over like_columns when the index
+    is missing or the term contains no searchable words.
+    """
+    expression = match_expression(term)
+    if not expression or fts_table not in current_app.extensions.get('search_indexes', ()):
+        return query.filter(or_(*[col.contains(term) for col in like_columns]))
+
+    _, key, _, weights = SEARCH_INDEXES[fts_table]
+    fts = table(fts_table, column('rowid'))
+    matches = select(
+        fts.c.rowid.label('rowid'),
+        func.bm25(literal_column(fts_table), *weights).label('rank')
+    ).where(literal_column(fts_table).op('MATCH')(expression)).subquery()
+
+    return query.join(matches, getattr(model, key) == matches.c.rowid).order_by(
+        matches.c.rank, getattr(model, key)
+    )
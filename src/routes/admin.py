@@ -0,0 +1,56 @@
+import hmac
+from flask import Blueprint, current_app, request, jsonify
+from src.services.slow_queries import get_slow_query_log
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.before_request
+def require_admin_token():
+    """Admin endpoints expose statement parameters, so they need ADMIN_TOKEN as a bearer token.
+
+    Without a configured token they are disabled.
+    """
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({'error': 'Admin endpoints are disabled; set ADMIN_TOKEN to enable them'}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return jsonify({'error': 'Missing or invalid admin token'}), 401
+
+@admin_bp.route('/admin/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """Recorded slow statements, newest first"""
+    try:
+        log = get_slow_query_log()
+        if log is None:
+            return jsonify({'error': 'Slow-query recording is disabled'}), 404
+        
+        limit = request.args.get('limit', 50, type=int)
+        endpoint = request.args.get('endpoint')
+        flagged = request.args.get('flagged', 'false').lower() == 'true'
+        
+        entries = log.snapshot()[::-1]
+        if endpoint:
+            entries = [entry for entry in entries if entry['endpoint'] == endpoint]
+        if flagged:
+            entries = [entry for entry in entries if entry['full_scans'] or entry['temp_btrees']]
+        
+        return jsonify({
+            'stats': log.stats(),
+            'slow_queries': entries[:max(limit, 0)]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/admin/slow-queries', methods=['DELETE'])
+def clear_slow_queries():
+    """Empty the slow-query buffer and its cached plans"""
+    try:
+        log = get_slow_query_log()
+        if log is None:
+            return jsonify({'error': 'Slow-query recording is disabled'}), 404
+        
+        log.clear()
+        return jsonify({'message': 'Slow-query log cleared'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,16 @@
+from flask import Blueprint, Response, jsonify
+from src.services.metrics import CONTENT_TYPE, get_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and SQL metrics in Prometheus text format"""
+    try:
+        registry = get_metrics()
+        if registry is None:
+            return jsonify({'error': 'Metrics are disabled'}), 404
+        
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
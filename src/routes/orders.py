@@ -1,20 +1,311 @@
-from flask import Blueprint, request, jsonify
-from src.models.inventory import db, Order, OrderItem, Product, InventoryTransaction
-from datetime import datetime, date
-from decimal import Decimal
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from src.models.inventory import db, Order, OrderItem, Product, ITEM_MODES
+from src.services import counters, sales_facts, stock
+from src.services.conditional import conditional_get
+from src.services.product_cache import get_product_cache
+from src.utils.cache import LRUCache
+from src.utils.pagination import CursorError, paginate_request
+from src.utils.streaming import read_ndjson
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import selectinload
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+import json
 
 orders_bp = Blueprint('orders', __name__)
 
+BULK_ORDER_BATCH_SIZE = 500
+BULK_ORDER_MAX_BATCH_SIZE = 1000
+BULK_ORDER_RETRIES = 3
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+
+# Keyed by the requested date window; entries live ORDER_STATS_CACHE_TTL seconds
+_stats_cache = LRUCache(max_size=256)
+
+def order_query(include_items='full'):
+    """Order query that batch-loads what Order.to_dict(include_items) reads.
+
+    Items are fetched with one IN query per page of orders and their product
+    names are joined into that same query, instead of one lazy load per order
+    and another per line item.
+    """
+    query = Order.query
+    if include_items == 'full':
+        query = query.options(
+            selectinload(Order.order_items).joinedload(OrderItem.product)
+        )
+    elif include_items == 'summary':
+        query = query.options(selectinload(Order.order_items))
+    return query
+
+class OrderError(Exception):
+    """Order validation or stock failure that is reported to the client"""
+    
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def parse_order_lines(items):
+    """Validate raw order items and return (product_id, quantity, unit_price) tuples"""
+    if not items:
+        raise OrderError('Order must contain at least one item')
+    
+    lines = []
+    for item_data in items:
+        if 'product_id' not in item_data or 'quantity' not in item_data:
+            raise OrderError('Each item must have product_id and quantity')
+        
+        try:
+            product_id = int(item_data['product_id'])
+            quantity = int(item_data['quantity'])
+        except (TypeError, ValueError):
+            raise OrderError('product_id and quantity must be integers')
+        if quantity <= 0:
+            raise OrderError('Quantity must be positive')
+        
+        unit_price = item_data.get('unit_price')
+        if unit_price is not None:
+            try:
+                unit_price = Decimal(str(unit_price))
+            except InvalidOperation:
+                raise OrderError(f'Invalid unit_price: {unit_price}')
+            if not unit_price.is_finite() or unit_price < 0:
+                raise OrderError(f'Invalid unit_price: {unit_price}')
+        
+        lines.append((product_id, quantity, unit_price))
+    return lines
+
+def load_products(product_ids):
+    """Cached attributes of every referenced product; misses are read with a single IN query"""
+    return get_product_cache().lookup(product_ids)
+
+def load_stock_levels(product_ids):
+    """Current stock of every referenced product with a single IN query"""
+    return dict(db.session.execute(
+        select(Product.product_id, Product.stock_level).where(Product.product_id.in_(set(product_ids)))
+    ).all())
+
+def check_stock(lines, products, stock_levels=None, reserved=None):
+    """Price order lines and verify stock availability.
+    
+    products comes from load_products(). Without stock_levels only prices
+    and product existence are checked, and the guarded UPDATE in
+    stock.apply() refuses an oversell. reserved maps product_id to quantity
+    already promised to earlier orders in the same transaction. Returns
+    (priced_lines, total_amount, demand), where demand is the total
+    quantity requested per product.
+    """
+    reserved = reserved or {}
+    demand = {}
+    priced_lines = []
+    total_amount = Decimal('0')
+    
+    for product_id, quantity, unit_price in lines:
+        product = products.get(product_id)
+        if not product:
+            raise OrderError(f'Product {product_id} not found', 404)
+        
+        if stock_levels is not None:
+            available = stock_levels.get(product_id, 0) - reserved.get(product_id, 0) - demand.get(product_id, 0)
+            if available < quantity:
+                raise OrderError(
+                    f'Insufficient stock for {product.product_name}. Available: {available}, Requested: {quantity}'
+                )
+        demand[product_id] = demand.get(product_id, 0) + quantity
+        
+        unit_price = Decimal(str(unit_price if unit_price is not None else product.unit_price))
+        total_price = unit_price * quantity
+        priced_lines.append((product_id, quantity, unit_price, total_price))
+        total_amount += total_price
+    
+    return priced_lines, total_amount, demand
+
+def claim_order(order_id, expected_status, new_status):
+    """Move an order from expected_status to new_status with a guarded UPDATE.
+    
+    The status condition is evaluated by the database, so two requests that
+    both read a Pending order cannot both cancel or delete it and restore
+    its stock twice. Raises OrderError unless the order was still in
+    expected_status.
+    """
+    result = db.session.execute(
+        update(Order)
+        .where(Order.order_id == order_id, Order.status == expected_status)
+        .values(status=new_status)
+    )
+    if result.rowcount != 1:
+        raise OrderError('Order changed while the request was being processed, please retry', 409)
+
+def restore_stock(order):
+    """Return a cancelled or deleted order's units to stock, with IN ledger rows"""
+    stock.apply([
+        {
+            'product_id': item.product_id,
+            'transaction_type': 'IN',
+            'quantity': item.quantity,
+            'reference_type': 'ORDER_CANCELLATION',
+            'reference_id': order.order_id,
+            'notes': f'Stock restored due to order #{order.order_id} cancellation'
+        }
+        for item in order.order_items
+    ])
+
+def insert_order_lines(order_lines):
+    """Bulk-insert order items and take their stock with OUT ledger rows.
+    
+    order_lines is an iterable of (order_id, priced_lines) pairs as returned
+    by check_stock(); each table is written with a single executemany and
+    the stock of every product with one guarded UPDATE (stock.apply()), so
+    two concurrent orders can never both take the last units.
+    """
+    items = []
+    transactions = []
+    for order_id, priced_lines in order_lines:
+        for product_id, quantity, unit_price, total_price in priced_lines:
+            items.append({
+                'order_id': order_id,
+                'product_id': product_id,
+                'quantity': quantity,
+                'unit_price': unit_price,
+                'total_price': total_price
+            })
+            transactions.append({
+                'product_id': product_id,
+                'transaction_type': 'OUT',
+                'quantity': quantity,
+                'reference_type': 'ORDER',
+                'reference_id': order_id,
+                'notes': f'Stock reduced due to order #{order_id}'
+            })
+    
+    db.session.execute(insert(OrderItem), items)
+    try:
+        stock.apply(transactions)
+    except stock.StockError as e:
+        raise OrderError(e.message, e.status_code)
+
+def order_values(data):
+    """Column values for a new order header taken from a request payload"""
+    return {
+        'customer_name': data.get('customer_name'),
+        'customer_email': data.get('customer_email'),
+        'delivery_date': datetime.strptime(data['delivery_date'], '%Y-%m-%d').date() if data.get('delivery_date') else None,
+        'status': data.get('status', 'Pending'),
+        'notes': data.get('notes'),
+        'order_date': datetime.utcnow()
+    }
+
+def order_product_names(order):
+    """{product_id: name} for an order's lines, from the product cache"""
+    return get_product_cache().names(item.product_id for item in order.order_items)
+
+def items_sold(order):
+    """Units across an order's lines, for its sales fact"""
+    return sum(item.quantity for item in order.order_items)
+
+def place_order(data):
+    """Create an order with its items, stock decrement and ledger rows.
+    
+    Issues a fixed number of statements however many lines the order has:
+    the order INSERT, one guarded stock UPDATE and one executemany per child
+    table, plus one product SELECT when a product is not cached. The caller
+    commits.
+    """
+    lines = parse_order_lines(data.get('items'))
+    products = load_products(product_id for product_id, _, _ in lines)
+    priced_lines, total_amount, _ = check_stock(lines, products)
+    
+    order = Order(total_amount=total_amount, **order_values(data))
+    db.session.add(order)
+    db.session.flush()  # Get the order ID
+    
+    insert_order_lines([(order.order_id, priced_lines)])
+    counters.record(counters.order_totals(order.status, total_amount))
+    sales_facts.record(added=[sales_facts.order_fact(
+        order.order_date, order.status, total_amount, sum(line[1] for line in priced_lines)
+    )])
+    return order
+
+def place_order_batch(payloads):
+    """Create a batch of orders in the current transaction.
+    
+    Runs the same validation as place_order(), but for the whole batch at
+    once: one stock SELECT, one executemany per table and a single guarded
+    stock UPDATE. Orders that fail validation or would oversell are skipped
+    and reported; the rest are inserted.
+    Returns one result dict per payload, in order. The caller commits.
+    """
+    results = [None] * len(payloads)
+    parsed = []
+    for position, data in enumerate(payloads):
+        try:
+            if not isinstance(data, dict):
+                raise OrderError('Order must be a JSON object')
+            parsed.append((position, order_values(data), parse_order_lines(data.get('items'))))
+        except OrderError as e:
+            results[position] = {'error': e.message, 'code': e.status_code}
+        except (KeyError, TypeError, ValueError) as e:
+            results[position] = {'error': str(e), 'code': 400}
+    
+    product_ids = [product_id for _, _, lines in parsed for product_id, _, _ in lines]
+    products = load_products(product_ids)
+    stock_levels = load_stock_levels(product_ids)
+    reserved = {}
+    accepted = []
+    for position, values, lines in parsed:
+        try:
+            priced_lines, total_amount, demand = check_stock(lines, products, stock_levels, reserved)
+        except OrderError as e:
+            results[position] = {'error': e.message, 'code': e.status_code}
+            continue
+        
+        for product_id, quantity in demand.items():
+            reserved[product_id] = reserved.get(product_id, 0) + quantity
+        values['total_amount'] = total_amount
+        accepted.append((position, values, priced_lines))
+    
+    if not accepted:
+        return results
+    
+    # Autoincrement keys grow in VALUES order, so sorting the returned ids
+    # maps them back to the payloads. Asking for sort_by_parameter_order
+    # instead makes SQLite fall back to one INSERT per row.
+    order_ids = sorted(db.session.execute(
+        insert(Order).returning(Order.order_id),
+        [values for _, values, _ in accepted]
+    ).scalars().all())
+    insert_order_lines(
+        (order_id, priced_lines) for order_id, (_, _, priced_lines) in zip(order_ids, accepted)
+    )
+    counters.record(*[
+        counters.order_totals(values['status'], values['total_amount']) for _, values, _ in accepted
+    ])
+    sales_facts.record(added=[
+        sales_facts.order_fact(
+            values['order_date'], values['status'], values['total_amount'], sum(line[1] for line in priced_lines)
+        )
+        for _, values, priced_lines in accepted
+    ])
+    
+    for order_id, (position, values, _) in zip(order_ids, accepted):
+        results[position] = {'order_id': order_id, 'total_amount': float(values['total_amount'])}
+    return results
+
 @orders_bp.route('/orders', methods=['GET'])
+@conditional_get('orders', 'order_items', 'products')
 def get_orders():
     """Get all orders with optional filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         status = request.args.get('status')
         customer_email = request.args.get('customer_email')
+        include_items = request.args.get('include_items', 'full')
         
-        query = Order.query
+        if include_items not in ITEM_MODES:
+            return jsonify({'error': f'include_items must be one of: {", ".join(ITEM_MODES)}'}), 400
+        
+        query = order_query(include_items)
         
         # Apply filters
         if status:
@@ -24,28 +315,26 @@ def get_orders():
             query = query.filter(Order.customer_email.contains(customer_email))
         
         # Order by most recent first
-        query = query.order_by(Order.order_date.desc())
+        query = query.order_by(Order.order_date.desc(), Order.order_id.desc())
         
         # Paginate results
-        orders = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'orders': [order.to_dict() for order in orders.items],
-            'total': orders.total,
-            'pages': orders.pages,
-            'current_page': page,
-            'per_page': per_page
-        })
+        return jsonify(paginate_request(
+            query,
+            [(Order.order_date, True), (Order.order_id, True)],
+            lambda order: order.to_dict(include_items),
+            'orders'
+        ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @orders_bp.route('/orders/<int:order_id>', methods=['GET'])
+@conditional_get('orders', 'order_items', 'products')
 def get_order(order_id):
     """Get a specific order by ID"""
     try:
-        order = Order.query.get_or_404(order_id)
+        order = order_query().get_or_404(order_id)
         return jsonify(order.to_dict())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -56,88 +345,88 @@ def create_order():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        if 'items' not in data or not data['items']:
-            return jsonify({'error': 'Order must contain at least one item'}), 400
-        
-        # Create order
-        order = Order(
-            customer_name=data.get('customer_name'),
-            customer_email=data.get('customer_email'),
-            delivery_date=datetime.strptime(data['delivery_date'], '%Y-%m-%d').date() if data.get('delivery_date') else None,
-            status=data.get('status', 'Pending'),
-            notes=data.get('notes')
-        )
-        
-        db.session.add(order)
-        db.session.flush()  # Get the order ID
-        
-        total_amount = Decimal('0')
-        
-        # Process order items
-        for item_data in data['items']:
-            if 'product_id' not in item_data or 'quantity' not in item_data:
-                return jsonify({'error': 'Each item must have product_id and quantity'}), 400
-            
-            product = Product.query.get(item_data['product_id'])
-            if not product:
-                return jsonify({'error': f'Product {item_data["product_id"]} not found'}), 404
-            
-            quantity = int(item_data['quantity'])
-            if quantity <= 0:
-                return jsonify({'error': 'Quantity must be positive'}), 400
-            
-            # Check stock availability
-            if product.stock_level < quantity:
-                return jsonify({
-                    'error': f'Insufficient stock for {product.product_name}. Available: {product.stock_level}, Requested: {quantity}'
-                }), 400
-            
-            unit_price = Decimal(str(item_data.get('unit_price', product.unit_price)))
-            total_price = unit_price * quantity
-            
-            order_item = OrderItem(
-                order_id=order.order_id,
-                product_id=product.product_id,
-                quantity=quantity,
-                unit_price=unit_price,
-                total_price=total_price
-            )
-            
-            db.session.add(order_item)
-            total_amount += total_price
-            
-            # Update product stock
-            product.stock_level -= quantity
-            product.updated_at = datetime.utcnow()
-            
-            # Create inventory transaction
-            transaction = InventoryTransaction(
-                product_id=product.product_id,
-                transaction_type='OUT',
-                quantity=quantity,
-                reference_type='ORDER',
-                reference_id=order.order_id,
-                notes=f'Stock reduced due to order #{order.order_id}'
-            )
-            db.session.add(transaction)
-        
-        # Update order total
-        order.total_amount = total_amount
+        order_id = stock.run_with_retry(lambda: place_order(data).order_id)
         
-        db.session.commit()
-        
-        return jsonify(order.to_dict()), 201
+        # Reload with its items; product names come from the product cache
+        order = order_query('summary').filter(Order.order_id == order_id).one()
+        return jsonify(order.to_dict(product_names=order_product_names(order))), 201
+    except OrderError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def commit_order_batch(batch):
+    """Place a batch of bulk orders in one transaction and commit it.
+    
+    A batch that still fails after BULK_ORDER_RETRIES is placed again one
+    order at a time, so only the orders that cause the failure report it.
+    Returns one result dict per payload, in order.
+    """
+    error = None
+    for _ in range(BULK_ORDER_RETRIES):
+        try:
+            return stock.run_with_retry(lambda: place_order_batch(batch))
+        except OrderError as e:
+            # A concurrent writer took stock after the batch was read; re-read and retry
+            db.session.rollback()
+            error = {'error': e.message, 'code': e.status_code}
+        except Exception as e:
+            db.session.rollback()
+            error = {'error': str(e), 'code': 500}
+            break
+    if len(batch) == 1:
+        return [error]
+    return [result for payload in batch for result in commit_order_batch([payload])]
+
+@orders_bp.route('/orders/bulk', methods=['POST'])
+def create_orders_bulk():
+    """Create many orders from a JSON array or an NDJSON stream.
+    
+    Orders are committed in transactions of batch_size orders. The response
+    is an NDJSON stream with one compact result line per submitted order,
+    in submission order, followed by a summary line.
+    """
+    batch_size = request.args.get('batch_size', BULK_ORDER_BATCH_SIZE, type=int)
+    if batch_size <= 0 or batch_size > BULK_ORDER_MAX_BATCH_SIZE:
+        return jsonify({'error': f'batch_size must be between 1 and {BULK_ORDER_MAX_BATCH_SIZE}'}), 400
+    
+    if request.mimetype in NDJSON_MIMETYPES:
+        payloads = read_ndjson(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            return jsonify({'error': 'Request body must be a JSON array of orders or NDJSON'}), 400
+        payloads = iter(data)
+    
+    def generate():
+        created = failed = index = 0
+        while True:
+            batch = list(islice(payloads, batch_size))
+            if not batch:
+                break
+            
+            for result in commit_order_batch(batch):
+                if 'order_id' in result:
+                    created += 1
+                else:
+                    failed += 1
+                yield json.dumps({'index': index, **result}) + '\n'
+                index += 1
+        
+        yield json.dumps({'summary': {'created': created, 'failed': failed}}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @orders_bp.route('/orders/<int:order_id>', methods=['PUT'])
 def update_order(order_id):
     """Update an existing order"""
     try:
         order = Order.query.get_or_404(order_id)
         data = request.get_json()
+        before = counters.order_totals(order.status, order.total_amount)
+        old_status = order.status
         
         # Update basic order information
         if 'customer_name' in data:
@@ -151,9 +440,16 @@ def update_order(order_id):
         if 'notes' in data:
             order.notes = data['notes']
         
+        counters.record(counters.change(before, counters.order_totals(order.status, order.total_amount)))
+        if order.status != old_status:
+            units = items_sold(order)
+            sales_facts.record(
+                added=[sales_facts.order_fact(order.order_date, order.status, order.total_amount, units)],
+                removed=[sales_facts.order_fact(order.order_date, old_status, order.total_amount, units)]
+            )
         db.session.commit()
         
-        return jsonify(order.to_dict())
+        return jsonify(order.to_dict(product_names=order_product_names(order)))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -162,34 +458,31 @@ def update_order(order_id):
 def delete_order(order_id):
     """Delete an order (only if status is Pending)"""
     try:
-        order = Order.query.get_or_404(order_id)
-        
-        if order.status not in ['Pending', 'Cancelled']:
-            return jsonify({'error': 'Cannot delete order that is not pending or cancelled'}), 400
-        
-        # If order is pending, restore stock levels
-        if order.status == 'Pending':
-            for item in order.order_items:
-                product = Product.query.get(item.product_id)
-                if product:
-                    product.stock_level += item.quantity
-                    product.updated_at = datetime.utcnow()
-                    
-                    # Create inventory transaction
-                    transaction = InventoryTransaction(
-                        product_id=product.product_id,
-                        transaction_type='IN',
-                        quantity=item.quantity,
-                        reference_type='ORDER_CANCELLATION',
-                        reference_id=order_id,
-                        notes=f'Stock restored due to order #{order_id} cancellation'
-                    )
-                    db.session.add(transaction)
+        def remove():
+            order = Order.query.get_or_404(order_id)
+            
+            if order.status not in ['Pending', 'Cancelled']:
+                raise OrderError('Cannot delete order that is not pending or cancelled')
+            
+            # Holds the order's row until commit, so it is restored only once
+            claim_order(order_id, order.status, order.status)
+            
+            # If order is pending, restore stock levels
+            if order.status == 'Pending':
+                restore_stock(order)
+            
+            counters.record(counters.change(counters.order_totals(order.status, order.total_amount), {}))
+            sales_facts.record(removed=[
+                sales_facts.order_fact(order.order_date, order.status, order.total_amount, items_sold(order))
+            ])
+            db.session.delete(order)
         
-        db.session.delete(order)
-        db.session.commit()
+        stock.run_with_retry(remove)
         
         return jsonify({'message': 'Order deleted successfully'})
+    except OrderError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -198,64 +491,115 @@ def delete_order(order_id):
 def update_order_status(order_id):
     """Update order status"""
     try:
-        order = Order.query.get_or_404(order_id)
         data = request.get_json()
         
         if 'status' not in data:
             return jsonify({'error': 'Missing status field'}), 400
         
-        old_status = order.status
         new_status = data['status']
         
-        # If cancelling a pending order, restore stock
-        if old_status == 'Pending' and new_status == 'Cancelled':
-            for item in order.order_items:
-                product = Product.query.get(item.product_id)
-                if product:
-                    product.stock_level += item.quantity
-                    product.updated_at = datetime.utcnow()
-                    
-                    # Create inventory transaction
-                    transaction = InventoryTransaction(
-                        product_id=product.product_id,
-                        transaction_type='IN',
-                        quantity=item.quantity,
-                        reference_type='ORDER_CANCELLATION',
-                        reference_id=order_id,
-                        notes=f'Stock restored due to order #{order_id} cancellation'
-                    )
-                    db.session.add(transaction)
+        def change_status():
+            order = Order.query.get_or_404(order_id)
+            old_status = order.status
+            claim_order(order_id, old_status, new_status)
+            
+            # If cancelling a pending order, restore stock
+            if old_status == 'Pending' and new_status == 'Cancelled':
+                restore_stock(order)
+            
+            counters.record(counters.change(
+                counters.order_totals(old_status, order.total_amount),
+                counters.order_totals(new_status, order.total_amount)
+            ))
+            if new_status != old_status:
+                units = items_sold(order)
+                sales_facts.record(
+                    added=[sales_facts.order_fact(order.order_date, new_status, order.total_amount, units)],
+                    removed=[sales_facts.order_fact(order.order_date, old_status, order.total_amount, units)]
+                )
+            return order
         
-        order.status = new_status
-        db.session.commit()
+        order = stock.run_with_retry(change_status)
         
-        return jsonify(order.to_dict())
+        return jsonify(order.to_dict(product_names=order_product_names(order)))
+    except OrderError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _stats_window():
+    """Parse the optional start_date/end_date (YYYY-MM-DD, both inclusive) arguments"""
+    bounds = []
+    for name in ('start_date', 'end_date'):
+        value = request.args.get(name)
+        try:
+            bounds.append(datetime.strptime(value, '%Y-%m-%d') if value else None)
+        except ValueError:
+            raise OrderError(f'{name} must be YYYY-MM-DD')
+    start, end = bounds
+    if start and end and start > end:
+        raise OrderError('start_date must not be after end_date')
+    return start, end
+
+def order_stats(start=None, end=None):
+    """Order counts and revenue per status from one grouped aggregate.
+
+    idx_orders_status_date_total covers the query, so it is answered from the
+    index without touching the table rows.
+    """
+    query = select(
+        Order.status,
+        func.count(),
+        func.coalesce(func.sum(Order.total_amount), 0)
+    ).group_by(Order.status)
+    if start:
+        query = query.where(Order.order_date >= start)
+    if end:
+        query = query.where(Order.order_date < end + timedelta(days=1))
+
+    by_status = {}
+    for status, count, revenue in db.session.execute(query):
+        by_status[status or 'Unknown'] = {'count': count, 'revenue': float(revenue)}
+
+    def count_of(status):
+        return by_status.get(status, {}).get('count', 0)
+
+    return {
+        'total_orders': sum(entry['count'] for entry in by_status.values()),
+        'pending_orders': count_of('Pending'),
+        'shipped_orders': count_of('Shipped'),
+        'delivered_orders': count_of('Delivered'),
+        'cancelled_orders': count_of('Cancelled'),
+        # Revenue is only realised once an order is delivered
+        'total_revenue': by_status.get('Delivered', {}).get('revenue', 0),
+        'by_status': by_status,
+        'start_date': start.date().isoformat() if start else None,
+        'end_date': end.date().isoformat() if end else None
+    }
+
 @orders_bp.route('/orders/stats', methods=['GET'])
 def get_order_stats():
-    """Get order statistics"""
+    """Get order statistics, optionally limited to a start_date/end_date window.
+
+    Results are cached for ORDER_STATS_CACHE_TTL seconds when that setting
+    is positive; the default of 0 always reads live data.
+    """
     try:
-        total_orders = Order.query.count()
-        pending_orders = Order.query.filter_by(status='Pending').count()
-        shipped_orders = Order.query.filter_by(status='Shipped').count()
-        delivered_orders = Order.query.filter_by(status='Delivered').count()
-        cancelled_orders = Order.query.filter_by(status='Cancelled').count()
-        
-        # Calculate total revenue from delivered orders
-        delivered_order_items = db.session.query(Order.total_amount).filter_by(status='Delivered').all()
-        total_revenue = sum(order.total_amount for order in delivered_order_items if order.total_amount)
-        
-        return jsonify({
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'shipped_orders': shipped_orders,
-            'delivered_orders': delivered_orders,
-            'cancelled_orders': cancelled_orders,
-            'total_revenue': float(total_revenue) if total_revenue else 0
-        })
+        start, end = _stats_window()
+        ttl = current_app.config.get('ORDER_STATS_CACHE_TTL', 0)
+        if not ttl:
+            return jsonify(order_stats(start, end))
+
+        key = (start, end)
+        stats = _stats_cache.get(key)
+        if stats is None:
+            stats = order_stats(start, end)
+            _stats_cache.set(key, stats, ttl=ttl)
+        return jsonify(stats)
+    except OrderError as e:
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
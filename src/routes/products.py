@@ -1,21 +1,58 @@
-from flask import Blueprint, request, jsonify
-from src.models.inventory import db, Product, Category, Supplier, InventoryTransaction
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from src.models.inventory import db, Product, Category, Supplier, OrderItem, PurchaseOrderItem
+from src.models.search import apply_search
+from src.services import counters, ledger, stock
+from src.services.conditional import conditional_get
+from src.services.product_cache import get_product_cache, product_dict
+from src.utils.pagination import CursorError, paginate_request
+from src.utils.streaming import read_ndjson
+from sqlalchemy import exists, select
+from types import SimpleNamespace
+from sqlalchemy.orm import joinedload
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+import csv
+import io
+import json
 
 products_bp = Blueprint('products', __name__)
 
+CATALOG_BATCH_SIZE = 1000
+CATALOG_MAX_REPORTED_ERRORS = 100
+CATALOG_EXPORT_FIELDS = [
+    'product_id', 'sku', 'product_name', 'description', 'category_name',
+    'supplier_name', 'unit_price', 'stock_level', 'reorder_level'
+]
+# Columns an import overwrites on existing SKUs, when a record provides them.
+# stock_level is only used for new SKUs, as their opening adjustment; existing
+# stock must move through adjustments and the ledger.
+CATALOG_UPDATE_COLUMNS = [
+    'product_name', 'description', 'category_id', 'supplier_id',
+    'unit_price', 'reorder_level', 'updated_at'
+]
+
+def product_query():
+    """Product query that loads category and supplier in the same SELECT.
+
+    Product.to_dict() reads both relationships, so serializing a page of
+    products through plain lazy loading costs up to two extra queries per row.
+    """
+    return Product.query.options(
+        joinedload(Product.category),
+        joinedload(Product.supplier)
+    )
+
 @products_bp.route('/products', methods=['GET'])
+@conditional_get('products', 'categories', 'suppliers')
 def get_products():
     """Get all products with optional filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
         category_id = request.args.get('category_id', type=int)
         low_stock = request.args.get('low_stock', type=bool)
         search = request.args.get('search', '')
         
-        query = Product.query
+        query = product_query()
         
         # Apply filters
         if category_id:
@@ -25,33 +62,34 @@ def get_products():
             query = query.filter(Product.stock_level <= Product.reorder_level)
         
         if search:
-            query = query.filter(
-                Product.product_name.contains(search) |
-                Product.sku.contains(search) |
-                Product.description.contains(search)
+            query = apply_search(
+                query, Product, 'products_fts', search,
+                [Product.product_name, Product.sku, Product.description]
             )
         
         # Paginate results
-        products = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'products': [product.to_dict() for product in products.items],
-            'total': products.total,
-            'pages': products.pages,
-            'current_page': page,
-            'per_page': per_page
-        })
+        return jsonify(paginate_request(
+            query, [(Product.product_id, False)], Product.to_dict, 'products', default_per_page=50
+        ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/products/<int:product_id>', methods=['GET'])
+@conditional_get('products', 'categories', 'suppliers')
 def get_product(product_id):
     """Get a specific product by ID"""
     try:
-        product = Product.query.get_or_404(product_id)
-        return jsonify(product.to_dict())
+        # Descriptive attributes from the product cache, stock from the row itself
+        info = get_product_cache().lookup([product_id]).get(product_id)
+        live = db.session.execute(
+            select(Product.stock_level, Product.reorder_level, Product.updated_at)
+            .where(Product.product_id == product_id)
+        ).first() if info else None
+        if live is None:
+            return jsonify({'error': 'Product not found'}), 404
+        return jsonify(product_dict(info, *live))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -73,18 +111,36 @@ def create_product():
             if existing_product:
                 return jsonify({'error': 'SKU already exists'}), 400
         
+        try:
+            opening_stock = int(data.get('stock_level') or 0)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'stock_level must be a non-negative integer'}), 400
+        if opening_stock < 0:
+            return jsonify({'error': 'stock_level must be a non-negative integer'}), 400
+        
+        # Inserted empty; the opening stock goes through the ledger like any other change
         product = Product(
             product_name=data['product_name'],
             description=data.get('description'),
             category_id=data.get('category_id'),
             unit_price=Decimal(str(data['unit_price'])),
-            stock_level=data.get('stock_level', 0),
+            stock_level=0,
             reorder_level=data.get('reorder_level', 10),
             supplier_id=data.get('supplier_id'),
             sku=data.get('sku')
         )
         
         db.session.add(product)
+        counters.record(counters.product_totals(product))
+        db.session.flush()
+        if opening_stock:
+            stock.apply([{
+                'product_id': product.product_id,
+                'transaction_type': 'ADJUSTMENT',
+                'quantity': opening_stock,
+                'reference_type': 'ADJUSTMENT',
+                'notes': 'Opening stock'
+            }])
         db.session.commit()
         
         return jsonify(product.to_dict()), 201
@@ -98,6 +154,7 @@ def update_product(product_id):
     try:
         product = Product.query.get_or_404(product_id)
         data = request.get_json()
+        before = counters.product_totals(product)
         
         # Check if SKU already exists (excluding current product)
         if 'sku' in data and data['sku']:
@@ -125,7 +182,9 @@ def update_product(product_id):
             product.sku = data['sku']
         
         product.updated_at = datetime.utcnow()
+        counters.record(counters.change(before, counters.product_totals(product)))
         db.session.commit()
+        get_product_cache().invalidate(product_id)
         
         return jsonify(product.to_dict())
     except Exception as e:
@@ -137,8 +196,19 @@ def delete_product(product_id):
     """Delete a product"""
     try:
         product = Product.query.get_or_404(product_id)
+        
+        # Order and purchase order lines keep their product; its stock-only history goes with it
+        has_orders = db.session.scalar(select(
+            exists().where(OrderItem.product_id == product_id) | exists().where(PurchaseOrderItem.product_id == product_id)
+        ))
+        if has_orders:
+            return jsonify({'error': 'Cannot delete product with order or purchase order history'}), 400
+        
+        counters.record(counters.change(counters.product_totals(product), {}))
+        ledger.remove_product(product_id)
         db.session.delete(product)
         db.session.commit()
+        get_product_cache().invalidate(product_id)
         return jsonify({'message': 'Product deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -148,7 +218,6 @@ def delete_product(product_id):
 def adjust_stock(product_id):
     """Manually adjust product stock level"""
     try:
-        product = Product.query.get_or_404(product_id)
         data = request.get_json()
         
         if 'adjustment' not in data:
@@ -157,40 +226,39 @@ def adjust_stock(product_id):
         adjustment = int(data['adjustment'])
         notes = data.get('notes', 'Manual stock adjustment')
         
-        # Check if adjustment would result in negative stock
-        new_stock = product.stock_level + adjustment
-        if new_stock < 0:
-            return jsonify({'error': 'Adjustment would result in negative stock'}), 400
-        
-        # Update stock level
-        product.stock_level = new_stock
-        product.updated_at = datetime.utcnow()
+        def adjust():
+            product = Product.query.get_or_404(product_id)
+            # The engine refuses adjustments that would make stock negative
+            stock.apply([{
+                'product_id': product_id,
+                'transaction_type': 'ADJUSTMENT',
+                'quantity': adjustment,
+                'reference_type': 'ADJUSTMENT',
+                'notes': notes
+            }])
+            return product
         
-        # Create inventory transaction
-        transaction = InventoryTransaction(
-            product_id=product_id,
-            transaction_type='ADJUSTMENT',
-            quantity=abs(adjustment),
-            reference_type='ADJUSTMENT',
-            notes=notes
-        )
-        
-        db.session.add(transaction)
-        db.session.commit()
+        product = stock.run_with_retry(adjust)
         
         return jsonify({
             'message': 'Stock adjusted successfully',
             'product': product.to_dict()
         })
+    except stock.StockError as e:
+        db.session.rollback()
+        if e.status_code == 400:
+            return jsonify({'error': 'Adjustment would result in negative stock'}), 400
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @products_bp.route('/products/low-stock', methods=['GET'])
+@conditional_get('products', 'categories', 'suppliers')
 def get_low_stock_products():
     """Get products with low stock levels"""
     try:
-        products = Product.query.filter(
+        products = product_query().filter(
             Product.stock_level <= Product.reorder_level
         ).all()
         
@@ -198,7 +266,269 @@ def get_low_stock_products():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@products_bp.route('/products/import', methods=['POST'])
+def import_products():
+    """Upsert products by SKU from a streamed CSV or NDJSON body.
+    
+    Rows are written in batches of batch_size with a single
+    INSERT ... ON CONFLICT(sku) DO UPDATE executemany each, and every batch
+    is committed on its own. Category and supplier names are resolved
+    through lookup tables read once per import. Description, category,
+    supplier and reorder level are only written when a record provides
+    them (a missing or empty field keeps the stored value), so rows are
+    grouped by the columns they carry, one executemany per group.
+    """
+    try:
+        batch_size = request.args.get('batch_size', CATALOG_BATCH_SIZE, type=int)
+        if batch_size <= 0:
+            return jsonify({'error': 'batch_size must be positive'}), 400
+        
+        if request.mimetype == 'text/csv':
+            records = csv.DictReader(io.TextIOWrapper(request.stream, encoding='utf-8', newline=''))
+        elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            records = read_ndjson(request.stream)
+        else:
+            return jsonify({'error': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+        
+        categories = dict(db.session.execute(select(Category.category_name, Category.category_id)).all())
+        suppliers = dict(db.session.execute(select(Supplier.supplier_name, Supplier.supplier_id)).all())
+        upserts = {}
+        
+        processed = upserted = 0
+        errors = []
+        records = enumerate(records, start=1)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            
+            now = datetime.utcnow()
+            rows = []
+            for line, record in batch:
+                processed += 1
+                try:
+                    rows.append(_catalog_row(record, categories, suppliers, now))
+                except ValueError as e:
+                    errors.append({'line': line, 'sku': record.get('sku') if isinstance(record, dict) else None, 'error': str(e)})
+            
+            if not rows:
+                continue
+            try:
+                merged = _merge_by_sku(rows)
+                existing = _existing_products(merged)
+                counters.record(_catalog_counter_change(merged, existing))
+                # New SKUs are inserted empty; their stock arrives as an opening adjustment
+                opening_stock = {row['sku']: row.pop('stock_level') for row in merged}
+                groups = {}
+                for row in merged:
+                    groups.setdefault(tuple(sorted(row)), []).append(row)
+                for columns, group in groups.items():
+                    if columns not in upserts:
+                        upserts[columns] = _product_upsert_statement(columns)
+                    db.session.execute(upserts[columns], group)
+                _record_opening_stock({
+                    sku: quantity for sku, quantity in opening_stock.items() if sku not in existing and quantity > 0
+                })
+                db.session.commit()
+                # Rows are matched by SKU, so drop every cached product
+                get_product_cache().clear()
+                upserted += len(rows)
+            except Exception as e:
+                db.session.rollback()
+                errors.append({'line': batch[0][0], 'sku': None, 'error': f'Batch ending at line {batch[-1][0]} failed: {e}'})
+        
+        return jsonify({
+            'processed': processed,
+            'upserted': upserted,
+            'failed': processed - upserted,
+            'errors': errors[:CATALOG_MAX_REPORTED_ERRORS]
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@products_bp.route('/products/export', methods=['GET'])
+@conditional_get('products', 'categories', 'suppliers')
+def export_products():
+    """Stream the whole catalog as CSV or NDJSON.
+    
+    Rows are fetched from a streaming cursor in partitions of
+    CATALOG_BATCH_SIZE, so memory use does not grow with the catalog.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    query = select(
+        Product.product_id,
+        Product.sku,
+        Product.product_name,
+        Product.description,
+        Category.category_name,
+        Supplier.supplier_name,
+        Product.unit_price,
+        Product.stock_level,
+        Product.reorder_level
+    ).outerjoin(Category, Product.category_id == Category.category_id) \
+     .outerjoin(Supplier, Product.supplier_id == Supplier.supplier_id) \
+     .order_by(Product.product_id) \
+     .execution_options(yield_per=CATALOG_BATCH_SIZE)
+    
+    def generate():
+        result = db.session.execute(query)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == 'csv':
+            writer.writerow(CATALOG_EXPORT_FIELDS)
+        
+        for rows in result.partitions():
+            for row in rows:
+                record = row._asdict()
+                record['unit_price'] = float(record['unit_price']) if record['unit_price'] is not None else None
+                if export_format == 'csv':
+                    writer.writerow([record[field] for field in CATALOG_EXPORT_FIELDS])
+                else:
+                    buffer.write(json.dumps(record) + '\n')
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=products.{export_format}'}
+    )
+
+def _merge_by_sku(rows):
+    """One row per SKU; a later row overrides the columns it provides"""
+    merged = {}
+    for row in rows:
+        merged[row['sku']] = {**merged.get(row['sku'], {}), **row}
+    return list(merged.values())
+
+def _existing_products(rows):
+    """{sku: row} of the stored products matching rows, with the columns counters need"""
+    return {
+        row.sku: row for row in db.session.execute(
+            select(Product.sku, Product.stock_level, Product.reorder_level, Product.unit_price)
+            .where(Product.sku.in_([row['sku'] for row in rows]))
+        )
+    }
+
+def _catalog_counter_change(rows, existing):
+    """Dashboard counter deltas for upserting rows (one per SKU) over the existing products.
+
+    New SKUs count at zero stock; their opening adjustment records the rest.
+    """
+    before = [counters.product_totals(row) for row in existing.values()]
+    after = []
+    for row in rows:
+        current = existing.get(row['sku'])
+        # Existing SKUs keep their stock level, see CATALOG_UPDATE_COLUMNS
+        after.append(counters.product_totals(
+            SimpleNamespace(
+                unit_price=row['unit_price'],
+                reorder_level=row.get('reorder_level', current.reorder_level if current else 10)
+            ),
+            stock_level=current.stock_level if current else 0
+        ))
+    return counters.change(counters.combine(*before), counters.combine(*after))
+
+def _record_opening_stock(quantities):
+    """Give newly imported SKUs ({sku: quantity}) their stock through ADJUSTMENT ledger rows"""
+    if not quantities:
+        return
+    product_ids = dict(db.session.execute(
+        select(Product.sku, Product.product_id).where(Product.sku.in_(quantities))
+    ).all())
+    stock.apply([
+        {
+            'product_id': product_ids[sku],
+            'transaction_type': 'ADJUSTMENT',
+            'quantity': quantity,
+            'reference_type': 'ADJUSTMENT',
+            'notes': 'Opening stock from catalog import'
+        }
+        for sku, quantity in quantities.items()
+    ])
+
+def _product_upsert_statement(columns):
+    """INSERT ... ON CONFLICT(sku) DO UPDATE of rows carrying columns, for the configured database"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise RuntimeError(f'Catalog import does not support the {dialect} dialect')
+    
+    statement = insert(Product.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=[Product.__table__.c.sku],
+        set_={column: statement.excluded[column] for column in CATALOG_UPDATE_COLUMNS if column in columns}
+    )
+
+def _catalog_row(record, categories, suppliers, now):
+    """Convert one imported record into upsert parameters, or raise ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError('Row must be an object')
+    
+    sku = (record.get('sku') or '').strip()
+    if not sku:
+        raise ValueError('Missing required field: sku')
+    product_name = (record.get('product_name') or '').strip()
+    if not product_name:
+        raise ValueError('Missing required field: product_name')
+    
+    try:
+        unit_price = Decimal(str(record.get('unit_price')))
+    except InvalidOperation:
+        raise ValueError(f'Invalid unit_price: {record.get("unit_price")!r}')
+    if not unit_price.is_finite() or unit_price < 0:
+        raise ValueError(f'Invalid unit_price: {record.get("unit_price")!r}')
+    
+    stock_level = int(record.get('stock_level') or 0)
+    if stock_level < 0:
+        raise ValueError('stock_level cannot be negative')
+    
+    row = {
+        'sku': sku,
+        'product_name': product_name,
+        'unit_price': unit_price,
+        'stock_level': stock_level,
+        'updated_at': now
+    }
+    # Optional columns are left out when the record does not provide them, so
+    # existing SKUs keep their stored values and new ones get the defaults
+    if record.get('description') not in (None, ''):
+        row['description'] = record['description']
+    category_id = _resolve_name(record, 'category', categories)
+    if category_id is not None:
+        row['category_id'] = category_id
+    supplier_id = _resolve_name(record, 'supplier', suppliers)
+    if supplier_id is not None:
+        row['supplier_id'] = supplier_id
+    if record.get('reorder_level') not in (None, ''):
+        row['reorder_level'] = int(record['reorder_level'])
+    return row
+
+def _resolve_name(record, entity, lookup):
+    """Map <entity>_name (or an explicit <entity>_id) from a record to an ID"""
+    entity_id = record.get(f'{entity}_id')
+    if entity_id not in (None, ''):
+        return int(entity_id)
+    
+    name = (record.get(f'{entity}_name') or '').strip()
+    if not name:
+        return None
+    if name not in lookup:
+        raise ValueError(f'Unknown {entity}: {name}')
+    return lookup[name]
+
 @products_bp.route('/categories', methods=['GET'])
+@conditional_get('categories')
 def get_categories():
     """Get all categories"""
     try:
@@ -222,6 +552,7 @@ def create_category():
         )
         
         db.session.add(category)
+        counters.record({'total_categories': 1})
         db.session.commit()
         
         return jsonify(category.to_dict()), 201
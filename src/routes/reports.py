@@ -1,13 +1,41 @@
-from flask import Blueprint, request, jsonify
-from src.models.inventory import db, Product, Category, Order, OrderItem, Supplier, InventoryTransaction
-from sqlalchemy import func, text
+import click
+import numpy as np
+from flask import Blueprint, request, jsonify, url_for
+from src.models.inventory import db, Product, InventoryTransaction
+from src.models.aggregates import ProductStockMovement
+from src.services import counters, forecast, ledger, reorder, sales_facts, snapshots
+from src.services.conditional import conditional_get
+from src.services.jobs import JobError, get_job_runner
+from src.services.product_cache import get_product_cache
+from src.services.report_cache import cached_report, get_cache
+from src.services.versions import current_versions
+from src.utils.pagination import MAX_PER_PAGE, CursorError, keyset_page
+from src.utils.streaming import STREAM_BATCH_SIZE, stream_format, stream_rows
+from sqlalchemy import select, text
+from sqlalchemy.orm import contains_eager
 from datetime import datetime, timedelta
 
 reports_bp = Blueprint('reports', __name__)
 
+def _low_inventory_item(row):
+    return {
+        'product_id': row.product_id,
+        'product_name': row.product_name,
+        'sku': row.sku,
+        'category_name': row.category_name,
+        'stock_level': row.stock_level,
+        'reorder_level': row.reorder_level,
+        'unit_price': float(row.unit_price) if row.unit_price else 0,
+        'supplier_name': row.supplier_name,
+        'supplier_email': row.supplier_email,
+        'supplier_phone': row.supplier_phone,
+        'shortage_quantity': row.shortage_quantity
+    }
+
 @reports_bp.route('/reports/low-inventory', methods=['GET'])
+@cached_report('products', 'categories', 'suppliers')
 def low_inventory_report():
-    """Get products with low inventory levels"""
+    """Get products with low inventory levels (stream=json|ndjson to stream the rows)"""
     try:
         query = text("""
             SELECT 
@@ -29,32 +57,26 @@ def low_inventory_report():
             ORDER BY (p.reorder_level - p.stock_level) DESC
         """)
         
-        result = db.session.execute(query)
-        items = []
+        # idx_products_shortage returns the rows already in this order
+        stream = stream_format()
+        if stream:
+            result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+            return stream_rows(result, _low_inventory_item, 'low_inventory_items', stream, count_key='total_items')
         
-        for row in result:
-            items.append({
-                'product_id': row.product_id,
-                'product_name': row.product_name,
-                'sku': row.sku,
-                'category_name': row.category_name,
-                'stock_level': row.stock_level,
-                'reorder_level': row.reorder_level,
-                'unit_price': float(row.unit_price) if row.unit_price else 0,
-                'supplier_name': row.supplier_name,
-                'supplier_email': row.supplier_email,
-                'supplier_phone': row.supplier_phone,
-                'shortage_quantity': row.shortage_quantity
-            })
+        result = db.session.execute(query)
+        items = [_low_inventory_item(row) for row in result]
         
         return jsonify({
             'low_inventory_items': items,
             'total_items': len(items)
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @reports_bp.route('/reports/sales-by-category', methods=['GET'])
+@cached_report('categories', 'products', 'order_items', 'orders')
 def sales_by_category_report():
     """Get sales report grouped by category"""
     try:
@@ -94,9 +116,24 @@ def sales_by_category_report():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _product_performance_item(row):
+    return {
+        'product_id': row.product_id,
+        'product_name': row.product_name,
+        'sku': row.sku,
+        'category_name': row.category_name,
+        'unit_price': float(row.unit_price) if row.unit_price else 0,
+        'stock_level': row.stock_level,
+        'total_sold': row.total_sold,
+        'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
+        'times_ordered': row.times_ordered,
+        'initial_stock': row.initial_stock
+    }
+
 @reports_bp.route('/reports/product-performance', methods=['GET'])
+@cached_report('products', 'categories', 'order_items', 'orders')
 def product_performance_report():
-    """Get product performance report"""
+    """Get product performance report (stream=json|ndjson to stream the rows)"""
     try:
         limit = request.args.get('limit', 20, type=int)
         
@@ -121,69 +158,67 @@ def product_performance_report():
             LIMIT {limit}
         """)
         
-        result = db.session.execute(query)
-        products = []
+        stream = stream_format()
+        if stream:
+            result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+            return stream_rows(result, _product_performance_item, 'product_performance', stream)
         
-        for row in result:
-            products.append({
-                'product_id': row.product_id,
-                'product_name': row.product_name,
-                'sku': row.sku,
-                'category_name': row.category_name,
-                'unit_price': float(row.unit_price) if row.unit_price else 0,
-                'stock_level': row.stock_level,
-                'total_sold': row.total_sold,
-                'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
-                'times_ordered': row.times_ordered,
-                'initial_stock': row.initial_stock
-            })
+        result = db.session.execute(query)
+        products = [_product_performance_item(row) for row in result]
         
         return jsonify({
             'product_performance': products
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Statuses counted as sales, and how many periods each grain shows by default
+SALES_STATUSES = ('Delivered', 'Shipped')
+SALES_DEFAULT_PERIODS = {'day': 30, 'week': 12, 'month': 12}
+
 @reports_bp.route('/reports/monthly-sales', methods=['GET'])
+# The window is relative to today, so entries also expire
+@cached_report('sales_facts', ttl=300)
 def monthly_sales_report():
-    """Get monthly sales report"""
+    """Get sales per month (or grain=day|week) over the last months/periods periods"""
     try:
-        months = request.args.get('months', 12, type=int)
-        
-        query = text(f"""
-            SELECT 
-                strftime('%Y-%m', o.order_date) as month_year,
-                COUNT(DISTINCT o.order_id) as total_orders,
-                COALESCE(SUM(o.total_amount), 0) as total_revenue,
-                COALESCE(AVG(o.total_amount), 0) as avg_order_value,
-                COALESCE(SUM(oi.quantity), 0) as total_items_sold
-            FROM orders o
-            LEFT JOIN order_items oi ON o.order_id = oi.order_id
-            WHERE o.status IN ('Delivered', 'Shipped')
-            AND o.order_date >= date('now', '-{months} months')
-            GROUP BY strftime('%Y-%m', o.order_date)
-            ORDER BY month_year DESC
-        """)
-        
-        result = db.session.execute(query)
-        monthly_data = []
+        grain = request.args.get('grain', 'month')
+        if grain not in sales_facts.GRAINS:
+            return jsonify({'error': f"grain must be one of {', '.join(sales_facts.GRAINS)}"}), 400
+        periods = request.args.get('periods', type=int)
+        if periods is None:
+            periods = request.args.get('months', SALES_DEFAULT_PERIODS[grain], type=int) if grain == 'month' \
+                else SALES_DEFAULT_PERIODS[grain]
+        
+        # Read from the fact table: one indexed range per grain, no join or strftime
+        current = sales_facts.period_start(grain, datetime.utcnow().date())
+        since = sales_facts.shift_periods(grain, current, max(periods, 1) - 1)
+        result = sales_facts.sales_series(grain, since, SALES_STATUSES)
+        sales_data = []
         
         for row in result:
-            monthly_data.append({
-                'month_year': row.month_year,
-                'total_orders': row.total_orders,
-                'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
-                'avg_order_value': float(row.avg_order_value) if row.avg_order_value else 0,
-                'total_items_sold': row.total_items_sold
-            })
+            entry = {
+                'period_start': row.period_start.isoformat(),
+                'total_orders': row.order_count,
+                'total_revenue': float(row.revenue) if row.revenue else 0,
+                'avg_order_value': float(row.revenue / row.order_count) if row.order_count else 0,
+                'total_items_sold': row.items_sold
+            }
+            if grain == 'month':
+                entry['month_year'] = row.period_start.strftime('%Y-%m')
+            sales_data.append(entry)
         
         return jsonify({
-            'monthly_sales': monthly_data
+            'grain': grain,
+            'monthly_sales' if grain == 'month' else 'sales': sales_data
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @reports_bp.route('/reports/inventory-valuation', methods=['GET'])
+@cached_report('categories', 'products')
 def inventory_valuation_report():
     """Get inventory valuation report by category"""
     try:
@@ -219,9 +254,22 @@ def inventory_valuation_report():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _top_selling_item(row):
+    return {
+        'product_id': row.product_id,
+        'product_name': row.product_name,
+        'sku': row.sku,
+        'category_name': row.category_name,
+        'total_sold': row.total_sold,
+        'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
+        'order_frequency': row.order_frequency,
+        'current_stock': row.current_stock
+    }
+
 @reports_bp.route('/reports/top-selling-products', methods=['GET'])
+@cached_report('products', 'categories', 'order_items', 'orders')
 def top_selling_products_report():
-    """Get top selling products"""
+    """Get top selling products (stream=json|ndjson to stream the rows)"""
     try:
         limit = request.args.get('limit', 10, type=int)
         
@@ -245,36 +293,49 @@ def top_selling_products_report():
             LIMIT {limit}
         """)
         
-        result = db.session.execute(query)
-        top_products = []
+        stream = stream_format()
+        if stream:
+            result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+            return stream_rows(result, _top_selling_item, 'top_selling_products', stream)
         
-        for row in result:
-            top_products.append({
-                'product_id': row.product_id,
-                'product_name': row.product_name,
-                'sku': row.sku,
-                'category_name': row.category_name,
-                'total_sold': row.total_sold,
-                'total_revenue': float(row.total_revenue) if row.total_revenue else 0,
-                'order_frequency': row.order_frequency,
-                'current_stock': row.current_stock
-            })
+        result = db.session.execute(query)
+        top_products = [_top_selling_item(row) for row in result]
         
         return jsonify({
             'top_selling_products': top_products
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @reports_bp.route('/reports/recent-transactions', methods=['GET'])
+@conditional_get('inventory_transactions', 'products')
 def recent_transactions_report():
     """Get recent inventory transactions"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        
-        transactions = InventoryTransaction.query.join(Product).order_by(
-            InventoryTransaction.transaction_date.desc()
-        ).limit(limit).all()
+        cursor = request.args.get('cursor')
+        if limit < 1:
+            return jsonify({'error': 'limit must be at least 1'}), 400
+        limit = min(limit, MAX_PER_PAGE)
+        
+        query = InventoryTransaction.query.join(Product).options(
+            contains_eager(InventoryTransaction.product)
+        ).order_by(
+            InventoryTransaction.transaction_date.desc(),
+            InventoryTransaction.transaction_id.desc()
+        )
+        
+        # cursor (empty for the first page) switches to keyset pagination
+        if cursor is not None:
+            transactions, next_cursor, prev_cursor = keyset_page(
+                query,
+                [(InventoryTransaction.transaction_date, True), (InventoryTransaction.transaction_id, True)],
+                cursor, limit
+            )
+        else:
+            transactions = query.limit(limit).all()
         
         transaction_data = []
         for transaction in transactions:
@@ -290,61 +351,471 @@ def recent_transactions_report():
                 'notes': transaction.notes
             })
         
-        return jsonify({
-            'recent_transactions': transaction_data
-        })
+        response = {'recent_transactions': transaction_data}
+        if cursor is not None:
+            response['next_cursor'] = next_cursor
+            response['prev_cursor'] = prev_cursor
+        return jsonify(response)
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @reports_bp.route('/reports/dashboard-stats', methods=['GET'])
+# recent_orders covers the last 7 days, so entries also expire
+@cached_report('dashboard_counters', 'orders', ttl=60)
 def dashboard_stats():
     """Get dashboard statistics"""
     try:
-        # Total products
-        total_products = Product.query.count()
-        
-        # Low stock products
-        low_stock_count = Product.query.filter(
-            Product.stock_level <= Product.reorder_level
-        ).count()
-        
-        # Total orders
-        total_orders = Order.query.count()
-        
-        # Pending orders
-        pending_orders = Order.query.filter_by(status='Pending').count()
+        # Running totals plus the 7-day order count (an index range scan)
+        week_ago = datetime.now() - timedelta(days=7)
+        stats = counters.dashboard_totals(week_ago)
+        if stats is None:
+            counters.ensure_counters()
+            stats = counters.dashboard_totals(week_ago)
         
-        # Total revenue (delivered orders)
-        revenue_result = db.session.query(func.sum(Order.total_amount)).filter_by(status='Delivered').scalar()
-        total_revenue = float(revenue_result) if revenue_result else 0
+        return jsonify(stats)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _stock_at_item(row):
+    return {
+        'product_id': row.product_id,
+        'sku': row.sku,
+        'product_name': row.product_name,
+        'category_id': row.category_id,
+        'stock_level': row.stock_level
+    }
+
+@reports_bp.route('/reports/stock-at', methods=['GET'])
+@cached_report('products', 'inventory_transactions', 'stock_snapshots')
+def stock_at_report():
+    """Get every product's stock at the end of a day (date=YYYY-MM-DD, UTC)"""
+    try:
+        try:
+            day = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'date is required as YYYY-MM-DD'}), 400
+        category_id = request.args.get('category_id', type=int)
+        
+        # Nearest snapshot on or before the day plus that day's ledger tail
+        query, snapshot_date = snapshots.stock_at_query(day)
+        if category_id:
+            query = query.where(Product.category_id == category_id)
+        meta = {
+            'date': day.isoformat(),
+            'snapshot_date': snapshot_date.isoformat() if snapshot_date else None
+        }
+        
+        stream = stream_format()
+        if stream:
+            result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+            return stream_rows(result, _stock_at_item, 'stock', stream, count_key='total_items', meta=meta)
+        
+        items = [_stock_at_item(row) for row in db.session.execute(query)]
+        return jsonify({**meta, 'stock': items, 'total_items': len(items)})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+STOCK_MOVEMENT_SORTS = {
+    'total_transactions': ProductStockMovement.total_transactions,
+    'total_received': ProductStockMovement.total_received,
+    'total_sold': ProductStockMovement.total_sold,
+    'total_adjustments': ProductStockMovement.total_adjustments,
+    'last_transaction_at': ProductStockMovement.last_transaction_at,
+    'current_stock': Product.stock_level
+}
+
+def _stock_movement_item(row):
+    return {
+        'product_id': row.product_id,
+        'product_name': row.product_name,
+        'sku': row.sku,
+        'current_stock': row.current_stock,
+        'total_received': row.total_received,
+        'total_sold': row.total_sold,
+        'total_adjustments': row.total_adjustments,
+        'total_transactions': row.total_transactions,
+        'last_transaction_at': row.last_transaction_at.isoformat() if row.last_transaction_at else None
+    }
+
+@reports_bp.route('/reports/stock-movement', methods=['GET'])
+@cached_report('products', 'product_stock_movements')
+def stock_movement_report():
+    """Get per-product IN/OUT/ADJUSTMENT totals (sort, order, limit, category_id)"""
+    try:
+        sort = request.args.get('sort', 'total_transactions')
+        order = request.args.get('order', 'desc')
+        limit = request.args.get('limit', 50, type=int)
+        category_id = request.args.get('category_id', type=int)
+        if sort not in STOCK_MOVEMENT_SORTS:
+            return jsonify({'error': f"sort must be one of {', '.join(STOCK_MOVEMENT_SORTS)}"}), 400
+        if order not in ('asc', 'desc'):
+            return jsonify({'error': 'order must be asc or desc'}), 400
+        
+        # One row per product with ledger activity, maintained by src/services/ledger.py
+        key = STOCK_MOVEMENT_SORTS[sort]
+        query = select(
+            ProductStockMovement.product_id,
+            Product.product_name,
+            Product.sku,
+            Product.stock_level.label('current_stock'),
+            ProductStockMovement.total_received,
+            ProductStockMovement.total_sold,
+            ProductStockMovement.total_adjustments,
+            ProductStockMovement.total_transactions,
+            ProductStockMovement.last_transaction_at
+        ).join(Product, Product.product_id == ProductStockMovement.product_id).order_by(
+            key.desc() if order == 'desc' else key.asc(),
+            ProductStockMovement.product_id
+        )
+        if category_id:
+            query = query.where(Product.category_id == category_id)
+        if limit:
+            query = query.limit(limit)
+        
+        stream = stream_format()
+        if stream:
+            result = db.session.execute(query, execution_options={'yield_per': STREAM_BATCH_SIZE})
+            return stream_rows(result, _stock_movement_item, 'stock_movement', stream)
+        
+        items = [_stock_movement_item(row) for row in db.session.execute(query)]
+        return jsonify({'stock_movement': items})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _reorder_options(values):
+    """(window_days, service_level, lead_time_days) from query arguments or a JSON body"""
+    window_days = int(values.get('window_days', reorder.DEFAULT_WINDOW_DAYS))
+    service_level = float(values.get('service_level', reorder.DEFAULT_SERVICE_LEVEL))
+    lead_time_days = float(values.get('lead_time_days', reorder.DEFAULT_LEAD_TIME_DAYS))
+    if not 2 <= window_days <= 3650:
+        raise ValueError('window_days must be between 2 and 3650')
+    if not 0.5 <= service_level < 1:
+        raise ValueError('service_level must be at least 0.5 and below 1')
+    if lead_time_days <= 0:
+        raise ValueError('lead_time_days must be positive')
+    return window_days, service_level, lead_time_days
+
+@reports_bp.route('/reports/reorder-points', methods=['GET'])
+# The demand window ends now, so entries also expire
+@cached_report('products', 'inventory_transactions', 'purchase_orders', ttl=3600)
+def reorder_points_report():
+    """Recommended reorder points and safety stock (window_days, service_level, lead_time_days, limit)"""
+    try:
+        window_days, service_level, lead_time_days = _reorder_options(request.args)
+        limit = request.args.get('limit', 50, type=int)
         
-        # Total inventory value
-        inventory_value_result = db.session.query(
-            func.sum(Product.stock_level * Product.unit_price)
-        ).scalar()
-        total_inventory_value = float(inventory_value_result) if inventory_value_result else 0
+        started = datetime.utcnow()
+        inputs = reorder.load_inputs(window_days)
+        result = reorder.compute(inputs, service_level, lead_time_days)
         
-        # Recent orders (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_orders = Order.query.filter(Order.order_date >= week_ago).count()
+        return jsonify({
+            'parameters': {'window_days': window_days, 'service_level': service_level, 'lead_time_days': lead_time_days},
+            'summary': reorder.summary(inputs, result),
+            'reorder_points': reorder.recommendations(inputs, result, limit),
+            'computed_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 3)
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/reorder-points/apply', methods=['POST'])
+def apply_reorder_points():
+    """Write recommended reorder points to products.reorder_level for every SKU with demand in the window"""
+    try:
+        window_days, service_level, lead_time_days = _reorder_options(request.get_json(silent=True) or {})
+        inputs = reorder.load_inputs(window_days)
+        result = reorder.compute(inputs, service_level, lead_time_days)
+        updated = reorder.apply(inputs, result)
+        db.session.commit()
         
-        # Categories count
-        total_categories = Category.query.count()
+        return jsonify({
+            'message': 'Reorder levels updated',
+            'updated': updated,
+            'summary': reorder.summary(inputs, result)
+        })
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+FORECAST_HISTORY_LIMITS = {'day': (14, 730), 'week': (8, 260)}
+
+# Periods close with the clock, so the validators also change hourly
+@reports_bp.route('/reports/forecast', methods=['GET'])
+@conditional_get('orders', 'order_items', 'products', 'sales_facts', ttl=3600)
+def forecast_report():
+    """Forecast demand per product (grain, history, horizon, limit, product_id)"""
+    try:
+        grain = request.args.get('grain', 'week')
+        if grain not in forecast.GRAINS:
+            return jsonify({'error': f"grain must be one of {', '.join(forecast.GRAINS)}"}), 400
+        history = request.args.get('history', forecast.DEFAULT_HISTORY[grain], type=int)
+        horizon = request.args.get('horizon', forecast.DEFAULT_HORIZON[grain], type=int)
+        limit = request.args.get('limit', 50, type=int)
+        product_id = request.args.get('product_id', type=int)
+        low, high = FORECAST_HISTORY_LIMITS[grain]
+        if not low <= history <= high:
+            return jsonify({'error': f'history must be between {low} and {high} periods for grain={grain}'}), 400
+        if not 1 <= horizon <= history:
+            return jsonify({'error': 'horizon must be between 1 and history'}), 400
+        
+        started = datetime.utcnow()
+        forecaster = forecast.get_forecaster()
+        state, fit = forecaster.fitted(grain, history)
+        model, alpha, rate, interval = forecast.forecasts(state)
+        
+        # Products with the highest forecast first, or the one product asked for
+        if product_id is not None:
+            selected = np.flatnonzero(state.product_ids == product_id)
+        else:
+            selected = np.lexsort((state.product_ids, -rate))[:limit]
+        names = {
+            row.product_id: row for row in db.session.execute(
+                select(Product.product_id, Product.product_name, Product.sku)
+                .where(Product.product_id.in_(state.product_ids[selected].tolist()))
+            )
+        }
+        length = timedelta(days=forecast.PERIOD_DAYS[grain])
         
-        # Suppliers count
-        total_suppliers = Supplier.query.count()
+        return jsonify({
+            'parameters': {'grain': grain, 'history': history, 'horizon': horizon},
+            'fit': {
+                'mode': fit,
+                'history_start': state.start.isoformat(),
+                'fitted_through': (state.end - length).isoformat(),
+                'periods': state.periods,
+                'fitted_at': state.fitted_at.isoformat(),
+                'workers': forecaster.workers
+            },
+            'summary': {
+                'products': len(state.product_ids),
+                'models': {name: int((model == index).sum()) for index, name in enumerate(forecast.MODELS)},
+                'forecast_per_period': round(float(rate.sum()), 2)
+            },
+            'periods': [(state.end + length * i).isoformat() for i in range(horizon)],
+            'forecasts': [
+                {
+                    'product_id': int(state.product_ids[i]),
+                    'product_name': names[state.product_ids[i]].product_name if state.product_ids[i] in names else None,
+                    'sku': names[state.product_ids[i]].sku if state.product_ids[i] in names else None,
+                    'model': forecast.MODELS[model[i]],
+                    'alpha': float(alpha[i]) if model[i] else None,
+                    'demand_periods': int(state.nonzero[i]),
+                    'average_demand_interval': round(float(interval[i]), 2) if model[i] else None,
+                    'forecast_per_period': round(float(rate[i]), 4),
+                    'forecast_total': round(float(rate[i]) * horizon, 2)
+                }
+                for i in selected
+            ],
+            'computed_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 3)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/cache-stats', methods=['GET'])
+def report_cache_stats():
+    """Get report and product cache hit/miss statistics and the current table write versions"""
+    try:
+        tables = [table.name for table in db.metadata.sorted_tables if table.name != 'table_versions']
+        versions = current_versions(tables)
         
         return jsonify({
-            'total_products': total_products,
-            'low_stock_count': low_stock_count,
-            'total_orders': total_orders,
-            'pending_orders': pending_orders,
-            'total_revenue': total_revenue,
-            'total_inventory_value': total_inventory_value,
-            'recent_orders': recent_orders,
-            'total_categories': total_categories,
-            'total_suppliers': total_suppliers
+            'cache': get_cache().stats(),
+            'product_cache': get_product_cache().stats(),
+            'table_versions': {
+                name: {
+                    'version': version,
+                    'updated_at': updated_at.isoformat() if updated_at else None
+                }
+                for name, (version, updated_at) in versions.items()
+            }
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Reports that can run as background jobs, by the name in their URL
+JOB_REPORTS = {
+    'low-inventory': low_inventory_report,
+    'sales-by-category': sales_by_category_report,
+    'product-performance': product_performance_report,
+    'monthly-sales': monthly_sales_report,
+    'inventory-valuation': inventory_valuation_report,
+    'top-selling-products': top_selling_products_report,
+    'recent-transactions': recent_transactions_report,
+    'dashboard-stats': dashboard_stats,
+    'stock-at': stock_at_report,
+    'stock-movement': stock_movement_report,
+    'reorder-points': reorder_points_report,
+    'forecast': forecast_report
+}
+
+@reports_bp.route('/reports/jobs', methods=['POST'])
+def submit_report_job():
+    """Queue a report to run in the background: {"report": name, "params": {query arguments}}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        report = data.get('report')
+        if report not in JOB_REPORTS:
+            return jsonify({'error': f"report must be one of {', '.join(JOB_REPORTS)}"}), 400
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params must be an object of query arguments'}), 400
+        if 'stream' in params:
+            return jsonify({'error': 'Report jobs return JSON results; stream is not supported'}), 400
+        
+        endpoint = f'reports.{JOB_REPORTS[report].__name__}'
+        runner = get_job_runner()
+        job = runner.submit(report, endpoint, url_for(endpoint), {key: str(value) for key, value in params.items()})
+        
+        response = jsonify(job.to_dict(runner.result_ttl))
+        response.headers['Location'] = url_for('reports.get_report_job', job_id=job.job_id)
+        return response, 202
+    except JobError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/jobs', methods=['GET'])
+def list_report_jobs():
+    """List report jobs that are queued, running or not yet expired (without their results)"""
+    try:
+        runner = get_job_runner()
+        return jsonify({
+            'jobs': [job.to_dict(runner.result_ttl, include_result=False) for job in runner.list()],
+            'stats': runner.stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/jobs/<job_id>', methods=['GET'])
+def get_report_job(job_id):
+    """Get a report job's status, and its result once it has succeeded"""
+    try:
+        runner = get_job_runner()
+        job = runner.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Report job not found or expired'}), 404
+        return jsonify(job.to_dict(runner.result_ttl))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.route('/reports/jobs/<job_id>', methods=['DELETE'])
+def cancel_report_job(job_id):
+    """Cancel a queued or running report job"""
+    try:
+        runner = get_job_runner()
+        job = runner.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Report job not found or expired'}), 404
+        return jsonify(job.to_dict(runner.result_ttl, include_result=False))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@reports_bp.cli.command('rebuild-counters')
+@click.option('--check', is_flag=True, help='Only compare the stored counters with live aggregates.')
+def rebuild_counters_command(check):
+    """Recompute dashboard counters from the base tables and verify them."""
+    if check:
+        stored, live = counters.stored_totals(), counters.live_totals()
+    else:
+        stored, live = counters.rebuild()
+        db.session.commit()
+    
+    drifted = counters.mismatches(stored, live)
+    for field in counters.COUNTER_FIELDS:
+        marker = '  MISMATCH' if field in drifted else ''
+        previous = stored[field] if stored else None
+        click.echo(f'{field:<24} stored={previous!s:<14} live={live[field]!s:<14}{marker}')
+    
+    if check and drifted:
+        raise SystemExit(1)
+    click.echo('Counters match live aggregates.' if not drifted else 'Counters rebuilt from live aggregates.')
+
+@reports_bp.cli.command('rebuild-stock-movements')
+@click.option('--check', is_flag=True, help='Only compare the stored totals with the ledger.')
+def rebuild_stock_movements_command(check):
+    """Recompute per-product stock movement totals from the inventory ledger."""
+    if check:
+        drifted = ledger.mismatches()
+        for product_id in drifted[:20]:
+            click.echo(f'product {product_id}: MISMATCH')
+        if drifted:
+            click.echo(f'{len(drifted)} products differ from the ledger.')
+            raise SystemExit(1)
+        click.echo('Stock movement totals match the ledger.')
+        return
+    
+    rows = ledger.rebuild()
+    db.session.commit()
+    click.echo(f'Stock movement totals rebuilt for {rows} products.')
+
+@reports_bp.cli.command('backfill-sales-facts')
+@click.option('--verify', is_flag=True, help='Only compare the fact table with a live aggregate of orders.')
+def backfill_sales_facts_command(verify):
+    """Rebuild the day/week/month sales facts from orders and order items."""
+    if not verify:
+        rows = sales_facts.rebuild()
+        db.session.commit()
+        click.echo(f'Sales facts rebuilt: {rows} rows.')
+    
+    drifted = sales_facts.mismatches()
+    for grain, period_start, status in drifted[:20]:
+        click.echo(f'{grain} {period_start} {status}: MISMATCH')
+    if drifted:
+        click.echo(f'{len(drifted)} fact rows differ from the live query.')
+        raise SystemExit(1)
+    click.echo('Sales facts match the live query.')
+
+@reports_bp.cli.command('update-reorder-levels')
+@click.option('--window-days', type=int, default=reorder.DEFAULT_WINDOW_DAYS, show_default=True, help='Days of sales history used.')
+@click.option('--service-level', type=float, default=reorder.DEFAULT_SERVICE_LEVEL, show_default=True,
+              help='Probability of not stocking out during a lead time.')
+@click.option('--lead-time-days', type=float, default=reorder.DEFAULT_LEAD_TIME_DAYS, show_default=True,
+              help='Lead time for products and suppliers without receipts.')
+@click.option('--dry-run', is_flag=True, help='Only report how many reorder levels would change.')
+def update_reorder_levels_command(window_days, service_level, lead_time_days, dry_run):
+    """Recompute reorder points from demand and lead times and store them as reorder levels."""
+    try:
+        _reorder_options({'window_days': window_days, 'service_level': service_level, 'lead_time_days': lead_time_days})
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    started = datetime.utcnow()
+    inputs = reorder.load_inputs(window_days)
+    result = reorder.compute(inputs, service_level, lead_time_days)
+    summary = reorder.summary(inputs, result)
+    computed = (datetime.utcnow() - started).total_seconds()
+    click.echo(
+        f"{summary['products']} products, {summary['products_with_demand']} with demand, "
+        f"{summary['changed']} reorder levels differ (computed in {computed:.2f}s)."
+    )
+    if not dry_run:
+        updated = reorder.apply(inputs, result)
+        db.session.commit()
+        click.echo(f'Reorder levels updated for {updated} products.')
+
+@reports_bp.cli.command('compact-snapshots')
+@click.option('--through', type=click.DateTime(['%Y-%m-%d']), help='Last day to snapshot (default: yesterday, UTC).')
+@click.option('--since', type=click.DateTime(['%Y-%m-%d']), help='Rebuild snapshots from this day instead of continuing after the last one.')
+@click.option('--retention-days', type=int, default=snapshots.DEFAULT_RETENTION_DAYS, show_default=True,
+              help='Keep daily snapshots this long; older ones are thinned to month ends.')
+def compact_snapshots_command(through, since, retention_days):
+    """Write the daily stock snapshots missing since the last run."""
+    summary = snapshots.compact(
+        through=through.date() if through else None,
+        since=since.date() if since else None,
+        retention_days=retention_days
+    )
+    db.session.commit()
+    click.echo(
+        f"Snapshots through {summary['through']}: {summary['days_written']} days "
+        f"({summary['rows_written']} rows) written, {summary['days_pruned']} days pruned."
+    )
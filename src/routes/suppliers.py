@@ -1,42 +1,57 @@
 from flask import Blueprint, request, jsonify
-from src.models.inventory import db, Supplier, PurchaseOrder, PurchaseOrderItem, Product, InventoryTransaction
-from datetime import datetime, date
-from decimal import Decimal
+from src.models.inventory import db, Supplier, PurchaseOrder, PurchaseOrderItem, ITEM_MODES
+from src.models.search import apply_search
+from src.services import counters, stock
+from src.services.conditional import conditional_get
+from src.services.product_cache import get_product_cache
+from src.utils.pagination import CursorError, paginate_request
+from sqlalchemy import update
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
 suppliers_bp = Blueprint('suppliers', __name__)
 
+def purchase_order_query(include_items='full'):
+    """Purchase order query that batch-loads what PurchaseOrder.to_dict(include_items) reads."""
+    query = PurchaseOrder.query.options(joinedload(PurchaseOrder.supplier))
+    if include_items == 'full':
+        query = query.options(
+            selectinload(PurchaseOrder.purchase_order_items).joinedload(PurchaseOrderItem.product)
+        )
+    elif include_items == 'summary':
+        query = query.options(selectinload(PurchaseOrder.purchase_order_items))
+    return query
+
+def purchase_order_product_names(purchase_order):
+    """{product_id: name} for a purchase order's lines, from the product cache"""
+    return get_product_cache().names(item.product_id for item in purchase_order.purchase_order_items)
+
 @suppliers_bp.route('/suppliers', methods=['GET'])
+@conditional_get('suppliers')
 def get_suppliers():
     """Get all suppliers"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         search = request.args.get('search', '')
         
         query = Supplier.query
         
         if search:
-            query = query.filter(
-                Supplier.supplier_name.contains(search) |
-                Supplier.contact_person.contains(search) |
-                Supplier.email.contains(search)
+            query = apply_search(
+                query, Supplier, 'suppliers_fts', search,
+                [Supplier.supplier_name, Supplier.contact_person, Supplier.email]
             )
         
-        suppliers = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'suppliers': [supplier.to_dict() for supplier in suppliers.items],
-            'total': suppliers.total,
-            'pages': suppliers.pages,
-            'current_page': page,
-            'per_page': per_page
-        })
+        return jsonify(paginate_request(
+            query, [(Supplier.supplier_id, False)], Supplier.to_dict, 'suppliers'
+        ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @suppliers_bp.route('/suppliers/<int:supplier_id>', methods=['GET'])
+@conditional_get('suppliers')
 def get_supplier(supplier_id):
     """Get a specific supplier by ID"""
     try:
@@ -65,6 +80,7 @@ def create_supplier():
         )
         
         db.session.add(supplier)
+        counters.record({'total_suppliers': 1})
         db.session.commit()
         
         return jsonify(supplier.to_dict()), 201
@@ -96,6 +112,9 @@ def update_supplier(supplier_id):
             supplier.country = data['country']
         
         db.session.commit()
+        if 'supplier_name' in data:
+            # Cached products carry their supplier's name
+            get_product_cache().clear()
         
         return jsonify(supplier.to_dict())
     except Exception as e:
@@ -112,6 +131,7 @@ def delete_supplier(supplier_id):
         if supplier.products:
             return jsonify({'error': 'Cannot delete supplier with associated products'}), 400
         
+        counters.record({'total_suppliers': -1})
         db.session.delete(supplier)
         db.session.commit()
         
@@ -123,15 +143,18 @@ def delete_supplier(supplier_id):
 # Purchase Orders endpoints
 
 @suppliers_bp.route('/purchase-orders', methods=['GET'])
+@conditional_get('purchase_orders', 'purchase_order_items', 'suppliers', 'products')
 def get_purchase_orders():
     """Get all purchase orders"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         status = request.args.get('status')
         supplier_id = request.args.get('supplier_id', type=int)
+        include_items = request.args.get('include_items', 'full')
+        
+        if include_items not in ITEM_MODES:
+            return jsonify({'error': f'include_items must be one of: {", ".join(ITEM_MODES)}'}), 400
         
-        query = PurchaseOrder.query
+        query = purchase_order_query(include_items)
         
         if status:
             query = query.filter(PurchaseOrder.status == status)
@@ -140,27 +163,25 @@ def get_purchase_orders():
             query = query.filter(PurchaseOrder.supplier_id == supplier_id)
         
         # Order by most recent first
-        query = query.order_by(PurchaseOrder.order_date.desc())
-        
-        purchase_orders = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'purchase_orders': [po.to_dict() for po in purchase_orders.items],
-            'total': purchase_orders.total,
-            'pages': purchase_orders.pages,
-            'current_page': page,
-            'per_page': per_page
-        })
+        query = query.order_by(PurchaseOrder.order_date.desc(), PurchaseOrder.purchase_order_id.desc())
+        
+        return jsonify(paginate_request(
+            query,
+            [(PurchaseOrder.order_date, True), (PurchaseOrder.purchase_order_id, True)],
+            lambda po: po.to_dict(include_items),
+            'purchase_orders'
+        ))
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @suppliers_bp.route('/purchase-orders/<int:purchase_order_id>', methods=['GET'])
+@conditional_get('purchase_orders', 'purchase_order_items', 'suppliers', 'products')
 def get_purchase_order(purchase_order_id):
     """Get a specific purchase order by ID"""
     try:
-        purchase_order = PurchaseOrder.query.get_or_404(purchase_order_id)
+        purchase_order = purchase_order_query().get_or_404(purchase_order_id)
         return jsonify(purchase_order.to_dict())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -183,6 +204,23 @@ def create_purchase_order():
         if not supplier:
             return jsonify({'error': 'Supplier not found'}), 404
         
+        # Validate items before anything is written
+        lines = []
+        for item_data in data['items']:
+            if 'product_id' not in item_data or 'quantity' not in item_data or 'unit_cost' not in item_data:
+                return jsonify({'error': 'Each item must have product_id, quantity, and unit_cost'}), 400
+            
+            try:
+                product_id = int(item_data['product_id'])
+                quantity = int(item_data['quantity'])
+            except (TypeError, ValueError):
+                return jsonify({'error': 'product_id and quantity must be integers'}), 400
+            try:
+                unit_cost = Decimal(str(item_data['unit_cost']))
+            except InvalidOperation:
+                return jsonify({'error': f'Invalid unit_cost: {item_data["unit_cost"]}'}), 400
+            lines.append((product_id, quantity, unit_cost))
+        
         # Create purchase order
         purchase_order = PurchaseOrder(
             supplier_id=data['supplier_id'],
@@ -195,18 +233,14 @@ def create_purchase_order():
         db.session.flush()  # Get the purchase order ID
         
         total_amount = Decimal('0')
+        products = get_product_cache().lookup(product_id for product_id, _, _ in lines)
         
         # Process purchase order items
-        for item_data in data['items']:
-            if 'product_id' not in item_data or 'quantity' not in item_data or 'unit_cost' not in item_data:
-                return jsonify({'error': 'Each item must have product_id, quantity, and unit_cost'}), 400
-            
-            product = Product.query.get(item_data['product_id'])
+        for product_id, quantity, unit_cost in lines:
+            product = products.get(product_id)
             if not product:
-                return jsonify({'error': f'Product {item_data["product_id"]} not found'}), 404
+                return jsonify({'error': f'Product {product_id} not found'}), 404
             
-            quantity = int(item_data['quantity'])
-            unit_cost = Decimal(str(item_data['unit_cost']))
             total_cost = unit_cost * quantity
             
             purchase_order_item = PurchaseOrderItem(
@@ -225,7 +259,9 @@ def create_purchase_order():
         
         db.session.commit()
         
-        return jsonify(purchase_order.to_dict()), 201
+        return jsonify(purchase_order.to_dict(
+            product_names={product_id: product.product_name for product_id, product in products.items()}
+        )), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -247,7 +283,7 @@ def update_purchase_order(purchase_order_id):
         
         db.session.commit()
         
-        return jsonify(purchase_order.to_dict())
+        return jsonify(purchase_order.to_dict(product_names=purchase_order_product_names(purchase_order)))
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -256,38 +292,43 @@ def update_purchase_order(purchase_order_id):
 def receive_purchase_order(purchase_order_id):
     """Mark purchase order as received and update stock levels"""
     try:
-        purchase_order = PurchaseOrder.query.get_or_404(purchase_order_id)
-        
-        if purchase_order.status == 'Delivered':
+        def receive():
+            purchase_order = PurchaseOrder.query.get_or_404(purchase_order_id)
+            
+            # Guarded on the status, so a purchase order is only received once
+            received = db.session.execute(
+                update(PurchaseOrder)
+                .where(PurchaseOrder.purchase_order_id == purchase_order_id, PurchaseOrder.status != 'Delivered')
+                .values(status='Delivered')
+            ).rowcount
+            if not received:
+                return None
+            
+            # Update stock levels for all items
+            stock.apply([
+                {
+                    'product_id': item.product_id,
+                    'transaction_type': 'IN',
+                    'quantity': item.quantity,
+                    'reference_type': 'PURCHASE_ORDER',
+                    'reference_id': purchase_order_id,
+                    'notes': f'Stock increased due to purchase order #{purchase_order_id}'
+                }
+                for item in purchase_order.purchase_order_items
+            ])
+            return purchase_order
+        
+        purchase_order = stock.run_with_retry(receive)
+        if purchase_order is None:
             return jsonify({'error': 'Purchase order already received'}), 400
         
-        # Update stock levels for all items
-        for item in purchase_order.purchase_order_items:
-            product = Product.query.get(item.product_id)
-            if product:
-                product.stock_level += item.quantity
-                product.updated_at = datetime.utcnow()
-                
-                # Create inventory transaction
-                transaction = InventoryTransaction(
-                    product_id=product.product_id,
-                    transaction_type='IN',
-                    quantity=item.quantity,
-                    reference_type='PURCHASE_ORDER',
-                    reference_id=purchase_order_id,
-                    notes=f'Stock increased due to purchase order #{purchase_order_id}'
-                )
-                db.session.add(transaction)
-        
-        # Update purchase order status
-        purchase_order.status = 'Delivered'
-        
-        db.session.commit()
-        
         return jsonify({
             'message': 'Purchase order received successfully',
-            'purchase_order': purchase_order.to_dict()
+            'purchase_order': purchase_order.to_dict(product_names=purchase_order_product_names(purchase_order))
         })
+    except stock.StockError as e:
+        db.session.rollback()
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,70 @@
+"""HTTP conditional GET from table write versions.
+
+A response built from a known set of tables is identified by the write
+versions of those tables (src/services/versions.py), read with one small
+query. Its weak ETag hashes those versions and the Accept header, and
+its Last-Modified is the latest updated_at among them. A request whose
+If-None-Match (or, without one, If-Modified-Since) still matches gets a
+304 Not Modified before the view runs, so neither the query nor the
+serialization happens. Responses carry Cache-Control: no-cache, so
+browsers keep the body but revalidate on every use.
+
+Responses that also depend on the clock pass ttl: the ETag then changes
+every ttl seconds even without writes.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+from src.services.versions import current_versions
+
+def validators(versions, ttl=None):
+    """(etag, last_modified) for a response built from tables at versions"""
+    tables = sorted(versions)
+    key = [f'{table}:{versions[table][0]}' for table in tables]
+    key.append(request.headers.get('Accept', ''))
+    changed = [updated_at for _, updated_at in versions.values() if updated_at]
+    last_modified = max(changed).replace(tzinfo=timezone.utc) if changed else None
+    if ttl:
+        bucket = int(time.time() // ttl)
+        key.append(str(bucket))
+        bucket_start = datetime.fromtimestamp(bucket * ttl, timezone.utc)
+        last_modified = max(last_modified, bucket_start) if last_modified else bucket_start
+    # Last-Modified has one-second resolution: one from the current second
+    # could hide a write later in that second, so it is only sent once past
+    if last_modified and int(last_modified.timestamp()) >= int(time.time()):
+        last_modified = None
+    etag = hashlib.sha1('|'.join(key).encode()).hexdigest()[:20]
+    return etag, last_modified
+
+def _with_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.vary.add('Accept')
+    return response
+
+def conditional_response(versions, build, ttl=None):
+    """304 if the client's copy matches versions, else build() with validators when it is a 200"""
+    if request.method not in ('GET', 'HEAD'):
+        return build()
+    etag, last_modified = validators(versions, ttl)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return _with_validators(current_app.response_class(status=304), etag, last_modified)
+    response = current_app.make_response(build())
+    if response.status_code == 200:
+        _with_validators(response, etag, last_modified)
+    return response
+
+def conditional_get(*tables, ttl=None):
+    """Answer conditional GETs of a view that only reads tables"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return conditional_response(current_versions(tables), lambda: view(*args, **kwargs), ttl)
+
+        return wrapper
+    return decorator
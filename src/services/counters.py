@@ -0,0 +1,158 @@
+"""Incrementally maintained dashboard counters.
+
+Write paths describe how a row contributed to the dashboard before and
+after their change (product_totals()/order_totals()) and call record() with
+the difference. record() turns that into a single
+UPDATE dashboard_counters SET x = x + :dx statement executed in the
+caller's transaction, so counters commit or roll back with the data.
+rebuild() recomputes everything from the base tables.
+"""
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, select, update
+from src.models.inventory import db, Product, Order, Category, Supplier
+from src.models.aggregates import DashboardCounters
+
+COUNTER_ID = 1
+COUNTER_FIELDS = (
+    'total_products', 'low_stock_count', 'total_inventory_value', 'total_orders',
+    'pending_orders', 'total_revenue', 'total_categories', 'total_suppliers'
+)
+MONEY_FIELDS = ('total_inventory_value', 'total_revenue')
+
+def product_totals(product, stock_level=None):
+    """Counter contribution of one product row (optionally at another stock level)"""
+    if product is None:
+        return {}
+    stock_level = product.stock_level if stock_level is None else stock_level
+    reorder_level = product.reorder_level
+    return {
+        'total_products': 1,
+        'low_stock_count': int(reorder_level is not None and stock_level <= reorder_level),
+        'total_inventory_value': Decimal(stock_level or 0) * Decimal(str(product.unit_price or 0))
+    }
+
+def order_totals(status, total_amount):
+    """Counter contribution of one order with the given status and total"""
+    return {
+        'total_orders': 1,
+        'pending_orders': int(status == 'Pending'),
+        'total_revenue': Decimal(str(total_amount or 0)) if status == 'Delivered' else Decimal('0')
+    }
+
+def change(before, after):
+    """Deltas that turn the contribution before into the contribution after"""
+    deltas = dict(after)
+    for field, value in before.items():
+        deltas[field] = deltas.get(field, 0) - value
+    return deltas
+
+def stock_change(product, old_stock_level, new_stock_level):
+    """Deltas for moving a product from one stock level to another"""
+    return change(
+        product_totals(product, stock_level=old_stock_level),
+        product_totals(product, stock_level=new_stock_level)
+    )
+
+def combine(*deltas):
+    """Sum contributions or deltas field by field"""
+    totals = {}
+    for delta in deltas:
+        for field, value in delta.items():
+            totals[field] = totals.get(field, 0) + value
+    return totals
+
+def record(*deltas):
+    """Apply the sum of deltas to the counters row in the current transaction"""
+    totals = combine(*deltas)
+    values = {
+        field: getattr(DashboardCounters, field) + value
+        for field, value in totals.items() if value
+    }
+    if values:
+        db.session.execute(
+            update(DashboardCounters)
+            .where(DashboardCounters.counter_id == COUNTER_ID)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+
+def live_totals():
+    """Compute every counter from the base tables (one statement)"""
+    row = db.session.execute(select(
+        select(func.count()).select_from(Product).scalar_subquery().label('total_products'),
+        select(func.count()).select_from(Product)
+            .where(Product.stock_level <= Product.reorder_level).scalar_subquery().label('low_stock_count'),
+        select(func.coalesce(func.sum(Product.stock_level * Product.unit_price), 0))
+            .scalar_subquery().label('total_inventory_value'),
+        select(func.count()).select_from(Order).scalar_subquery().label('total_orders'),
+        select(func.count()).select_from(Order)
+            .where(Order.status == 'Pending').scalar_subquery().label('pending_orders'),
+        select(func.coalesce(func.sum(Order.total_amount), 0))
+            .where(Order.status == 'Delivered').scalar_subquery().label('total_revenue'),
+        select(func.count()).select_from(Category).scalar_subquery().label('total_categories'),
+        select(func.count()).select_from(Supplier).scalar_subquery().label('total_suppliers')
+    )).one()
+    return _normalize(row._asdict())
+
+def stored_totals():
+    """Read the counters row, or None if it has never been built"""
+    counters = db.session.get(DashboardCounters, COUNTER_ID, populate_existing=True)
+    if counters is None:
+        return None
+    return _normalize({field: getattr(counters, field) for field in COUNTER_FIELDS})
+
+def dashboard_totals(since):
+    """Counters row plus the number of orders placed since a date, in one statement"""
+    recent_orders = select(func.count()).select_from(Order).where(Order.order_date >= since)
+    row = db.session.execute(
+        select(
+            *[getattr(DashboardCounters, field) for field in COUNTER_FIELDS],
+            recent_orders.scalar_subquery().label('recent_orders')
+        ).where(DashboardCounters.counter_id == COUNTER_ID)
+    ).first()
+    if row is None:
+        return None
+    totals = _normalize(row._asdict())
+    totals['recent_orders'] = row.recent_orders
+    return totals
+
+def rebuild():
+    """Recompute the counters from scratch and return (previous, rebuilt).
+
+    The counters row is deleted first so the transaction holds the write
+    lock while the aggregates are read; the caller commits.
+    """
+    previous = stored_totals()
+    db.session.execute(
+        DashboardCounters.__table__.delete().where(DashboardCounters.counter_id == COUNTER_ID)
+    )
+    db.session.expire_all()
+    rebuilt = live_totals()
+    db.session.execute(
+        DashboardCounters.__table__.insert().values(
+            counter_id=COUNTER_ID, rebuilt_at=datetime.utcnow(), **rebuilt
+        )
+    )
+    return previous, rebuilt
+
+def ensure_counters():
+    """Build the counters row if this database does not have one yet"""
+    if stored_totals() is None:
+        rebuild()
+        db.session.commit()
+
+def mismatches(stored, live):
+    """Fields whose stored value differs from the live aggregate"""
+    if stored is None:
+        return list(COUNTER_FIELDS)
+    return [
+        field for field in COUNTER_FIELDS
+        if abs(Decimal(str(stored[field])) - Decimal(str(live[field]))) > Decimal('0.005')
+    ]
+
+def _normalize(values):
+    return {
+        field: float(values[field] or 0) if field in MONEY_FIELDS else int(values[field] or 0)
+        for field in COUNTER_FIELDS
+    }
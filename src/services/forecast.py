@@ -0,0 +1,341 @@
+"""Demand forecasts for every SKU, fitted in batch with NumPy.
+
+Demand is the units of order lines whose order is not cancelled, per SKU
+and closed day or week (weeks start on Monday, like the sales facts); the
+period in progress is never fitted. Two models are run over every SKU of
+a chunk at once:
+
+- simple exponential smoothing (SES) of the demand level
+- Croston's method, which smooths the size of non-zero demands and the
+  interval between them separately, for intermittent demand
+
+Most SKUs sell in few periods, so only the (SKU, period) cells with demand
+are materialised; runs of periods without demand are applied in closed
+form (the SES level decays geometrically, Croston's forecast holds). Each
+model is run for every smoothing constant in ALPHAS side by side and
+keeps, per SKU, the one with the smallest one-step-ahead squared error. A
+SKU is forecast with Croston when its average demand interval exceeds
+INTERMITTENT_ADI and with SES otherwise. Chunks are fitted on a pool of
+FORECAST_WORKERS threads; NumPy releases the GIL inside its array loops,
+so the chunks run on separate cores.
+
+The fitted state (chosen constants and the smoothing state after the last
+fitted period) is kept per grain. When periods have closed since, only
+those periods are read and the models continue from the stored state with
+the constants they already chose; the constants are re-chosen by a full
+fit once REFIT_FRACTION of the history has been added that way. Before
+reusing a state its per-period unit totals are compared with the sales
+facts, so orders written, edited or cancelled in periods already fitted
+cause a full fit.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+from src.models.inventory import db, Order, OrderItem, Product
+from src.models.aggregates import SalesFact
+from src.services import sales_facts
+
+GRAINS = ('day', 'week')
+PERIOD_DAYS = {'day': 1, 'week': 7}
+DEFAULT_HISTORY = {'day': 90, 'week': 26}
+DEFAULT_HORIZON = {'day': 14, 'week': 8}
+ALPHAS = np.array([0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5])
+DEFAULT_ALPHA = 1  # index into ALPHAS for products added after a fit
+INTERMITTENT_ADI = 1.32  # Syntetos-Boylan cut-off between smooth and intermittent demand
+REFIT_FRACTION = 0.25
+CHUNK_SIZE = 65536
+
+MODELS = ('none', 'ses', 'croston')
+STATE_ARRAYS = ('level', 'size', 'interval', 'since', 'seen', 'nonzero', 'ses_alpha', 'croston_alpha')
+
+@dataclass
+class FittedState:
+    """Smoothing state of every product after the last fitted period"""
+    grain: str
+    history: int
+    start: object           # first fitted period
+    periods: int            # periods fitted so far
+    full_periods: int       # periods covered by the last full fit
+    totals: np.ndarray      # units per fitted period, checked against the sales facts
+    product_ids: np.ndarray  # sorted
+    level: np.ndarray       # SES level
+    size: np.ndarray        # Croston demand size
+    interval: np.ndarray    # Croston demand interval
+    since: np.ndarray       # periods since the last demand
+    seen: np.ndarray        # whether the product had any demand yet
+    nonzero: np.ndarray     # periods with demand
+    ses_alpha: np.ndarray   # indexes into ALPHAS
+    croston_alpha: np.ndarray
+    fitted_at: datetime
+
+    @property
+    def end(self):
+        """First period not fitted yet"""
+        return self.start + timedelta(days=PERIOD_DAYS[self.grain] * self.periods)
+
+def _product_ids():
+    # Core execution on the session's connection: engine events still fire, ORM row handling is skipped
+    rows = db.session.connection().execute(select(Product.product_id).order_by(Product.product_id))
+    return np.fromiter(rows.scalars(), dtype=np.int64)
+
+def _order_lines(grain, start, periods):
+    """(product_id, period index, units) arrays of live order lines per product and day in the periods from start"""
+    end = start + timedelta(days=PERIOD_DAYS[grain] * periods)
+    day = func.date(Order.order_date)
+    rows = db.session.connection().execute(
+        select(OrderItem.product_id, day, func.sum(OrderItem.quantity))
+        .join(Order, Order.order_id == OrderItem.order_id)
+        .where(
+            Order.order_date >= datetime.combine(start, time()),
+            Order.order_date < datetime.combine(end, time()),
+            func.coalesce(Order.status, '') != 'Cancelled'
+        ).group_by(OrderItem.product_id, day)
+    ).all()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    products, days, units = zip(*rows)
+    # date() gives text on SQLite and dates elsewhere; each distinct day is converted once
+    offsets = {value: ((value if isinstance(value, date) else date.fromisoformat(value)) - start).days for value in set(days)}
+    periods = np.fromiter((offsets[value] for value in days), dtype=np.int64, count=len(days)) // PERIOD_DAYS[grain]
+    return np.array(products, dtype=np.int64), periods, np.array(units, dtype=np.float64)
+
+def _fact_totals(grain, start, periods):
+    """Units per period from the sales facts, for orders that are not cancelled"""
+    end = start + timedelta(days=PERIOD_DAYS[grain] * periods)
+    totals = np.zeros(periods, dtype=np.int64)
+    for period_start, units in db.session.execute(
+        select(SalesFact.period_start, func.sum(SalesFact.items_sold))
+        .where(
+            SalesFact.grain == grain,
+            SalesFact.period_start >= start,
+            SalesFact.period_start < end,
+            SalesFact.status != 'Cancelled'
+        ).group_by(SalesFact.period_start)
+    ):
+        totals[(period_start - start).days // PERIOD_DAYS[grain]] = units or 0
+    return totals
+
+class Demand:
+    """Units per product position and period, for the periods in which a product had demand"""
+
+    def __init__(self, product_ids, products, periods, units, period_count):
+        positions = np.searchsorted(product_ids, products)
+        positions = np.minimum(positions, max(len(product_ids) - 1, 0))
+        found = product_ids[positions] == products if len(product_ids) else np.zeros(len(products), dtype=bool)
+        cells, index = np.unique(positions[found] * period_count + periods[found], return_inverse=True)
+        self.units = np.bincount(index, weights=units[found], minlength=len(cells))
+        self.positions = cells // period_count
+        self.periods = cells % period_count
+        self.period_count = period_count
+
+    def chunk(self, lo, hi):
+        """(columns, periods, units) of the cells of product positions lo..hi-1, by column then period"""
+        first, last = np.searchsorted(self.positions, (lo, hi))
+        return self.positions[first:last] - lo, self.periods[first:last], self.units[first:last]
+
+def _skip(state, columns, gaps, ses_alpha, croston_alpha, ses_error, croston_error):
+    """Advance columns over gaps periods without demand, in closed form"""
+    decay = 1 - ses_alpha[:, columns]
+    level = state['level'][:, columns]
+    # SES errors are the level itself, shrinking by decay each period
+    ses_error[:, columns] += level * level * (1 - decay ** (2 * gaps)) / (1 - decay * decay)
+    state['level'][:, columns] = level * decay ** gaps
+    # Croston's forecast stays put until the next demand
+    with np.errstate(divide='ignore', invalid='ignore'):
+        forecast = np.where(state['seen'][columns], state['size'][:, columns] / state['interval'][:, columns], 0.0)
+    croston_error[:, columns] += gaps * forecast * forecast
+    state['since'][columns] += gaps
+
+def _observe(state, columns, units, ses_alpha, croston_alpha, ses_error, croston_error):
+    """Update columns with one period in which they had demand"""
+    error = units - state['level'][:, columns]
+    ses_error[:, columns] += error * error
+    state['level'][:, columns] += ses_alpha[:, columns] * error
+
+    seen = state['seen'][columns]
+    size, interval = state['size'][:, columns], state['interval'][:, columns]
+    since = state['since'][columns] + 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error = np.where(seen, units - size / interval, 0.0)
+    croston_error[:, columns] += error * error
+    alpha = croston_alpha[:, columns]
+    # Croston starts from the first demand: its size, and the periods it took to arrive
+    state['size'][:, columns] = np.where(seen, size + alpha * (units - size), units)
+    state['interval'][:, columns] = np.where(seen, interval + alpha * (since - interval), since)
+    state['since'][columns] = 0
+    state['seen'][columns] = True
+    state['nonzero'][columns] += 1
+
+def _smooth(cells, period_count, state, ses_alpha, croston_alpha):
+    """Run SES and Croston over period_count periods from state, in place.
+
+    cells are the (columns, periods, units) with demand. level, size,
+    interval and both alphas have one row per candidate constant, so a fit
+    tries every constant at once and an update runs one row with each
+    product's own constant. Periods without demand are applied in closed
+    form, so the work grows with the cells rather than products x periods.
+    Returns the summed squared one-step errors of both models.
+    """
+    columns, periods, units = cells
+    ses_error = np.zeros(state['level'].shape)
+    croston_error = np.zeros(state['size'].shape)
+    width = len(state['since'])
+
+    # Cells by their rank within the column: round r handles every column's r-th demand
+    first = np.searchsorted(columns, columns)
+    rank = np.arange(len(columns)) - first
+    previous = np.where(rank > 0, np.roll(periods, 1), -1)
+    gaps = periods - previous - 1
+    order = np.argsort(rank, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(rank))]) if len(rank) else [0]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        cell = order[lo:hi]
+        _skip(state, columns[cell], gaps[cell], ses_alpha, croston_alpha, ses_error, croston_error)
+        _observe(state, columns[cell], units[cell], ses_alpha, croston_alpha, ses_error, croston_error)
+
+    last = np.full(width, -1)
+    ends = np.flatnonzero(np.append(columns[1:] != columns[:-1], True)) if len(columns) else []
+    last[columns[ends]] = periods[ends]
+    _skip(state, np.arange(width), period_count - 1 - last, ses_alpha, croston_alpha, ses_error, croston_error)
+    return ses_error, croston_error
+
+def _fit_chunk(cells, period_count, width):
+    """Fitted state for one chunk of products, choosing each product's constants from ALPHAS"""
+    columns, _, units = cells
+    candidates = len(ALPHAS)
+    alphas = np.broadcast_to(ALPHAS[:, None], (candidates, width))
+    state = {
+        # SES starts from the mean demand of the history, Croston from the first demand
+        'level': np.repeat(np.bincount(columns, weights=units, minlength=width)[None, :] / period_count, candidates, 0),
+        'size': np.zeros((candidates, width)),
+        'interval': np.zeros((candidates, width)),
+        'since': np.zeros(width),
+        'seen': np.zeros(width, dtype=bool),
+        'nonzero': np.zeros(width, dtype=np.int64)
+    }
+    ses_error, croston_error = _smooth(cells, period_count, state, alphas, alphas)
+    products = np.arange(width)
+    ses_alpha, croston_alpha = ses_error.argmin(axis=0), croston_error.argmin(axis=0)
+    return {
+        'level': state['level'][ses_alpha, products],
+        'size': state['size'][croston_alpha, products],
+        'interval': state['interval'][croston_alpha, products],
+        'since': state['since'],
+        'seen': state['seen'],
+        'nonzero': state['nonzero'],
+        'ses_alpha': ses_alpha,
+        'croston_alpha': croston_alpha
+    }
+
+def _extend_chunk(cells, period_count, width, state):
+    """State for one chunk continued over new periods with its chosen constants"""
+    state = {name: values.copy() for name, values in state.items()}
+    smoothed = {name: state[name][None, :] for name in ('level', 'size', 'interval')}
+    _smooth(
+        cells, period_count, {**state, **smoothed},
+        ALPHAS[state['ses_alpha']][None, :], ALPHAS[state['croston_alpha']][None, :]
+    )
+    return state
+
+def _in_chunks(function, demand, size, workers, states=None):
+    """Apply function to each chunk of products, on a thread pool when there are several"""
+    bounds = [(lo, min(lo + CHUNK_SIZE, size)) for lo in range(0, size, CHUNK_SIZE)] or [(0, 0)]
+
+    def run(bound):
+        lo, hi = bound
+        arguments = (demand.chunk(lo, hi), demand.period_count, hi - lo)
+        if states is None:
+            return function(*arguments)
+        return function(*arguments, {name: states[name][lo:hi] for name in STATE_ARRAYS})
+
+    if workers > 1 and len(bounds) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast') as executor:
+            chunks = list(executor.map(run, bounds))
+    else:
+        chunks = [run(bound) for bound in bounds]
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in STATE_ARRAYS}
+
+def _aligned(state, product_ids):
+    """State arrays for product_ids: products added since start out empty, deleted ones are dropped"""
+    positions = np.searchsorted(state.product_ids, product_ids)
+    positions = np.minimum(positions, max(len(state.product_ids) - 1, 0))
+    known = state.product_ids[positions] == product_ids if len(state.product_ids) else \
+        np.zeros(len(product_ids), dtype=bool)
+    defaults = {'since': state.periods, 'ses_alpha': DEFAULT_ALPHA, 'croston_alpha': DEFAULT_ALPHA}
+    arrays = {}
+    for name in STATE_ARRAYS:
+        values = getattr(state, name)
+        arrays[name] = np.where(known, values[positions] if len(values) else defaults.get(name, 0),
+                                defaults.get(name, 0)).astype(values.dtype)
+    return arrays
+
+class Forecaster:
+    """Fitted states per grain, shared by the application's threads"""
+
+    def __init__(self, workers):
+        self.workers = max(workers, 1)
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def fitted(self, grain, history, now=None):
+        """(state, how) for grain over the last history closed periods; how is 'full', 'incremental' or 'cached'"""
+        length = PERIOD_DAYS[grain]
+        current = sales_facts.period_start(grain, (now or datetime.utcnow()).date())
+        with self.lock:
+            state = self.states.get(grain)
+            if state is not None and state.history == history and state.end <= current:
+                new_periods = (current - state.end).days // length
+                added = state.periods - state.full_periods + new_periods
+                if added <= max(int(history * REFIT_FRACTION), 1) and \
+                        np.array_equal(_fact_totals(grain, state.start, state.periods), state.totals):
+                    if not new_periods:
+                        return state, 'cached'
+                    self.states[grain] = self._extend(state, new_periods)
+                    return self.states[grain], 'incremental'
+            self.states[grain] = self._fit(grain, history, current - timedelta(days=length * history))
+            return self.states[grain], 'full'
+
+    def _fit(self, grain, history, start):
+        product_ids = _product_ids()
+        products, periods, units = _order_lines(grain, start, history)
+        demand = Demand(product_ids, products, periods, units, history)
+        arrays = _in_chunks(_fit_chunk, demand, len(product_ids), self.workers)
+        return FittedState(
+            grain=grain, history=history, start=start, periods=history, full_periods=history,
+            totals=np.bincount(periods, weights=units, minlength=history).astype(np.int64),
+            product_ids=product_ids, fitted_at=datetime.utcnow(), **arrays
+        )
+
+    def _extend(self, state, new_periods):
+        product_ids = _product_ids()
+        products, periods, units = _order_lines(state.grain, state.end, new_periods)
+        demand = Demand(product_ids, products, periods, units, new_periods)
+        arrays = _in_chunks(_extend_chunk, demand, len(product_ids), self.workers, _aligned(state, product_ids))
+        return replace(
+            state, periods=state.periods + new_periods, product_ids=product_ids, fitted_at=datetime.utcnow(),
+            totals=np.concatenate([state.totals, np.bincount(periods, weights=units, minlength=new_periods).astype(np.int64)]),
+            **arrays
+        )
+
+def forecasts(state):
+    """Per-product model index (into MODELS), chosen constant and forecast demand per period"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        interval = np.where(state.nonzero > 0, state.periods / state.nonzero, np.inf)
+        croston = np.where(state.seen, state.size / state.interval, 0.0)
+    model = np.where(state.nonzero == 0, 0, np.where(interval > INTERMITTENT_ADI, 2, 1))
+    rate = np.where(model == 2, croston, np.where(model == 1, np.maximum(state.level, 0.0), 0.0))
+    alpha = np.where(model == 2, ALPHAS[state.croston_alpha], np.where(model == 1, ALPHAS[state.ses_alpha], np.nan))
+    return model, alpha, rate, interval
+
+def get_forecaster():
+    """The application's Forecaster, with FORECAST_WORKERS threads (default: one per CPU)"""
+    forecaster = current_app.extensions.get('forecast')
+    if forecaster is None:
+        forecaster = Forecaster(current_app.config.get('FORECAST_WORKERS') or os.cpu_count() or 1)
+        current_app.extensions['forecast'] = forecaster
+    return forecaster
@@ -0,0 +1,221 @@
+"""Background runner for report jobs.
+
+POST /api/reports/jobs queues a registered report with its query
+parameters; a bounded thread pool runs it inside a request context built
+for the report's URL, so the report sees the same request.args (and uses
+the same report cache) as an interactive call. At most
+REPORT_JOB_WORKERS reports run at once and REPORT_JOB_QUEUE more may wait,
+so heavy analytics cannot occupy every WSGI thread or database connection
+the order and stock endpoints need. Threads suffice: SQLite executes
+queries without holding the GIL, and on Linux the worker threads run at
+nice REPORT_JOB_NICE so the scheduler favours request threads.
+
+Finished jobs keep their JSON result for REPORT_JOB_TTL seconds. A queued
+job is cancelled before it starts; a running one has its SQLite statement
+interrupted from the cancelling thread (on other databases its result is
+discarded when it finishes).
+"""
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from src.models.inventory import db
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_RESULT_TTL = 600
+DEFAULT_NICE = 10
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+class JobError(Exception):
+    """Job submission that is refused, reported to the client"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+class Job:
+    """One report run and its outcome"""
+
+    def __init__(self, report, endpoint, path, params):
+        self.job_id = uuid.uuid4().hex
+        self.report = report
+        self.endpoint = endpoint
+        self.path = path
+        self.params = params
+        self.status = QUEUED
+        self.submitted_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.status_code = None
+        self.result = None
+        self.error = None
+        self.future = None
+        self.connection = None  # DBAPI connection while running, for interrupt()
+        self.cancel_requested = False
+
+    def expires_at(self, ttl):
+        return self.finished_at + timedelta(seconds=ttl) if self.finished_at else None
+
+    def to_dict(self, ttl, include_result=True):
+        data = {
+            'job_id': self.job_id,
+            'report': self.report,
+            'params': self.params,
+            'status': self.status,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at(ttl).isoformat() if self.finished_at else None,
+            'duration_ms': round((self.finished_at - self.started_at).total_seconds() * 1000, 3)
+            if self.finished_at and self.started_at else None,
+            'status_code': self.status_code,
+            'error': self.error
+        }
+        if include_result and self.status == SUCCEEDED:
+            data['result'] = self.result
+        return data
+
+class JobRunner:
+    """Bounded pool of report workers plus the jobs it knows about"""
+
+    def __init__(self, app, max_workers=DEFAULT_WORKERS, max_queued=DEFAULT_QUEUE_SIZE, result_ttl=DEFAULT_RESULT_TTL,
+                 nice=DEFAULT_NICE):
+        self.app = app
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='report-job', initializer=_lower_priority, initargs=(nice,)
+        )
+        self.max_workers = max_workers
+
+    def submit(self, report, endpoint, path, params):
+        with self.lock:
+            self._expire()
+            queued = sum(1 for job in self.jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobError(f'Report job queue is full ({self.max_queued} waiting), retry later', 429)
+            job = Job(report, endpoint, path, params)
+            self.jobs[job.job_id] = job
+            job.future = self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            self._expire()
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            self._expire()
+            return sorted(self.jobs.values(), key=lambda job: job.submitted_at, reverse=True)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns the job, or None if unknown"""
+        with self.lock:
+            self._expire()
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            job.cancel_requested = True
+            if job.future.cancel():
+                self._finish(job, CANCELLED)
+            elif job.connection is not None and hasattr(job.connection, 'interrupt'):
+                job.connection.interrupt()
+        return job
+
+    def stats(self):
+        with self.lock:
+            self._expire()
+            counts = {status: 0 for status in (QUEUED, RUNNING, *FINISHED)}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+            return {
+                'workers': self.max_workers,
+                'max_queued': self.max_queued,
+                'result_ttl': self.result_ttl,
+                'jobs': counts
+            }
+
+    def _expire(self):
+        now = datetime.utcnow()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at and job.expires_at(self.result_ttl) <= now
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def _finish(self, job, status, status_code=None, result=None, error=None):
+        job.status = status
+        job.status_code = status_code
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        job.connection = None
+
+    def _run(self, job):
+        with self.lock:
+            if job.cancel_requested:
+                return
+            job.status = RUNNING
+            job.started_at = datetime.utcnow()
+
+        try:
+            outcome = self._execute(job)
+        except Exception as e:
+            outcome = (FAILED, 500, None, str(e))
+        with self.lock:
+            if job.cancel_requested:
+                self._finish(job, CANCELLED)
+            else:
+                self._finish(job, *outcome)
+
+    def _execute(self, job):
+        """Call the report view in a request context for its URL; returns (status, status_code, result, error)"""
+        with self.app.test_request_context(job.path, query_string=job.params, headers={'Accept': 'application/json'}):
+            connection = db.session.connection().connection.driver_connection
+            with self.lock:
+                if job.cancel_requested:
+                    return CANCELLED, None, None, None
+                job.connection = connection
+            try:
+                response = self.app.make_response(self.app.view_functions[job.endpoint]())
+            finally:
+                # The connection goes back to the pool when the context ends
+                with self.lock:
+                    job.connection = None
+        body = response.get_json(silent=True) or {}
+        if response.status_code < 400:
+            return SUCCEEDED, response.status_code, body, None
+        return FAILED, response.status_code, None, body.get('error') or response.status
+
+def _lower_priority(nice):
+    """Give the calling worker thread a lower CPU priority (Linux schedules threads individually)"""
+    if nice and sys.platform.startswith('linux'):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+        except OSError:
+            pass
+
+def get_job_runner():
+    """The application's JobRunner"""
+    return current_app.extensions['report_jobs']
+
+def init_report_jobs(app):
+    """Create the report job runner; its threads start with the first job"""
+    app.extensions['report_jobs'] = JobRunner(
+        app,
+        max_workers=app.config.get('REPORT_JOB_WORKERS', DEFAULT_WORKERS),
+        max_queued=app.config.get('REPORT_JOB_QUEUE', DEFAULT_QUEUE_SIZE),
+        result_ttl=app.config.get('REPORT_JOB_TTL', DEFAULT_RESULT_TTL),
+        nice=app.config.get('REPORT_JOB_NICE', DEFAULT_NICE)
+    )
@@ -0,0 +1,118 @@
+"""Inventory ledger writes and the per-product movement totals built from them.
+
+Every stock movement goes through record_transactions(), which inserts the
+inventory_transactions rows and adds them to product_stock_movements in
+the same transaction, so the totals commit or roll back with the ledger.
+rebuild() recomputes the totals from the whole ledger.
+"""
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from src.models.inventory import db, InventoryTransaction
+from src.models.aggregates import ProductStockMovement
+
+MOVEMENT_FIELDS = ('total_received', 'total_sold', 'total_adjustments', 'total_transactions')
+
+def _movement_totals(transactions):
+    """Sum transactions into {product_id: totals}"""
+    totals = defaultdict(lambda: dict.fromkeys(MOVEMENT_FIELDS, 0))
+    for transaction in transactions:
+        entry = totals[transaction['product_id']]
+        kind, quantity = transaction['transaction_type'], transaction['quantity']
+        if kind == 'IN':
+            entry['total_received'] += quantity
+        elif kind == 'OUT':
+            entry['total_sold'] += quantity
+        elif kind == 'ADJUSTMENT':
+            entry['total_adjustments'] += quantity
+        entry['total_transactions'] += 1
+    return totals
+
+def record_transactions(transactions):
+    """Insert ledger rows (dicts of InventoryTransaction columns) and update the movement totals.
+
+    One executemany for the ledger and one for the totals; products seen
+    for the first time get their totals row inserted. The caller commits.
+    """
+    if not transactions:
+        return
+    now = datetime.utcnow()
+    for transaction in transactions:
+        transaction.setdefault('transaction_date', now)
+    db.session.execute(insert(InventoryTransaction), transactions)
+
+    totals = _movement_totals(transactions)
+    params = [
+        {'pid': product_id, 'at': now, **{f'd_{field}': value for field, value in entry.items()}}
+        for product_id, entry in totals.items()
+    ]
+    result = db.session.execute(
+        update(ProductStockMovement.__table__)
+        .where(ProductStockMovement.product_id == bindparam('pid'))
+        .values(
+            last_transaction_at=bindparam('at'),
+            **{field: getattr(ProductStockMovement, field) + bindparam(f'd_{field}') for field in MOVEMENT_FIELDS}
+        ),
+        params
+    )
+    if result.rowcount < len(params):
+        existing = set(db.session.scalars(
+            select(ProductStockMovement.product_id).where(ProductStockMovement.product_id.in_(totals))
+        ))
+        db.session.execute(insert(ProductStockMovement), [
+            {'product_id': product_id, 'last_transaction_at': now, **entry}
+            for product_id, entry in totals.items() if product_id not in existing
+        ])
+
+def remove_product(product_id):
+    """Delete a product's ledger rows and movement totals, ahead of the product itself. The caller commits."""
+    db.session.execute(delete(InventoryTransaction).where(InventoryTransaction.product_id == product_id))
+    db.session.execute(delete(ProductStockMovement).where(ProductStockMovement.product_id == product_id))
+
+def live_movements():
+    """SELECT of the movement totals per product computed from the ledger"""
+    return select(
+        InventoryTransaction.product_id,
+        func.sum(InventoryTransaction.quantity).filter(InventoryTransaction.transaction_type == 'IN').label('total_received'),
+        func.sum(InventoryTransaction.quantity).filter(InventoryTransaction.transaction_type == 'OUT').label('total_sold'),
+        func.sum(InventoryTransaction.quantity).filter(InventoryTransaction.transaction_type == 'ADJUSTMENT').label('total_adjustments'),
+        func.count().label('total_transactions'),
+        func.max(InventoryTransaction.transaction_date).label('last_transaction_at')
+    ).group_by(InventoryTransaction.product_id)
+
+def rebuild():
+    """Replace the movement totals with ones computed from the ledger. Returns the row count. The caller commits."""
+    db.session.execute(delete(ProductStockMovement))
+    live = live_movements().subquery()
+    result = db.session.execute(insert(ProductStockMovement).from_select(
+        ['product_id', *MOVEMENT_FIELDS, 'last_transaction_at'],
+        select(
+            live.c.product_id,
+            *[func.coalesce(live.c[field], 0) for field in MOVEMENT_FIELDS],
+            live.c.last_transaction_at
+        )
+    ))
+    return result.rowcount
+
+def mismatches():
+    """Product ids whose stored totals differ from the ledger"""
+    live = {row.product_id: row for row in db.session.execute(live_movements())}
+    stored = {row.product_id: row for row in db.session.execute(select(
+        ProductStockMovement.product_id, *[getattr(ProductStockMovement, field) for field in MOVEMENT_FIELDS]
+    ))}
+    drifted = []
+    for product_id in sorted(live.keys() | stored.keys()):
+        expected, actual = live.get(product_id), stored.get(product_id)
+        if expected is None or actual is None or any(
+            (getattr(expected, field) or 0) != getattr(actual, field) for field in MOVEMENT_FIELDS
+        ):
+            drifted.append(product_id)
+    return drifted
+
+def ensure_movements():
+    """Build the movement totals for a database whose ledger predates them"""
+    has_totals = db.session.scalar(select(ProductStockMovement.product_id).limit(1))
+    has_ledger = db.session.scalar(select(InventoryTransaction.transaction_id).limit(1))
+    if has_totals is None and has_ledger is not None:
+        rebuild()
+        db.session.commit()
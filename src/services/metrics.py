@@ -0,0 +1,191 @@
+"""Per-endpoint request and SQL metrics in Prometheus text format.
+
+init_metrics() times every request from before_request to teardown, which
+for streamed responses runs after the last chunk is sent, so latency, the
+bytes written, and the SQL statements a streamed report executes are all
+included. Engine events time each cursor execution and add it to the request
+being served; statements outside a request (startup, CLI commands) only
+count towards the process totals. Recording is a few dict updates under a
+lock per request, and the histograms are rendered by /api/metrics.
+
+With SERVER_TIMING enabled each response also carries a Server-Timing
+header with the time and SQL measured until the response was built.
+"""
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_STARTED = 'metrics_statement_started'
+
+class Histogram:
+    """Cumulative-bucket histogram per label set"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, label_names):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self.series.items()):
+            base = _labels(label_names, labels)
+            total = 0
+            for bound, count in zip(self.buckets, series):
+                total += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {total}')
+            total += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {total}')
+            lines.append(f'{self.name}_sum{{{base}}} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{{{base}}} {total}')
+        return lines
+
+class RequestMetrics:
+    """Request counters and histograms keyed by endpoint and method"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.requests = {}  # (endpoint, method, status) -> count
+        self.duration = Histogram('http_request_duration_seconds', 'Time to serve a request, including streamed bodies.', LATENCY_BUCKETS)
+        self.size = Histogram('http_response_size_bytes', 'Response body size.', SIZE_BUCKETS)
+        self.statements = Histogram('http_request_db_statements', 'SQL statements executed per request.', STATEMENT_BUCKETS)
+        self.db_time = Histogram('http_request_db_duration_seconds', 'Time spent executing SQL per request.', DB_TIME_BUCKETS)
+        self.db_statements_total = 0
+        self.db_seconds_total = 0.0
+
+    def record(self, endpoint, method, status, seconds, size, statements, db_seconds):
+        labels = (endpoint, method)
+        with self.lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.duration.observe(labels, seconds)
+            self.size.observe(labels, size)
+            self.statements.observe(labels, statements)
+            self.db_time.observe(labels, db_seconds)
+
+    def record_statement(self, seconds):
+        with self.lock:
+            self.db_statements_total += 1
+            self.db_seconds_total += seconds
+
+    def render(self):
+        with self.lock:
+            lines = ['# HELP http_requests_total Requests served.', '# TYPE http_requests_total counter']
+            lines += [
+                f'http_requests_total{{{_labels(("endpoint", "method", "status"), key)}}} {count}'
+                for key, count in sorted(self.requests.items())
+            ]
+            for histogram in (self.duration, self.size, self.statements, self.db_time):
+                lines += histogram.render(('endpoint', 'method'))
+            lines += [
+                '# HELP db_statements_total SQL statements executed, inside or outside requests.',
+                '# TYPE db_statements_total counter',
+                f'db_statements_total {self.db_statements_total}',
+                '# HELP db_duration_seconds_total Time spent executing SQL, inside or outside requests.',
+                '# TYPE db_duration_seconds_total counter',
+                f'db_duration_seconds_total {_number(self.db_seconds_total)}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+class RequestTiming:
+    """Measurements of the request in flight, kept on flask.g"""
+    __slots__ = ('started', 'statements', 'db_seconds', 'size', 'status')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.size = 0
+        self.status = 500
+
+def _labels(names, values):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    )
+
+def _number(value):
+    return f'{value:.6f}' if isinstance(value, float) else str(value)
+
+def get_metrics():
+    """The application's RequestMetrics, or None when metrics are disabled"""
+    return current_app.extensions.get('metrics')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info[_STARTED] = perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_STARTED, None)
+    if started is None or not has_app_context():
+        return
+    metrics = current_app.extensions.get('metrics')
+    if metrics is None:
+        return
+    seconds = perf_counter() - started
+    metrics.record_statement(seconds)
+    timing = g.get('request_timing')
+    if timing is not None:
+        timing.statements += 1
+        timing.db_seconds += seconds
+
+def _counted(chunks, timing):
+    for chunk in chunks:
+        timing.size += len(chunk)
+        yield chunk
+
+def init_metrics(app):
+    """Install the request hooks unless METRICS_ENABLED is off"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.extensions['metrics'] = RequestMetrics()
+
+    @app.before_request
+    def start_timing():
+        g.request_timing = RequestTiming()
+
+    @app.after_request
+    def measure_response(response):
+        timing = g.get('request_timing')
+        if timing is None:
+            return response
+        timing.status = response.status_code
+        if response.is_streamed:
+            response.response = _counted(response.iter_encoded(), timing)
+        else:
+            timing.size = response.content_length or 0
+        if app.config.get('SERVER_TIMING'):
+            elapsed = (perf_counter() - timing.started) * 1000
+            response.headers['Server-Timing'] = (
+                f'app;dur={elapsed:.2f}, db;dur={timing.db_seconds * 1000:.2f};desc="{timing.statements} statements"'
+            )
+        return response
+
+    @app.teardown_request
+    def record_request(exc):
+        timing = g.pop('request_timing', None)
+        if timing is None:
+            return
+        method = request.method if request.method in METHODS else 'OTHER'
+        app.extensions['metrics'].record(
+            request.endpoint or 'unmatched', method, timing.status,
+            perf_counter() - timing.started, timing.size, timing.statements, timing.db_seconds
+        )
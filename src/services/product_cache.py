@@ -0,0 +1,121 @@
+"""Read-through cache of the product attributes that only product edits change.
+
+Orders, purchase orders and their responses need a product's name, SKU,
+price and category/supplier names far more often than those change. lookup()
+serves them from an LRU of PRODUCT_CACHE_SIZE entries, each kept at most
+PRODUCT_CACHE_TTL seconds, and reads the misses with one IN query.
+Stock and reorder levels are never cached; they stay authoritative in the
+database (order placement relies on the guarded UPDATE in stock.apply()).
+
+Product edits, deletions and imports invalidate their entries after they
+commit, and supplier edits clear the cache. A lookup that read the database
+while an invalidation happened does not store what it read, so a commit
+cannot be undone by a slower concurrent read. Other processes (or direct
+SQL writes) are only picked up when the entry expires.
+"""
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import select
+from src.models.inventory import db, Category, Product, Supplier
+from src.utils.cache import LRUCache
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_TTL = 300
+
+@dataclass(frozen=True)
+class ProductInfo:
+    """Cached attributes of one product"""
+    product_id: int
+    product_name: str
+    sku: str
+    description: str
+    unit_price: Decimal
+    category_id: int
+    category_name: str
+    supplier_id: int
+    supplier_name: str
+    created_at: datetime
+
+class ProductCache:
+    """LRU + TTL cache of ProductInfo by product_id"""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL):
+        self.entries = LRUCache(max_size=max_size, ttl=ttl)
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by every invalidation
+
+    def lookup(self, product_ids):
+        """{product_id: ProductInfo} for the ids that exist, reading misses with one query"""
+        found = {}
+        missing = []
+        for product_id in {int(product_id) for product_id in product_ids}:
+            info = self.entries.get(product_id)
+            if info is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = info
+        if not missing:
+            return found
+
+        generation = self.generation
+        rows = db.session.execute(
+            select(
+                Product.product_id, Product.product_name, Product.sku, Product.description, Product.unit_price,
+                Product.category_id, Category.category_name, Product.supplier_id, Supplier.supplier_name,
+                Product.created_at
+            ).outerjoin(Category, Product.category_id == Category.category_id)
+            .outerjoin(Supplier, Product.supplier_id == Supplier.supplier_id)
+            .where(Product.product_id.in_(missing))
+        )
+        fetched = {row.product_id: ProductInfo(**row._asdict()) for row in rows}
+        with self.lock:
+            if generation == self.generation:
+                for product_id, info in fetched.items():
+                    self.entries.set(product_id, info)
+        found.update(fetched)
+        return found
+
+    def names(self, product_ids):
+        """{product_id: product_name}, for serializing order and purchase order lines"""
+        return {product_id: info.product_name for product_id, info in self.lookup(product_ids).items()}
+
+    def invalidate(self, *product_ids):
+        with self.lock:
+            self.generation += 1
+            for product_id in product_ids:
+                self.entries.pop(int(product_id))
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self):
+        return self.entries.stats()
+
+def product_dict(info, stock_level, reorder_level, updated_at):
+    """Product.to_dict() built from cached attributes and the live stock columns"""
+    data = asdict(info)
+    data.update({
+        'unit_price': float(info.unit_price) if info.unit_price else 0,
+        'created_at': info.created_at.isoformat() if info.created_at else None,
+        'stock_level': stock_level,
+        'reorder_level': reorder_level,
+        'updated_at': updated_at.isoformat() if updated_at else None,
+        'is_low_stock': stock_level <= reorder_level
+    })
+    return data
+
+def get_product_cache():
+    """The application's product cache, sized by PRODUCT_CACHE_SIZE and PRODUCT_CACHE_TTL"""
+    cache = current_app.extensions.get('product_cache')
+    if cache is None:
+        cache = ProductCache(
+            max_size=current_app.config.get('PRODUCT_CACHE_SIZE', DEFAULT_CACHE_SIZE),
+            ttl=current_app.config.get('PRODUCT_CACHE_TTL', DEFAULT_TTL)
+        )
+        current_app.extensions['product_cache'] = cache
+    return cache
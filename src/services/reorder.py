@@ -0,0 +1,230 @@
+"""Reorder points and safety stock for the whole catalog, computed with NumPy.
+
+load_inputs() reads three flat arrays sets from the database: every
+product, the net units sold per product and day over the window_days
+whole days before today (ORDER OUT rows less ORDER_CANCELLATION IN rows;
+the day in progress is left out) and one lead time per
+purchase order receipt (ledger receipt date minus purchase order date).
+The queries are plain SQLAlchemy statements, so they run on any configured
+database and pass through the engine events (metrics, slow-query log);
+date differences are taken in Python.
+compute() then works on whole arrays, never a loop per product:
+
+- daily demand mean and sample variance per SKU from bincount sums of x
+  and x^2 (days without sales count as zero)
+- lead time mean and variance per SKU, falling back to the supplier's
+  receipts and then to a default lead time
+- safety stock = z * sqrt(L * var_d + d^2 * var_L) and
+  reorder point = ceil(d * L + safety stock), z from the service level
+
+apply() writes the recommended points back to products.reorder_level.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from statistics import NormalDist
+import numpy as np
+from sqlalchemy import bindparam, case, func, select, update
+from src.models.inventory import db, InventoryTransaction, Product, PurchaseOrder
+from src.services import counters
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_LEAD_TIME_DAYS = 7.0
+
+LEAD_SOURCES = ('product', 'supplier', 'default')
+
+@dataclass
+class ReorderInputs:
+    """Arrays read from the database for one computation"""
+    product_ids: np.ndarray      # sorted
+    supplier_ids: np.ndarray     # 0 where a product has no supplier
+    stock_levels: np.ndarray
+    reorder_levels: np.ndarray
+    demand_products: np.ndarray  # one entry per (product, day) with sales
+    demand_days: np.ndarray
+    demand_units: np.ndarray
+    lead_products: np.ndarray    # one entry per received purchase order line
+    lead_days: np.ndarray
+    window_days: int
+
+def _columns(rows, count, dtype=np.float64):
+    if not rows:
+        return [np.empty(0, dtype=dtype) for _ in range(count)]
+    # Transposed in Python first: NumPy converts result Rows one sequence probe at a time
+    return [np.array(column, dtype=dtype) for column in zip(*rows)]
+
+def load_inputs(window_days=DEFAULT_WINDOW_DAYS, now=None):
+    """Read products, daily demand and receipt lead times into arrays"""
+    today = (now or datetime.utcnow()).date()
+    first_day = today - timedelta(days=window_days)
+    start, end = datetime.combine(first_day, time()), datetime.combine(today, time())
+
+    # Core execution on the session's connection: engine events still fire, ORM row handling is skipped
+    connection = db.session.connection()
+    products = connection.execute(
+        select(
+            Product.product_id,
+            func.coalesce(Product.supplier_id, 0),
+            func.coalesce(Product.stock_level, 0),
+            func.coalesce(Product.reorder_level, 0)
+        ).order_by(Product.product_id)
+    ).all()
+    # Summed per product and day by the database over the date index; cancellations net out their order
+    day = func.date(InventoryTransaction.transaction_date)
+    demand = connection.execute(
+        select(
+            InventoryTransaction.product_id,
+            day,
+            func.sum(case(
+                (InventoryTransaction.transaction_type == 'OUT', InventoryTransaction.quantity),
+                else_=-InventoryTransaction.quantity
+            ))
+        ).where(
+            InventoryTransaction.transaction_date >= start,
+            InventoryTransaction.transaction_date < end,
+            InventoryTransaction.reference_type.in_(('ORDER', 'ORDER_CANCELLATION'))
+        ).group_by(InventoryTransaction.product_id, day)
+    ).all()
+    leads = connection.execute(
+        select(InventoryTransaction.product_id, InventoryTransaction.transaction_date, PurchaseOrder.order_date)
+        .join(PurchaseOrder, PurchaseOrder.purchase_order_id == InventoryTransaction.reference_id)
+        .where(
+            InventoryTransaction.reference_type == 'PURCHASE_ORDER',
+            InventoryTransaction.transaction_type == 'IN',
+            PurchaseOrder.order_date.is_not(None)
+        )
+    ).all()
+
+    product_ids, supplier_ids, stock_levels, reorder_levels = _columns(products, 4, np.int64)
+    demand_products, demand_days, demand_units = _columns(
+        [(product_id, _day_number(value), units) for product_id, value, units in demand], 3
+    )
+    lead_products, lead_days = _columns(
+        [(product_id, (received - ordered).total_seconds() / 86400) for product_id, received, ordered in leads], 2
+    )
+    return ReorderInputs(
+        product_ids, supplier_ids, stock_levels, reorder_levels,
+        demand_products.astype(np.int64), demand_days.astype(np.int64) - first_day.toordinal(), demand_units,
+        lead_products.astype(np.int64), lead_days, window_days
+    )
+
+def _day_number(value):
+    """Ordinal of a date() result: text on SQLite, a date elsewhere"""
+    return (value if isinstance(value, date) else date.fromisoformat(value)).toordinal()
+
+def _positions(product_ids, ids):
+    """Index of each id in the sorted product_ids, and a mask of ids that exist"""
+    positions = np.searchsorted(product_ids, ids)
+    positions = np.minimum(positions, max(len(product_ids) - 1, 0))
+    found = product_ids[positions] == ids if len(product_ids) else np.zeros(len(ids), dtype=bool)
+    return positions[found], found
+
+def _mean_variance(groups, values, size):
+    """Per-group count, mean and sample variance of values, for groups in range(size)"""
+    count = np.bincount(groups, minlength=size).astype(np.float64)
+    total = np.bincount(groups, weights=values, minlength=size)
+    squares = np.bincount(groups, weights=values * values, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, 0.0)
+        variance = np.where(count > 1, (squares - count * mean * mean) / (count - 1), 0.0)
+    return count, mean, np.maximum(variance, 0.0)
+
+def compute(inputs, service_level=DEFAULT_SERVICE_LEVEL, default_lead_time=DEFAULT_LEAD_TIME_DAYS):
+    """Demand, lead time, safety stock and reorder point arrays for every product"""
+    size = len(inputs.product_ids)
+    window = inputs.window_days
+
+    # Daily demand: one sum per (product, day) from SQLite, zero-filled days are implicit
+    positions, found = _positions(inputs.product_ids, inputs.demand_products)
+    units = np.maximum(inputs.demand_units[found], 0.0)  # a cancelled older order can net a day below zero
+    total = np.bincount(positions, weights=units, minlength=size)
+    squares = np.bincount(positions, weights=units * units, minlength=size)
+    demand_rate = total / window
+    demand_variance = np.maximum((squares - window * demand_rate * demand_rate) / max(window - 1, 1), 0.0)
+
+    # Lead times per product, then per supplier for products never received
+    positions, found = _positions(inputs.product_ids, inputs.lead_products)
+    days = np.maximum(inputs.lead_days[found], 0.0)
+    lead_count, lead_mean, lead_variance = _mean_variance(positions, days, size)
+    lead_source = np.where(lead_count > 0, 0, 2)
+
+    suppliers, supplier_index = np.unique(inputs.supplier_ids, return_inverse=True)
+    supplier_count, supplier_mean, supplier_variance = _mean_variance(
+        supplier_index[positions], days, len(suppliers)
+    )
+    use_supplier = (lead_count == 0) & (supplier_count[supplier_index] > 0) & (inputs.supplier_ids > 0)
+    lead_mean = np.where(use_supplier, supplier_mean[supplier_index], lead_mean)
+    lead_variance = np.where(use_supplier, supplier_variance[supplier_index], lead_variance)
+    lead_source = np.where(use_supplier, 1, lead_source)
+    lead_mean = np.where(lead_source == 2, default_lead_time, lead_mean)
+
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * np.sqrt(lead_mean * demand_variance + demand_rate * demand_rate * lead_variance)
+    reorder_point = np.ceil(demand_rate * lead_mean + safety_stock - 1e-9).astype(np.int64)
+    return {
+        'demand_rate': demand_rate,
+        'demand_std': np.sqrt(demand_variance),
+        'lead_time': lead_mean,
+        'lead_time_std': np.sqrt(lead_variance),
+        'lead_source': lead_source,
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'has_demand': total > 0
+    }
+
+def recommendations(inputs, result, limit):
+    """Products with the largest shortfall against their recommended reorder point first"""
+    shortfall = result['reorder_point'] - inputs.stock_levels
+    order = np.lexsort((inputs.product_ids, -shortfall))[:limit]
+    return [
+        {
+            'product_id': int(inputs.product_ids[i]),
+            'stock_level': int(inputs.stock_levels[i]),
+            'reorder_level': int(inputs.reorder_levels[i]),
+            'recommended_reorder_level': int(result['reorder_point'][i]),
+            'safety_stock': round(float(result['safety_stock'][i]), 2),
+            'daily_demand': round(float(result['demand_rate'][i]), 4),
+            'daily_demand_std': round(float(result['demand_std'][i]), 4),
+            'lead_time_days': round(float(result['lead_time'][i]), 2),
+            'lead_time_std_days': round(float(result['lead_time_std'][i]), 2),
+            'lead_time_source': LEAD_SOURCES[result['lead_source'][i]],
+            'shortfall': int(shortfall[i])
+        }
+        for i in order
+    ]
+
+def summary(inputs, result):
+    """Catalog-wide totals of a computation"""
+    return {
+        'products': len(inputs.product_ids),
+        'products_with_demand': int(result['has_demand'].sum()),
+        'below_recommended': int((inputs.stock_levels <= result['reorder_point'])[result['has_demand']].sum()),
+        'changed': int((result['reorder_point'] != inputs.reorder_levels)[result['has_demand']].sum()),
+        'lead_time_sources': {
+            source: int((result['lead_source'] == index).sum()) for index, source in enumerate(LEAD_SOURCES)
+        }
+    }
+
+def apply(inputs, result):
+    """Write recommended reorder points for products with demand in the window.
+
+    Products without sales keep their manual level. The dashboard's low
+    stock count is corrected from counts taken inside the same transaction.
+    Returns the number of products updated. The caller commits.
+    """
+    changed = result['has_demand'] & (result['reorder_point'] != inputs.reorder_levels)
+    if not changed.any():
+        return 0
+    low_stock = select(func.count()).select_from(Product).where(Product.stock_level <= Product.reorder_level)
+    before = db.session.scalar(low_stock)
+    db.session.execute(
+        update(Product.__table__)
+        .where(Product.product_id == bindparam('pid'))
+        .values(reorder_level=bindparam('level'), updated_at=datetime.utcnow()),
+        [
+            {'pid': product_id, 'level': level}
+            for product_id, level in zip(inputs.product_ids[changed].tolist(), result['reorder_point'][changed].tolist())
+        ]
+    )
+    counters.record({'low_stock_count': db.session.scalar(low_stock) - before})
+    return int(changed.sum())
@@ -0,0 +1,63 @@
+"""In-memory cache of report responses, invalidated by table write versions.
+
+A cached report is keyed by its endpoint, query arguments, Accept header and the
+current write versions of the tables it reads (src/services/versions.py).
+Any committed write to one of those tables changes the key, so the next
+request recomputes the report; superseded entries simply age out of the
+LRU. The versions are read before the report runs, so a write committed
+meanwhile can only make the cached copy newer than its key, never staler.
+The same versions answer conditional GETs (src/services/conditional.py),
+so a client holding the current report gets a 304 without a cache lookup.
+"""
+from functools import wraps
+from flask import current_app, request
+from src.services.conditional import conditional_response
+from src.services.versions import current_versions
+from src.utils.cache import LRUCache
+
+DEFAULT_CACHE_SIZE = 256
+
+def get_cache():
+    """The application's report cache, sized by REPORT_CACHE_SIZE"""
+    cache = current_app.extensions.get('report_cache')
+    if cache is None:
+        cache = LRUCache(max_size=current_app.config.get('REPORT_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+        current_app.extensions['report_cache'] = cache
+    return cache
+
+def cached_report(*tables, ttl=None):
+    """Serve a report view from the cache until one of tables is written.
+
+    ttl bounds the age of an entry for reports that also depend on the
+    clock (e.g. "last 7 days"). Only 200 responses are cached. Setting
+    REPORT_CACHE_SIZE to 0 disables caching, but not conditional GETs.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = current_versions(tables)
+            if not current_app.config.get('REPORT_CACHE_SIZE', DEFAULT_CACHE_SIZE):
+                return conditional_response(versions, lambda: view(*args, **kwargs), ttl)
+            return conditional_response(versions, lambda: _cached(view, args, kwargs, tables, versions, ttl), ttl)
+
+        return wrapper
+    return decorator
+
+def _cached(view, args, kwargs, tables, versions, ttl):
+    """The view's response from the cache, or computed and stored"""
+    cache = get_cache()
+    key = (
+        request.endpoint,
+        tuple(sorted(request.args.items(multi=True))),
+        request.headers.get('Accept'),
+        tuple(versions[table][0] for table in tables)
+    )
+    entry = cache.get(key)
+    if entry is not None:
+        body, mimetype = entry
+        return current_app.response_class(body, mimetype=mimetype)
+
+    response = current_app.make_response(view(*args, **kwargs))
+    if response.status_code == 200 and not response.is_streamed:
+        cache.set(key, (response.get_data(), response.mimetype), ttl=ttl)
+    return response
@@ -0,0 +1,160 @@
+"""Sales fact table maintained alongside order writes.
+
+Order write paths describe the orders they add or remove with
+order_fact() and call record(); each fact is added to the day, week and
+month rows for its order date and status in the caller's transaction.
+Changing an order's status removes the old fact and adds the new one.
+live_facts() recomputes every row from orders and order_items, for the
+backfill command and its --verify check.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from src.models.inventory import db, Order, OrderItem
+from src.models.aggregates import SalesFact
+
+GRAINS = ('day', 'week', 'month')
+FACT_FIELDS = ('order_count', 'revenue', 'items_sold')
+
+def period_start(grain, day):
+    """First day of the grain's period containing day (weeks start on Monday)"""
+    if grain == 'day':
+        return day
+    if grain == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+def shift_periods(grain, start, periods):
+    """start moved back by periods whole periods"""
+    if grain == 'day':
+        return start - timedelta(days=periods)
+    if grain == 'week':
+        return start - timedelta(weeks=periods)
+    months = start.year * 12 + start.month - 1 - periods
+    return date(months // 12, months % 12 + 1, 1)
+
+def order_fact(order_date, status, total_amount, items_sold):
+    """Contribution of one order: (day, status, revenue, units), None for an undated order"""
+    if order_date is None:
+        return None
+    return (order_date.date(), status or 'Unknown', Decimal(str(total_amount or 0)), int(items_sold or 0))
+
+def _rollup(facts):
+    """{(grain, period_start, status): totals} for (day, status, revenue, units, orders) tuples"""
+    totals = defaultdict(lambda: {'order_count': 0, 'revenue': Decimal('0'), 'items_sold': 0})
+    for day, status, revenue, items_sold, orders in facts:
+        for grain in GRAINS:
+            entry = totals[(grain, period_start(grain, day), status)]
+            entry['order_count'] += orders
+            entry['revenue'] += revenue
+            entry['items_sold'] += items_sold
+    return totals
+
+def record(added=(), removed=()):
+    """Apply order facts added and removed by a write, in the current transaction"""
+    changes = [(*fact, 1) for fact in added if fact]
+    changes += [(day, status, -revenue, -items, -1) for day, status, revenue, items in filter(None, removed)]
+    totals = {key: entry for key, entry in _rollup(changes).items() if any(entry.values())}
+    if not totals:
+        return
+
+    params = [
+        {'g': grain, 'p': start, 's': status, **{f'd_{field}': entry[field] for field in FACT_FIELDS}}
+        for (grain, start, status), entry in totals.items()
+    ]
+    result = db.session.execute(
+        update(SalesFact.__table__)
+        .where(
+            SalesFact.grain == bindparam('g'),
+            SalesFact.period_start == bindparam('p'),
+            SalesFact.status == bindparam('s')
+        )
+        .values(**{field: getattr(SalesFact, field) + bindparam(f'd_{field}') for field in FACT_FIELDS}),
+        params
+    )
+    if result.rowcount < len(params):
+        keys = {(grain, start) for grain, start, _ in totals}
+        existing = set(db.session.execute(
+            select(SalesFact.grain, SalesFact.period_start, SalesFact.status).where(
+                SalesFact.grain.in_({grain for grain, _ in keys}),
+                SalesFact.period_start.in_({start for _, start in keys})
+            )
+        ).tuples())
+        db.session.execute(insert(SalesFact), [
+            {'grain': grain, 'period_start': start, 'status': status, **entry}
+            for (grain, start, status), entry in totals.items() if (grain, start, status) not in existing
+        ])
+
+def live_facts():
+    """{(grain, period_start, status): totals} computed from orders and order_items"""
+    items = select(
+        OrderItem.order_id, func.sum(OrderItem.quantity).label('items_sold')
+    ).group_by(OrderItem.order_id).subquery()
+    day = func.date(Order.order_date)
+    rows = db.session.execute(
+        select(
+            day, Order.status,
+            func.coalesce(func.sum(Order.total_amount), 0),
+            func.coalesce(func.sum(items.c.items_sold), 0),
+            func.count()
+        ).outerjoin(items, items.c.order_id == Order.order_id)
+        .where(Order.order_date.is_not(None))
+        .group_by(day, Order.status)
+    )
+    return _rollup(
+        (value if isinstance(value, date) else date.fromisoformat(value),
+         status or 'Unknown', Decimal(str(revenue)), int(items_sold), orders)
+        for value, status, revenue, items_sold, orders in rows
+    )
+
+def stored_facts():
+    """{(grain, period_start, status): totals} as stored, skipping rows that net to zero"""
+    return {
+        (row.grain, row.period_start, row.status): {
+            'order_count': row.order_count, 'revenue': Decimal(str(row.revenue)), 'items_sold': row.items_sold
+        }
+        for row in db.session.execute(select(SalesFact.__table__))
+        if row.order_count or row.revenue or row.items_sold
+    }
+
+def rebuild():
+    """Replace every fact row with live_facts(). Returns the row count. The caller commits."""
+    facts = live_facts()
+    db.session.execute(delete(SalesFact))
+    if facts:
+        db.session.execute(insert(SalesFact), [
+            {'grain': grain, 'period_start': start, 'status': status, **entry}
+            for (grain, start, status), entry in facts.items()
+        ])
+    return len(facts)
+
+def mismatches():
+    """Keys whose stored totals differ from live_facts()"""
+    live, stored = live_facts(), stored_facts()
+    return sorted(key for key in live.keys() | stored.keys() if live.get(key) != stored.get(key))
+
+def sales_series(grain, since, statuses):
+    """Rows of (period_start, order_count, revenue, items_sold) from since on, newest first"""
+    return db.session.execute(
+        select(
+            SalesFact.period_start,
+            func.sum(SalesFact.order_count).label('order_count'),
+            func.sum(SalesFact.revenue).label('revenue'),
+            func.sum(SalesFact.items_sold).label('items_sold')
+        ).where(
+            SalesFact.grain == grain,
+            SalesFact.period_start >= since,
+            SalesFact.status.in_(statuses)
+        ).group_by(SalesFact.period_start)
+        .having(func.sum(SalesFact.order_count) > 0)
+        .order_by(SalesFact.period_start.desc())
+    ).all()
+
+def ensure_facts():
+    """Backfill the fact table for a database whose orders predate it"""
+    has_facts = db.session.scalar(select(SalesFact.grain).limit(1))
+    has_orders = db.session.scalar(select(Order.order_id).limit(1))
+    if has_facts is None and has_orders is not None:
+        rebuild()
+        db.session.commit()
@@ -0,0 +1,170 @@
+"""Slow-query recorder with EXPLAIN QUERY PLAN capture.
+
+Engine events time every cursor execution. A statement slower than
+SLOW_QUERY_MS is recorded with its parameters, the endpoint that ran it
+and, on SQLite, its EXPLAIN QUERY PLAN. The plan is read on the same
+connection through a raw DBAPI cursor (it only plans, never executes) and
+kept per statement text, so a statement that is slow on every request is
+explained once. Plans are checked for full table scans and temporary
+B-trees. Records go to a bounded ring buffer read by
+/api/admin/slow-queries and, when SLOW_QUERY_LOG names a file, are
+appended to it as JSON lines.
+"""
+import json
+import re
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from threading import Lock
+from time import perf_counter
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.utils.cache import LRUCache
+
+DEFAULT_THRESHOLD_MS = 250
+DEFAULT_BUFFER_SIZE = 200
+MAX_STATEMENT_LENGTH = 4000
+MAX_PARAMETER_LENGTH = 200
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_STARTED = 'slow_query_started'
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (.+)$')
+_SCAN = re.compile(r'^SCAN (\S+)$')
+_TEMP_BTREE = re.compile(r'USE TEMP B-TREE FOR (.+)$')
+
+class SlowQueryLog:
+    """Ring buffer of slow statements, optionally mirrored to a JSONL file"""
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, max_size=DEFAULT_BUFFER_SIZE, path=None):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.lock = Lock()
+        self.entries = deque(maxlen=max_size)
+        self.plans = LRUCache(max_size=256)
+        self.recorded = 0
+
+    def add(self, entry):
+        with self.lock:
+            self.entries.append(entry)
+            self.recorded += 1
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.plans.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'threshold_ms': round(self.threshold * 1000, 3),
+                'buffered': len(self.entries),
+                'max_size': self.entries.maxlen,
+                'recorded': self.recorded,
+                'log_file': self.path
+            }
+
+def analyze_plan(rows):
+    """Plan lines plus the full table scans and temp B-trees they contain.
+
+    rows are EXPLAIN QUERY PLAN rows (id, parent, notused, detail). Scans of
+    subqueries and CTEs the plan itself builds are not table scans.
+    """
+    details = [row[3] for row in rows]
+    subqueries = {match.group(1) for match in map(_SUBQUERY.match, details) if match}
+    full_scans = [
+        match.group(1) for match in map(_SCAN.match, details)
+        if match and match.group(1) not in subqueries and match.group(1) != 'CONSTANT'
+    ]
+    temp_btrees = [match.group(1) for match in map(_TEMP_BTREE.search, details) if match]
+    return {'plan': details, 'full_scans': full_scans, 'temp_btrees': temp_btrees}
+
+def _explain(conn, statement, parameters):
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        return cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    finally:
+        cursor.close()
+
+def _plan(log, conn, statement, parameters):
+    if conn.dialect.name != 'sqlite' or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    plan = log.plans.get(statement)
+    if plan is None:
+        try:
+            plan = analyze_plan(_explain(conn, statement, parameters))
+        except Exception as e:
+            plan = {'error': str(e)}
+        log.plans.set(statement, plan)
+    return plan
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + '...'
+
+def _parameters(parameters, executemany):
+    if executemany:
+        return {'executemany': len(parameters), 'first': _parameters(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: _jsonable(value) for key, value in parameters.items()}
+    return [_jsonable(value) for value in parameters or ()]
+
+def get_slow_query_log():
+    """The application's SlowQueryLog, or None when the recorder is off"""
+    return current_app.extensions.get('slow_queries')
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info[_STARTED] = perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop(_STARTED, None)
+    if started is None or not has_app_context():
+        return
+    log = current_app.extensions.get('slow_queries')
+    if log is None:
+        return
+    seconds = perf_counter() - started
+    if seconds < log.threshold:
+        return
+
+    explain_parameters = parameters[0] if executemany and parameters else parameters
+    plan = _plan(log, conn, statement, explain_parameters) or {}
+    in_request = has_request_context()
+    log.add({
+        'at': datetime.utcnow().isoformat(),
+        'duration_ms': round(seconds * 1000, 3),
+        'endpoint': request.endpoint if in_request else None,
+        'method': request.method if in_request else None,
+        'path': request.full_path.rstrip('?') if in_request else None,
+        'statement': statement if len(statement) <= MAX_STATEMENT_LENGTH else statement[:MAX_STATEMENT_LENGTH] + '...',
+        'parameters': _parameters(parameters, executemany),
+        'plan': plan.get('plan'),
+        'full_scans': plan.get('full_scans', []),
+        'temp_btrees': plan.get('temp_btrees', []),
+        'plan_error': plan.get('error')
+    })
+
+def init_slow_query_log(app):
+    """Start recording statements slower than SLOW_QUERY_MS (0 turns the recorder off)"""
+    threshold = app.config.get('SLOW_QUERY_MS', DEFAULT_THRESHOLD_MS)
+    if threshold and threshold > 0:
+        app.extensions['slow_queries'] = SlowQueryLog(
+            threshold_ms=threshold,
+            max_size=app.config.get('SLOW_QUERY_BUFFER', DEFAULT_BUFFER_SIZE),
+            path=app.config.get('SLOW_QUERY_LOG')
+        )
@@ -0,0 +1,150 @@
+"""Daily per-product stock snapshots and point-in-time stock.
+
+stock_snapshots holds each product's stock at the end of a UTC day (the
+ledger's transaction_date is UTC). compact() fills the days missing since
+the last run by walking backwards from live stock: the newest missing day
+is products.stock_level minus every ledger movement after it, and each
+earlier day is the following day's snapshot minus that day's movements.
+Only ledger rows newer than the days being written are read, so each run
+costs as much as the activity since the previous one, not the history.
+Daily rows older than the retention window are thinned to month ends.
+
+stock_at_query() answers "stock at the end of day D" from the nearest
+snapshot on or before D plus the ledger rows between the two.
+"""
+from datetime import datetime, time, timedelta
+from sqlalchemy import and_, case, delete, exists, func, insert, literal, or_, select
+from src.models.inventory import db, Product, InventoryTransaction
+from src.models.aggregates import StockSnapshot
+
+DEFAULT_RETENTION_DAYS = 90
+
+# Stock effect of one ledger row: OUT rows store the units sold,
+# ADJUSTMENT rows the signed change
+net_quantity = case(
+    (InventoryTransaction.transaction_type == 'OUT', -InventoryTransaction.quantity),
+    else_=InventoryTransaction.quantity
+)
+
+def day_end(day):
+    """Start of the day after day: the exclusive bound of day's ledger rows"""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+def movements(start=None, end=None):
+    """Subquery of the net stock movement per product over ledger rows in [start, end)"""
+    query = select(InventoryTransaction.product_id, func.sum(net_quantity).label('net'))
+    if start is not None:
+        query = query.where(InventoryTransaction.transaction_date >= start)
+    if end is not None:
+        query = query.where(InventoryTransaction.transaction_date < end)
+    return query.group_by(InventoryTransaction.product_id).subquery()
+
+def _existed_before(instant):
+    return or_(Product.created_at.is_(None), Product.created_at < instant)
+
+def _day_rows(day, following):
+    """SELECT of (day, product_id, stock_level) derived from the snapshot of following, or live stock"""
+    if following is None:
+        tail = movements(start=day_end(day))
+        return select(
+            literal(day, db.Date), Product.product_id,
+            Product.stock_level - func.coalesce(tail.c.net, 0)
+        ).outerjoin(tail, tail.c.product_id == Product.product_id).where(_existed_before(day_end(day)))
+
+    tail = movements(start=day_end(day), end=day_end(following))
+    return select(
+        literal(day, db.Date), StockSnapshot.product_id,
+        StockSnapshot.stock_level - func.coalesce(tail.c.net, 0)
+    ).outerjoin(tail, tail.c.product_id == StockSnapshot.product_id) \
+     .outerjoin(Product, Product.product_id == StockSnapshot.product_id) \
+     .where(
+        StockSnapshot.snapshot_date == following,
+        or_(Product.product_id.is_(None), _existed_before(day_end(day)))
+    )
+
+def compact(through=None, since=None, retention_days=DEFAULT_RETENTION_DAYS):
+    """Write the snapshots missing up to through (default: yesterday) and thin old ones.
+
+    since rebuilds every day from that date instead of continuing after the
+    last snapshot. Returns a summary dict. The caller commits.
+    """
+    today = datetime.utcnow().date()
+    through = through or today - timedelta(days=1)
+    if since is None:
+        last = db.session.scalar(select(func.max(StockSnapshot.snapshot_date)))
+        since = last + timedelta(days=1) if last else through
+
+    days_written = rows_written = 0
+    if since <= through:
+        db.session.execute(delete(StockSnapshot).where(StockSnapshot.snapshot_date.between(since, through)))
+        next_day = through + timedelta(days=1)
+        following = next_day if db.session.scalar(
+            select(exists().where(StockSnapshot.snapshot_date == next_day))
+        ) else None
+
+        day = through
+        while day >= since:
+            result = db.session.execute(
+                insert(StockSnapshot).from_select(
+                    ['snapshot_date', 'product_id', 'stock_level'], _day_rows(day, following)
+                )
+            )
+            days_written += 1
+            rows_written += result.rowcount
+            following = day
+            day -= timedelta(days=1)
+
+    days_pruned = prune(today - timedelta(days=retention_days))
+    return {
+        'through': through.isoformat(),
+        'days_written': days_written,
+        'rows_written': rows_written,
+        'days_pruned': days_pruned
+    }
+
+def prune(cutoff):
+    """Delete daily snapshots before cutoff, keeping month ends. Returns the number of days removed."""
+    days = db.session.scalars(
+        select(StockSnapshot.snapshot_date.distinct()).where(StockSnapshot.snapshot_date < cutoff)
+    ).all()
+    doomed = [day for day in days if (day + timedelta(days=1)).day != 1]
+    if doomed:
+        db.session.execute(delete(StockSnapshot).where(StockSnapshot.snapshot_date.in_(doomed)))
+    return len(doomed)
+
+def stock_at_query(day):
+    """Query of every product's stock at the end of day, and the snapshot date it starts from.
+
+    Products with a snapshot on the base date add the ledger rows after it;
+    products created since (or every product when there is no snapshot
+    yet) are computed backwards from live stock instead.
+    """
+    end = day_end(day)
+    base = db.session.scalar(
+        select(func.max(StockSnapshot.snapshot_date)).where(StockSnapshot.snapshot_date <= day)
+    )
+    columns = [Product.product_id, Product.sku, Product.product_name, Product.category_id]
+
+    if base is None:
+        after = movements(start=end)
+        return select(
+            *columns, (Product.stock_level - func.coalesce(after.c.net, 0)).label('stock_level')
+        ).outerjoin(after, after.c.product_id == Product.product_id) \
+         .where(_existed_before(end)).order_by(Product.product_id), None
+
+    tail = movements(start=day_end(base), end=end)
+    later = select(func.sum(net_quantity)).where(
+        InventoryTransaction.product_id == Product.product_id,
+        InventoryTransaction.transaction_date >= end
+    ).scalar_subquery()
+    stock = case(
+        (StockSnapshot.product_id.is_not(None), StockSnapshot.stock_level + func.coalesce(tail.c.net, 0)),
+        else_=Product.stock_level - func.coalesce(later, 0)
+    )
+    return select(*columns, stock.label('stock_level')) \
+        .outerjoin(StockSnapshot, and_(
+            StockSnapshot.snapshot_date == base,
+            StockSnapshot.product_id == Product.product_id
+        )) \
+        .outerjoin(tail, tail.c.product_id == Product.product_id) \
+        .where(_existed_before(end)).order_by(Product.product_id), base
@@ -0,0 +1,114 @@
+"""Stock mutations shared by every write path.
+
+apply() takes the inventory_transactions rows a write produces, nets them
+per product and changes stock_level with a single guarded UPDATE
+(stock_level + delta >= 0, checked by the database), then writes the ledger
+rows, movement totals and dashboard counters in the same transaction. Two
+writers can therefore never both take the last units, and the ledger always
+explains the stock level exactly. Nothing else updates stock_level.
+
+run_with_retry() runs a whole write transaction and commits it, starting
+over with exponential backoff when SQLite reports the database busy after
+its busy timeout.
+"""
+import random
+import time
+from datetime import datetime
+from sqlalchemy import case, select, update
+from sqlalchemy.exc import OperationalError
+from src.models.inventory import db, Product
+from src.services import counters, ledger
+
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05  # seconds before the first retry, doubled on each attempt
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+class StockError(Exception):
+    """Stock change that cannot be applied, reported to the client"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def net_change(transaction):
+    """Signed stock change of one ledger row (OUT quantities are stored positive)"""
+    quantity = transaction['quantity']
+    return -quantity if transaction['transaction_type'] == 'OUT' else quantity
+
+def apply(transactions):
+    """Apply ledger rows (dicts of InventoryTransaction columns) to stock and record them.
+
+    Raises StockError unless every product exists and stays at or above
+    zero; the caller then rolls back. Returns {product_id: new stock_level}.
+    The caller commits.
+    """
+    deltas = {}
+    for transaction in transactions:
+        product_id = transaction['product_id']
+        deltas[product_id] = deltas.get(product_id, 0) + net_change(transaction)
+    if not deltas:
+        return {}
+
+    delta = case(deltas, value=Product.product_id)
+    updated = db.session.execute(
+        update(Product)
+        .where(Product.product_id.in_(deltas), Product.stock_level + delta >= 0)
+        .values(stock_level=Product.stock_level + delta, updated_at=datetime.utcnow())
+        .returning(Product.product_id, Product.stock_level, Product.reorder_level, Product.unit_price)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if len(updated) < len(deltas):
+        _raise_shortfall(deltas)
+
+    ledger.record_transactions(transactions)
+    counters.record(*[
+        counters.stock_change(row, row.stock_level - deltas[row.product_id], row.stock_level)
+        for row in updated
+    ])
+    return {row.product_id: row.stock_level for row in updated}
+
+def _raise_shortfall(deltas):
+    """Report why the guarded UPDATE skipped a product, reading current levels"""
+    rows = {
+        row.product_id: row for row in db.session.execute(
+            select(Product.product_id, Product.product_name, Product.stock_level)
+            .where(Product.product_id.in_(deltas))
+        )
+    }
+    for product_id, delta in deltas.items():
+        row = rows.get(product_id)
+        if row is None:
+            raise StockError(f'Product {product_id} not found', 404)
+        if (row.stock_level or 0) + delta < 0:
+            raise StockError(
+                f'Insufficient stock for {row.product_name}. Available: {row.stock_level}, Requested: {-delta}'
+            )
+    raise StockError('Stock changed while the change was being applied, please retry', 409)
+
+def is_busy(error):
+    """Whether an OperationalError is SQLite's database-busy or table-locked error"""
+    orig = getattr(error, 'orig', None)
+    code = getattr(orig, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    return 'locked' in str(orig or error)
+
+def run_with_retry(work, retries=BUSY_RETRIES, backoff=BUSY_BACKOFF):
+    """Call work() and commit, retrying the transaction while the database is busy.
+
+    work must do the whole transaction from its first read, since a retry
+    rolls back and calls it again. Other errors propagate without a rollback.
+    Returns what work() returned.
+    """
+    for attempt in range(retries + 1):
+        try:
+            result = work()
+            db.session.commit()
+            return result
+        except OperationalError as e:
+            if not is_busy(e) or attempt == retries:
+                raise
+            db.session.rollback()
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
@@ -0,0 +1,86 @@
+"""Per-table write versions used to invalidate cached reads.
+
+Each session transaction remembers which tables it wrote: ORM flushes are
+seen through after_flush, and INSERT/UPDATE/DELETE statements passed to
+session.execute() (bulk inserts, guarded stock updates, upserts) through
+do_orm_execute. Right before commit the versions of those tables are
+bumped in table_versions inside the same transaction, so a new version
+becomes visible together with the data, to every process using the
+database. Writes made outside the application session (sqlite3 scripts)
+must call bump_all() afterwards.
+"""
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from src.models.inventory import db
+from src.models.aggregates import TableVersion
+
+VERSION_TABLE = TableVersion.__tablename__
+_CHANGED = 'changed_tables'
+
+def _mark(session, tables):
+    tables = {name for name in tables if name != VERSION_TABLE}
+    if tables:
+        session.info.setdefault(_CHANGED, set()).update(tables)
+
+def _table_name(instance):
+    return inspect(instance).mapper.local_table.name
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session, flush_context):
+    # session.new/dirty/deleted still describe what this flush wrote
+    changed = [*session.new, *session.deleted]
+    changed.extend(obj for obj in session.dirty if session.is_modified(obj))
+    _mark(session, {_table_name(obj) for obj in changed})
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark(orm_execute_state.session, [orm_execute_state.statement.table.name])
+
+@event.listens_for(Session, 'before_commit')
+def _bump_changed(session):
+    # Flush first so objects still pending are tracked before the bump
+    session.flush()
+    tables = session.info.pop(_CHANGED, None)
+    if tables:
+        _bump(session, tables)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed(session, previous_transaction):
+    # A rolled back savepoint leaves the outer transaction's writes in place
+    if not session.in_transaction():
+        session.info.pop(_CHANGED, None)
+
+def _bump(session, tables):
+    tables = sorted(tables)
+    now = datetime.utcnow()
+    result = session.execute(
+        update(TableVersion)
+        .where(TableVersion.table_name.in_(tables))
+        .values(version=TableVersion.version + 1, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(tables):
+        existing = set(session.scalars(
+            select(TableVersion.table_name).where(TableVersion.table_name.in_(tables))
+        ))
+        session.add_all(
+            TableVersion(table_name=name, version=1, updated_at=now)
+            for name in tables if name not in existing
+        )
+        session.flush()
+
+def bump_all():
+    """Bump every table's version, after writes the session did not see. The caller commits."""
+    _bump(db.session, [table.name for table in db.metadata.sorted_tables if table.name != VERSION_TABLE])
+
+def current_versions(tables):
+    """{table name: (version, updated_at)} for tables, read in one query"""
+    rows = db.session.execute(
+        select(TableVersion.table_name, TableVersion.version, TableVersion.updated_at)
+        .where(TableVersion.table_name.in_(tables))
+    )
+    versions = {name: (0, None) for name in tables}
+    versions.update((name, (version, updated_at)) for name, version, updated_at in rows)
+    return versions
@@ -348,7 +348,7 @@ async function loadOrders(page = 1) {
         showLoading();
         const status = document.getElementById('order-status-filter')?.value || '';
 
-        let url = `/orders?page=${page}&per_page=20`;
+        let url = `/orders?page=${page}&per_page=20&include_items=false`;
         if (status) url += `&status=${status}`;
 
         const data = await apiCall(url);
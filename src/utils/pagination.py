@@ -0,0 +1,149 @@
+"""Offset and keyset (cursor) pagination shared by the list endpoints"""
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import and_, or_, type_coerce, Date, DateTime, String
+
+# Largest page either mode returns; larger per_page values are capped
+MAX_PER_PAGE = 1000
+
+class CursorError(ValueError):
+    """Raised for a cursor token the server did not issue or a page size below 1"""
+
+def encode_cursor(values, direction):
+    """Build an opaque token from the sort key values of a boundary row"""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps({'k': payload, 'd': direction}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token, keys):
+    """Return (values, direction) from a token produced by encode_cursor()"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        values, direction = payload['k'], payload['d']
+    except (ValueError, TypeError, KeyError):
+        raise CursorError('Invalid cursor')
+    if direction not in ('next', 'prev') or not isinstance(values, list) or len(values) != len(keys):
+        raise CursorError('Invalid cursor')
+
+    decoded = []
+    for (column, _), value in zip(keys, values):
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        decoded.append(value)
+    return decoded, direction
+
+def _stored_text_keys(query, keys):
+    """keys with SQLite DATETIME columns compared as the text they are stored as.
+
+    SQLite keeps DATETIME values as text in the format of whoever wrote
+    them: '2024-01-15 10:30:00' from SQL scripts, with microseconds from
+    SQLAlchemy, and sorts them as text. A cursor holding a re-rendered
+    datetime would not compare equal to its own row, so such keys are read
+    and compared as their raw text instead. Returns (keys, positions of the
+    text keys).
+    """
+    if query.session.get_bind().dialect.name != 'sqlite':
+        return keys, []
+    positions = [i for i, (column, _) in enumerate(keys) if isinstance(column.type, DateTime)]
+    return [
+        (type_coerce(column, String) if i in positions else column, descending)
+        for i, (column, descending) in enumerate(keys)
+    ], positions
+
+def _beyond(keys, values, forward):
+    """Row-value comparison (k1, k2, ...) > / < (v1, v2, ...) honouring each key's direction"""
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        after = column < values[position] if descending == forward else column > values[position]
+        clauses.append(and_(*[keys[i][0] == values[i] for i in range(position)], after))
+    return or_(*clauses)
+
+def keyset_page(query, keys, cursor, per_page):
+    """Fetch one page of query ordered by keys, starting after/before cursor.
+
+    keys is a list of (column, descending) pairs that must be unique
+    together, normally ending with the primary key, and should be backed
+    by an index. No OFFSET or COUNT is issued: the page is read by seeking
+    straight to the cursor position and fetching per_page + 1 rows.
+    per_page is capped at MAX_PER_PAGE.
+    Returns (items, next_cursor, prev_cursor).
+    """
+    if per_page < 1:
+        raise CursorError('Page size must be at least 1')
+    per_page = min(per_page, MAX_PER_PAGE)
+    compared, text_positions = _stored_text_keys(query, keys)
+    if cursor:
+        values, direction = decode_cursor(cursor, compared)
+    else:
+        values, direction = None, 'next'
+    forward = direction == 'next'
+
+    query = query.order_by(None)
+    if values is not None:
+        query = query.filter(_beyond(compared, values, forward))
+    if text_positions:
+        query = query.add_columns(*[compared[i][0] for i in text_positions])
+    ordering = [column.desc() if descending == forward else column.asc() for column, descending in keys]
+    rows = query.order_by(*ordering).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+    items = [row[0] for row in rows] if text_positions else rows
+
+    def key_of(position):
+        values = [getattr(items[position], column.key) for column, _ in keys]
+        for i, text in zip(text_positions, rows[position][1:] if text_positions else ()):
+            values[i] = text
+        return values
+
+    next_cursor = prev_cursor = None
+    if items:
+        if has_more or not forward:
+            next_cursor = encode_cursor(key_of(-1), 'next')
+        if (has_more and not forward) or (forward and values is not None):
+            prev_cursor = encode_cursor(key_of(0), 'prev')
+    return items, next_cursor, prev_cursor
+
+def paginate_request(query, keys, serialize, collection, default_per_page=20):
+    """Paginate query according to the request arguments.
+
+    Passing cursor (empty for the first page) selects keyset pagination
+    and returns next_cursor/prev_cursor; otherwise the classic page/per_page
+    OFFSET pagination is used. include_total controls the COUNT(*) query and
+    defaults to true for page mode and false for cursor mode. Both modes
+    cap per_page at MAX_PER_PAGE.
+    """
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    if per_page > MAX_PER_PAGE:
+        per_page = MAX_PER_PAGE
+    cursor = request.args.get('cursor')
+    include_total = request.args.get('include_total', 'false' if cursor is not None else 'true').lower() in ('1', 'true', 'yes')
+
+    if cursor is not None:
+        items, next_cursor, prev_cursor = keyset_page(query, keys, cursor, per_page)
+        response = {
+            collection: [serialize(item) for item in items],
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+            'per_page': per_page
+        }
+        if include_total:
+            response['total'] = query.order_by(None).count()
+        return response
+
+    page = request.args.get('page', 1, type=int)
+    results = query.paginate(page=page, per_page=per_page, error_out=False, count=include_total)
+    return {
+        collection: [serialize(item) for item in results.items],
+        'total': results.total,
+        'pages': results.pages if include_total else None,
+        'current_page': page,
+        'per_page': per_page
+    }
@@ -0,0 +1,96 @@
+"""Database engine configuration driven by environment variables.
+
+DATABASE_URL selects the database (default: the bundled SQLite file), so
+the same models run on a server database such as PostgreSQL. For SQLite
+every new connection gets the pragmas below; each one can be overridden
+with the environment variable of the same name (e.g. SQLITE_SYNCHRONOUS=FULL):
+
+- journal_mode=WAL: readers no longer block the writer and vice versa
+- synchronous=NORMAL: safe with WAL, fsyncs at checkpoints instead of every commit
+- busy_timeout: wait for a lock instead of failing with "database is locked"
+- mmap_size / cache_size: serve hot pages from memory
+- foreign_keys=ON: enforce the schema's REFERENCES clauses
+
+Pool settings come from DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and
+DB_POOL_RECYCLE.
+"""
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'app.db')
+
+# pragma -> default value, applied in this order on every SQLite connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'foreign_keys': 'ON',
+    'temp_store': 'MEMORY',
+}
+
+POOL_SETTINGS = {
+    'pool_size': ('DB_POOL_SIZE', 10),
+    'max_overflow': ('DB_MAX_OVERFLOW', 20),
+    'pool_timeout': ('DB_POOL_TIMEOUT', 30),
+    'pool_recycle': ('DB_POOL_RECYCLE', 1800),
+}
+
+def database_url():
+    """DATABASE_URL, or the default SQLite file"""
+    return os.environ.get('DATABASE_URL') or f'sqlite:///{DEFAULT_SQLITE_PATH}'
+
+def sqlite_pragmas():
+    """SQLITE_PRAGMAS with environment overrides applied"""
+    return {
+        name: os.environ.get(f'SQLITE_{name.upper()}', default)
+        for name, default in SQLITE_PRAGMAS.items()
+    }
+
+def engine_options(url):
+    """create_engine() keyword arguments for url"""
+    url = make_url(url)
+    options = {name: int(os.environ.get(env, default)) for name, (env, default) in POOL_SETTINGS.items()}
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # A memory database lives in a single connection; keep the default pool
+            return {}
+        # Connections are handed between request threads by the pool
+        options['connect_args'] = {'check_same_thread': False}
+    else:
+        options['pool_pre_ping'] = True
+    return options
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run PRAGMA name=value for pragmas on every new connection of engine"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+def init_storage(app, db):
+    """Configure app's database from the environment and initialise db for it.
+
+    Explicit SQLALCHEMY_DATABASE_URI / SQLALCHEMY_ENGINE_OPTIONS /
+    SQLITE_PRAGMAS settings on app.config take precedence.
+    """
+    url = app.config.setdefault('SQLALCHEMY_DATABASE_URI', database_url())
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(url))
+    pragmas = app.config.setdefault('SQLITE_PRAGMAS', sqlite_pragmas())
+
+    backend = make_url(url)
+    if backend.get_backend_name() == 'sqlite' and backend.database not in (None, '', ':memory:'):
+        os.makedirs(os.path.dirname(os.path.abspath(backend.database)), exist_ok=True)
+
+    db.init_app(app)
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, pragmas)
@@ -0,0 +1,62 @@
+"""Chunked JSON/NDJSON encoding of query results, and NDJSON request bodies"""
+import json
+from flask import Response, current_app, request, stream_with_context
+
+STREAM_BATCH_SIZE = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_FORMATS = ('json', 'ndjson')
+
+def stream_format():
+    """Streaming format requested by the client, or None for a buffered response.
+
+    Taken from the stream argument (json or ndjson), or ndjson when the
+    client prefers application/x-ndjson. Raises ValueError for other values.
+    """
+    value = request.args.get('stream')
+    if value is None:
+        return 'ndjson' if request.accept_mimetypes.best == NDJSON_MIMETYPE else None
+    if value not in STREAM_FORMATS:
+        raise ValueError(f"stream must be one of {', '.join(STREAM_FORMATS)}")
+    return value
+
+def stream_rows(result, serialize, collection, stream='json', count_key=None, meta=None):
+    """Response encoding result rows while they are fetched from the cursor.
+
+    result should be executed with yield_per=STREAM_BATCH_SIZE; rows are
+    serialized and written one batch per chunk, so memory stays bounded by
+    the batch size whatever the result size. 'json' produces the same
+    document as the buffered endpoint ({**meta, collection: [...],
+    count_key: n}), 'ndjson' one object per line without meta or count.
+    """
+    def dumps(item):
+        # Same encoder and compact layout as jsonify()
+        return current_app.json.dumps(item, separators=(',', ':'))
+
+    def generate_json():
+        count = 0
+        head = ''.join(f'{json.dumps(key)}:{dumps(value)},' for key, value in (meta or {}).items())
+        yield '{' + head + json.dumps(collection) + ':['
+        for rows in result.partitions(STREAM_BATCH_SIZE):
+            chunk = ','.join(dumps(serialize(row)) for row in rows)
+            yield (',' if count else '') + chunk
+            count += len(rows)
+        yield ']' + (f',{json.dumps(count_key)}:{count}' if count_key else '') + '}'
+
+    def generate_ndjson():
+        for rows in result.partitions(STREAM_BATCH_SIZE):
+            yield ''.join(dumps(serialize(row)) + '\n' for row in rows)
+
+    if stream == 'ndjson':
+        return Response(stream_with_context(generate_ndjson()), mimetype=NDJSON_MIMETYPE)
+    return Response(stream_with_context(generate_json()), mimetype='application/json')
+
+def read_ndjson(stream):
+    """Yield one decoded object per non-empty line of an NDJSON stream (None for invalid lines)"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
@@ -0,0 +1,50 @@
+"""Shared fixtures: the application booted once on a copy of the sample data.
+
+src.main builds its app at import time from DATABASE_URL, so the database
+is created from database_schema.sql and sample_data.sql (as
+init_database.py does) before the first import.
+"""
+import os
+import sqlite3
+import sys
+import pytest
+from sqlalchemy import event
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    path = tmp_path_factory.mktemp('database') / 'app.db'
+    connection = sqlite3.connect(path)
+    for script in ('database_schema.sql', 'sample_data.sql'):
+        with open(os.path.join(ROOT, script)) as f:
+            connection.executescript(f.read())
+    connection.commit()
+    connection.close()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    os.environ['REPORT_CACHE_SIZE'] = '0'
+    os.environ['SLOW_QUERY_MS'] = '0'
+    from src.main import app
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def statements(app):
+    """List that collects the SQL of every statement executed while the test runs"""
+    from src.models.inventory import db
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,13 @@
+def test_admin_endpoints_need_the_admin_token(app, client):
+    previous = app.config.get('ADMIN_TOKEN')
+    try:
+        app.config['ADMIN_TOKEN'] = None
+        assert client.get('/api/admin/slow-queries').status_code == 404
+
+        app.config['ADMIN_TOKEN'] = 'secret-token'
+        assert client.get('/api/admin/slow-queries').status_code == 401
+        assert client.delete('/api/admin/slow-queries', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        response = client.get('/api/admin/slow-queries', headers={'Authorization': 'Bearer secret-token'})
+        assert response.status_code != 401
+    finally:
+        app.config['ADMIN_TOKEN'] = previous
@@ -0,0 +1,48 @@
+import json
+
+def in_stock_product(client):
+    products = client.get('/api/products?per_page=100').get_json()['products']
+    return next(product for product in products if product['stock_level'] >= 10)
+
+def test_bad_unit_price_fails_only_its_own_order_in_a_batch(client):
+    product = in_stock_product(client)
+    line = {'product_id': product['product_id'], 'quantity': 1}
+    orders = [
+        {'customer_name': 'Batch A', 'items': [line]},
+        {'customer_name': 'Batch B', 'items': [{**line, 'unit_price': 'abc'}]},
+        {'customer_name': 'Batch C', 'items': [line]},
+        {'customer_name': 'Batch D', 'items': [{**line, 'unit_price': 4.5}]},
+    ]
+
+    response = client.post('/api/orders/bulk', json=orders)
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert results[-1] == {'summary': {'created': 3, 'failed': 1}}
+    assert results[1]['code'] == 400
+    assert all('order_id' in results[index] for index in (0, 2, 3))
+
+def test_bad_unit_price_is_a_client_error(client):
+    product = in_stock_product(client)
+    for unit_price in ('abc', 'NaN', -1):
+        response = client.post('/api/orders', json={
+            'customer_name': 'Single', 'items': [{'product_id': product['product_id'], 'quantity': 1, 'unit_price': unit_price}]
+        })
+        assert response.status_code == 400, unit_price
+        assert 'unit_price' in response.get_json()['error']
+
+def test_failed_batch_falls_back_to_one_order_at_a_time(client):
+    product = in_stock_product(client)
+    line = {'product_id': product['product_id'], 'quantity': 1}
+    orders = [
+        {'customer_name': 'Fallback A', 'items': [line]},
+        # Passes validation but cannot be bound, so the whole batch INSERT fails
+        {'customer_name': {'first': 'Fallback'}, 'items': [line]},
+        {'customer_name': 'Fallback C', 'items': [line]},
+    ]
+
+    response = client.post('/api/orders/bulk', json=orders)
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert results[-1] == {'summary': {'created': 2, 'failed': 1}}
+    assert 'error' in results[1]
+    assert all('order_id' in results[index] for index in (0, 2))
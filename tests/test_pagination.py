@@ -0,0 +1,52 @@
+import pytest
+
+# (url, collection, id field, page size argument)
+LISTS = [
+    ('/api/products', 'products', 'product_id', 'per_page'),
+    ('/api/suppliers', 'suppliers', 'supplier_id', 'per_page'),
+    ('/api/orders', 'orders', 'order_id', 'per_page'),
+    ('/api/purchase-orders', 'purchase_orders', 'purchase_order_id', 'per_page'),
+    ('/api/reports/recent-transactions', 'recent_transactions', 'transaction_id', 'limit'),
+]
+
+@pytest.mark.parametrize('url, collection, id_field, size_argument', LISTS)
+def test_cursor_pages_cover_every_row_once(client, url, collection, id_field, size_argument):
+    def page(cursor):
+        response = client.get(url, query_string={'cursor': cursor, size_argument: 2})
+        assert response.status_code == 200
+        data = response.get_json()
+        return [item[id_field] for item in data[collection]], data
+
+    everything = client.get(url, query_string={size_argument: 1000}).get_json()[collection]
+    expected = [item[id_field] for item in everything]
+    assert len(expected) > 2
+
+    # A cursor that repeats rows never reaches the end; stop after more pages than there can be
+    limit = len(expected)
+    forward = []
+    cursor = ''
+    while cursor is not None and len(forward) <= limit:
+        ids, data = page(cursor)
+        forward.append(ids)
+        cursor = data['next_cursor']
+    assert [item for ids in forward for item in ids] == expected
+
+    # Back from the last page through prev_cursor
+    backward = [forward[-1]]
+    cursor = data['prev_cursor']
+    while cursor is not None and len(backward) <= limit:
+        ids, data = page(cursor)
+        backward.insert(0, ids)
+        cursor = data['prev_cursor']
+    assert [item for ids in backward for item in ids] == expected
+
+@pytest.mark.parametrize('url, collection, id_field, size_argument', LISTS)
+def test_cursor_page_size_is_bounded(client, monkeypatch, url, collection, id_field, size_argument):
+    for size in (0, -1):
+        response = client.get(url, query_string={'cursor': '', size_argument: size})
+        assert response.status_code == 400, size
+
+    monkeypatch.setattr('src.utils.pagination.MAX_PER_PAGE', 2)
+    data = client.get(url, query_string={'cursor': '', size_argument: 50}).get_json()
+    assert len(data[collection]) == 2
+    assert data['next_cursor'] is not None
@@ -0,0 +1,43 @@
+def test_product_list_statement_count_does_not_grow_with_page_size(client, statements):
+    counts = {}
+    for per_page in (1, 5, 20, 50):
+        statements.clear()
+        response = client.get(f'/api/products?per_page={per_page}')
+        assert response.status_code == 200
+        products = response.get_json()['products']
+        assert 0 < len(products) <= per_page
+        assert all(product['category_name'] for product in products)
+        counts[per_page] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
+
+def import_csv(client, body):
+    response = client.post('/api/products/import', data=body, content_type='text/csv')
+    assert response.status_code == 200
+    return response.get_json()
+
+def product_by_sku(client, sku):
+    response = client.get(f'/api/products?search={sku}&per_page=100')
+    return next(product for product in response.get_json()['products'] if product['sku'] == sku)
+
+def test_import_keeps_columns_a_record_leaves_out(app, client):
+    category = client.get('/api/categories').get_json()[0]
+    supplier = client.get('/api/suppliers').get_json()['suppliers'][0]
+    import_csv(client, (
+        'sku,product_name,description,category_name,supplier_name,unit_price,reorder_level\n'
+        f'IMPORT-KEEP-1,Import keep,Full description,{category["category_name"]},{supplier["supplier_name"]},10.00,25\n'
+    ))
+
+    result = import_csv(client, 'sku,product_name,unit_price\nIMPORT-KEEP-1,Import keep,12.50\n')
+    assert result['upserted'] == 1
+
+    product = product_by_sku(client, 'IMPORT-KEEP-1')
+    assert product['unit_price'] == 12.5
+    assert product['description'] == 'Full description'
+    assert product['category_id'] == category['category_id']
+    assert product['supplier_id'] == supplier['supplier_id']
+    assert product['reorder_level'] == 25
+
+    import_csv(client, 'sku,product_name,unit_price\nIMPORT-NEW-1,Import new,3.00\n')
+    assert product_by_sku(client, 'IMPORT-NEW-1')['reorder_level'] == 10
+    assert app.test_cli_runner().invoke(args=['reports', 'rebuild-counters', '--check']).exit_code == 0
@@ -0,0 +1,97 @@
+from sqlalchemy import func, select
+
+def ledger_balance(app, product_id):
+    """Stock level and net ledger quantity of one product"""
+    from src.models.inventory import db, InventoryTransaction, Product
+    from src.services.stock import net_change
+    with app.app_context():
+        stock_level = db.session.scalar(select(Product.stock_level).where(Product.product_id == product_id))
+        rows = db.session.execute(
+            select(InventoryTransaction.transaction_type, func.sum(InventoryTransaction.quantity))
+            .where(InventoryTransaction.product_id == product_id)
+            .group_by(InventoryTransaction.transaction_type)
+        ).all()
+        return stock_level, sum(net_change({'transaction_type': kind, 'quantity': quantity}) for kind, quantity in rows)
+
+def test_opening_stock_of_a_new_product_is_in_the_ledger(app, client):
+    response = client.post('/api/products', json={'product_name': 'Opening', 'sku': 'OPENING-1', 'unit_price': 5, 'stock_level': 50})
+    assert response.status_code == 201
+    assert response.get_json()['stock_level'] == 50
+    assert ledger_balance(app, response.get_json()['product_id']) == (50, 50)
+
+    for stock_level in (-1, 'abc', [1]):
+        response = client.post('/api/products', json={'product_name': 'Invalid', 'unit_price': 5, 'stock_level': stock_level})
+        assert response.status_code == 400, stock_level
+        assert 'stock_level' in response.get_json()['error']
+
+def test_opening_stock_of_an_imported_sku_is_in_the_ledger(app, client):
+    body = 'sku,product_name,unit_price,stock_level\nOPENING-IMPORT-1,Opening import,5.00,20\n'
+    assert client.post('/api/products/import', data=body, content_type='text/csv').get_json()['upserted'] == 1
+    # A re-import leaves existing stock alone
+    body = 'sku,product_name,unit_price,stock_level\nOPENING-IMPORT-1,Opening import,6.00,99\n'
+    assert client.post('/api/products/import', data=body, content_type='text/csv').get_json()['upserted'] == 1
+
+    products = client.get('/api/products?search=OPENING-IMPORT-1').get_json()['products']
+    product = next(product for product in products if product['sku'] == 'OPENING-IMPORT-1')
+    assert ledger_balance(app, product['product_id']) == (20, 20)
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['reports', 'rebuild-counters', '--check']).exit_code == 0
+    assert runner.invoke(args=['reports', 'rebuild-stock-movements', '--check']).exit_code == 0
+
+def test_concurrent_orders_never_oversell(app, client):
+    import threading
+    from src.models.inventory import db, InventoryTransaction
+
+    stock = 20
+    response = client.post('/api/products', json={'product_name': 'Contended', 'sku': 'CONTENDED-1', 'unit_price': 2, 'stock_level': stock})
+    product_id = response.get_json()['product_id']
+
+    threads, attempts = 8, 6
+    statuses = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def place_orders():
+        worker = app.test_client()
+        start.wait()
+        for _ in range(attempts):
+            status = worker.post('/api/orders', json={
+                'customer_name': 'Contention', 'items': [{'product_id': product_id, 'quantity': 1}]
+            }).status_code
+            with lock:
+                statuses.append(status)
+
+    workers = [threading.Thread(target=place_orders) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(set(statuses)) == [201, 400]
+    assert statuses.count(201) == stock
+    assert ledger_balance(app, product_id) == (0, 0)
+    with app.app_context():
+        taken = db.session.scalar(
+            select(func.sum(InventoryTransaction.quantity))
+            .where(InventoryTransaction.product_id == product_id, InventoryTransaction.reference_type == 'ORDER')
+        )
+    assert taken == stock
+
+def test_deleting_a_product_takes_its_stock_history_only(app, client):
+    product = client.post('/api/products', json={'product_name': 'Delete me', 'sku': 'DELETE-1', 'unit_price': 5, 'stock_level': 30}).get_json()
+    assert client.post(f"/api/products/{product['product_id']}/adjust-stock", json={'adjustment': -5}).status_code == 200
+
+    assert client.delete(f"/api/products/{product['product_id']}").status_code == 200
+    assert client.get(f"/api/products/{product['product_id']}").status_code == 404
+    assert ledger_balance(app, product['product_id']) == (None, 0)
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['reports', 'rebuild-counters', '--check']).exit_code == 0
+    assert runner.invoke(args=['reports', 'rebuild-stock-movements', '--check']).exit_code == 0
+
+    # A product that was sold keeps its order lines and cannot be deleted
+    sold = client.post('/api/products', json={'product_name': 'Sold', 'sku': 'DELETE-2', 'unit_price': 5, 'stock_level': 5}).get_json()
+    order = {'customer_name': 'Delete', 'items': [{'product_id': sold['product_id'], 'quantity': 1}]}
+    assert client.post('/api/orders', json=order).status_code == 201
+    response = client.delete(f"/api/products/{sold['product_id']}")
+    assert response.status_code == 400
+    assert ledger_balance(app, sold['product_id']) == (4, 4)
@@ -0,0 +1,10 @@
+def test_purchase_order_lines_with_bad_values_are_client_errors(client):
+    supplier = client.get('/api/suppliers').get_json()['suppliers'][0]
+    product = client.get('/api/products').get_json()['products'][0]
+    line = {'product_id': product['product_id'], 'quantity': 5, 'unit_cost': 2.5}
+    for bad in ({'product_id': 'abc'}, {'product_id': [1]}, {'quantity': 'many'}, {'unit_cost': 'free'}):
+        response = client.post('/api/purchase-orders', json={'supplier_id': supplier['supplier_id'], 'items': [{**line, **bad}]})
+        assert response.status_code == 400, bad
+
+    response = client.post('/api/purchase-orders', json={'supplier_id': supplier['supplier_id'], 'items': [line]})
+    assert response.status_code == 201